@@ -10,6 +10,8 @@ __docformat__ = "restructuredtext"
     pygamelib.actuators.PatrolActuator
     pygamelib.actuators.UnidirectionalActuator
     pygamelib.actuators.PathFinder
+    pygamelib.actuators.FlowFieldActuator
+    pygamelib.actuators.PathFindingService
 
 """
 from typing import List, Optional, Tuple, Union, TYPE_CHECKING
@@ -18,12 +20,729 @@ from pygamelib import base
 from pygamelib.constants import Direction, State, Algorithm
 import random
 import collections
-from queue import PriorityQueue
+import heapq
+import threading
+import sys
+from concurrent import futures
+import numpy as np
 
 if TYPE_CHECKING:
     from pygamelib import engine
 
 
+# Path finding on a passability grid: a flat sequence (bytes, memoryview, etc.) of
+# height * width values that are not 0 for the cells that can be walked through.
+# These functions only use picklable data so they can run in a worker process.
+def _grid_bfs(grid, width, height, start, destination):
+    origin = start[0] * width + start[1]
+    goal = destination[0] * width + destination[1]
+    parents = {origin: -1}
+    queue = collections.deque([origin])
+    while queue:
+        index = queue.popleft()
+        if index == goal:
+            return _grid_walk_back(parents, index, width)
+        (r, c) = divmod(index, width)
+        # Same exploration order as PathFinder.
+        for (nr, nc) in ((r + 1, c), (r - 1, c), (r, c + 1), (r, c - 1)):
+            if 0 <= nr < height and 0 <= nc < width:
+                neighbor = nr * width + nc
+                if neighbor not in parents and grid[neighbor]:
+                    parents[neighbor] = index
+                    queue.append(neighbor)
+    return []
+
+
+def _grid_astar(grid, width, height, start, destination):
+    # A* with a binary heap, g-scores, parent pointers and a closed set. The heap
+    # entries are (f, -g, index): among the nodes with the same f, the deepest one is
+    # expanded first, which follows the straight lines instead of flooding the area.
+    origin = start[0] * width + start[1]
+    goal = destination[0] * width + destination[1]
+    (goal_row, goal_column) = destination
+    if origin == goal:
+        return [(start[0], start[1])]
+    if not grid[goal]:
+        return []
+    size = width * height
+    parents = {origin: -1}
+    costs = {origin: 0}
+    closed = bytearray(size)
+    heap = [(abs(start[0] - goal_row) + abs(start[1] - goal_column), 0, origin)]
+    heappush = heapq.heappush
+    heappop = heapq.heappop
+    while heap:
+        (_, depth, index) = heappop(heap)
+        if closed[index]:
+            # Outdated entry
+            continue
+        if index == goal:
+            return _grid_walk_back(parents, index, width)
+        closed[index] = 1
+        # depth is -g, cost is the g-score of the neighbors.
+        cost = 1 - depth
+        column = index % width
+        # Same exploration order as PathFinder: down, up, right, left.
+        neighbors = [index + width, index - width]
+        if column + 1 < width:
+            neighbors.append(index + 1)
+        if column > 0:
+            neighbors.append(index - 1)
+        for neighbor in neighbors:
+            if (
+                0 <= neighbor < size
+                and grid[neighbor]
+                and not closed[neighbor]
+                and cost < costs.get(neighbor, size)
+            ):
+                costs[neighbor] = cost
+                parents[neighbor] = index
+                (r, c) = divmod(neighbor, width)
+                heappush(
+                    heap,
+                    (cost + abs(r - goal_row) + abs(c - goal_column), -cost, neighbor),
+                )
+    return []
+
+
+def _grid_jps(grid, width, height, start, destination):
+    # Jump Point Search for 4-connected grids: A* on the jump points only. From a jump
+    # point, the search "jumps" in straight lines until it finds a cell where the
+    # optimal paths can turn (a forced neighbor), the goal or a wall. When it moves
+    # vertically, it can also turn at any cell from which a horizontal jump finds
+    # something.
+    # The stops of the jumps in each direction are computed for the whole grid at
+    # once with numpy, so that a jump is a single bytes.find().
+    if start[0] == destination[0] and start[1] == destination[1]:
+        return [(start[0], start[1])]
+    if not grid[destination[0] * width + destination[1]]:
+        return []
+    # The grid is padded with blocked cells so the jumps never leave it.
+    stride = width + 2
+    rows = height + 2
+    passable = np.zeros((rows, stride), dtype=bool)
+    passable[1:-1, 1:-1] = np.frombuffer(
+        grid, dtype=np.uint8, count=width * height
+    ).reshape(height, width)
+    # The start cell is usually occupied by the actuated item itself.
+    passable[start[0] + 1, start[1] + 1] = True
+    goal = (destination[0] + 1) * stride + destination[1] + 1
+    (goal_row, goal_column) = divmod(goal, stride)
+    blocked = np.logical_not(passable)
+    # The jumps stop on the blocked cells (the jump fails), the goal and the cells
+    # with a forced neighbor (the jump succeeds).
+    stop = blocked.copy()
+    stop[goal_row, goal_column] = True
+    (up, down, left, right) = (
+        passable[:-2, 1:-1],
+        passable[2:, 1:-1],
+        passable[1:-1, :-2],
+        passable[1:-1, 2:],
+    )
+    (up_left, up_right, down_left, down_right) = (
+        blocked[:-2, :-2],
+        blocked[:-2, 2:],
+        blocked[2:, :-2],
+        blocked[2:, 2:],
+    )
+    stop_right = stop.copy()
+    stop_right[1:-1, 1:-1] |= (up & up_left) | (down & down_left)
+    stop_left = stop.copy()
+    stop_left[1:-1, 1:-1] |= (up & up_right) | (down & down_right)
+    # Whether a horizontal jump that starts on a cell succeeds.
+    columns = np.arange(stride)
+    first = np.where(stop_right, columns, stride)
+    first = np.minimum.accumulate(first[:, ::-1], axis=1)[:, ::-1]
+    found_right = np.take_along_axis(passable, first, axis=1)
+    first = np.where(stop_left, columns, -1)
+    first = np.maximum.accumulate(first, axis=1)
+    found_left = np.take_along_axis(passable, first, axis=1)
+    turn = found_right[1:-1, 2:] | found_left[1:-1, :-2]
+    stop_down = stop.copy()
+    stop_down[1:-1, 1:-1] |= (left & up_left) | (right & up_right) | turn
+    stop_up = stop.copy()
+    stop_up[1:-1, 1:-1] |= (left & down_left) | (right & down_right) | turn
+    stop_right = stop_right.tobytes()
+    stop_left = stop_left.tobytes()
+    # Column-major, so the vertical jumps are searches too.
+    stop_down = stop_down.T.tobytes()
+    stop_up = stop_up.T.tobytes()
+    passable = passable.tobytes()
+    found = b"\x01"
+
+    def jump(index, step):
+        if step == 1:
+            index = stop_right.find(found, index)
+        elif step == -1:
+            index = stop_left.rfind(found, 0, index + 1)
+        else:
+            (row, column) = divmod(index, stride)
+            if step > 0:
+                index = stop_down.find(found, column * rows + row)
+            else:
+                index = stop_up.rfind(found, 0, column * rows + row + 1)
+            (column, row) = divmod(index, rows)
+            index = row * stride + column
+        return index if passable[index] else -1
+
+    origin = (start[0] + 1) * stride + start[1] + 1
+    parents = {origin: -1}
+    costs = {origin: 0}
+    closed = set()
+    (row, column) = divmod(origin, stride)
+    heap = [(abs(row - goal_row) + abs(column - goal_column), 0, origin)]
+    while heap:
+        (_, depth, index) = heapq.heappop(heap)
+        if index in closed:
+            # Outdated entry
+            continue
+        if index == goal:
+            path = [index]
+            while parents[index] != -1:
+                parent = parents[index]
+                # Fill the straight segment between the jump points.
+                step = 1 if abs(index - parent) < stride else stride
+                if index > parent:
+                    step = -step
+                path.extend(range(index + step, parent + step, step))
+                index = parent
+            path.reverse()
+            return [(i // stride - 1, i % stride - 1) for i in path]
+        closed.add(index)
+        parent = parents[index]
+        if parent == -1:
+            steps = [stride, -stride, 1, -1]
+        elif abs(index - parent) < stride:
+            # Moving horizontally: keep going or turn.
+            steps = [stride, -stride, 1 if index > parent else -1]
+        else:
+            # Moving vertically: keep going or turn.
+            steps = [stride if index > parent else -stride, 1, -1]
+        (row, column) = divmod(index, stride)
+        for step in steps:
+            jump_point = jump(index + step, step)
+            if jump_point == -1 or jump_point in closed:
+                continue
+            (r, c) = divmod(jump_point, stride)
+            cost = abs(r - row) + abs(c - column) - depth
+            if cost < costs.get(jump_point, cost + 1):
+                costs[jump_point] = cost
+                parents[jump_point] = index
+                estimate = cost + abs(r - goal_row) + abs(c - goal_column)
+                heapq.heappush(heap, (estimate, -cost, jump_point))
+    return []
+
+
+def _grid_walk_back(parents, index, width):
+    path = []
+    while index != -1:
+        path.append(divmod(index, width))
+        index = parents[index]
+    path.reverse()
+    return path
+
+
+def _grid_path(grid, width, height, start, destination, algorithm):
+    if algorithm == Algorithm.ASTAR:
+        return _grid_astar(grid, width, height, start, destination)
+    if algorithm == Algorithm.JPS:
+        return _grid_jps(grid, width, height, start, destination)
+    return _grid_bfs(grid, width, height, start, destination)
+
+
+def _bounded_bfs(grid, width, origin, bounds, targets=None):
+    # Breadth first search from origin that does not leave the bounds (first row,
+    # first column, last row + 1, last column + 1). It stops when all the targets are
+    # found. Returns the distances and the parents of the visited cells.
+    (top, left, bottom, right) = bounds
+    first = top * width
+    end = bottom * width
+    distances = {origin: 0}
+    parents = {origin: -1}
+    remaining = None if targets is None else set(targets) - {origin}
+    queue = collections.deque([origin])
+    while queue and (remaining is None or remaining):
+        index = queue.popleft()
+        distance = distances[index] + 1
+        column = index % width
+        neighbors = []
+        if index + width < end:
+            neighbors.append(index + width)
+        if index - width >= first:
+            neighbors.append(index - width)
+        if column + 1 < right:
+            neighbors.append(index + 1)
+        if column > left:
+            neighbors.append(index - 1)
+        for neighbor in neighbors:
+            if neighbor not in distances and grid[neighbor]:
+                distances[neighbor] = distance
+                parents[neighbor] = index
+                queue.append(neighbor)
+                if remaining is not None:
+                    remaining.discard(neighbor)
+    return (distances, parents)
+
+
+_HPA_CLUSTER_SIZE = 10
+
+
+class _PathHierarchy:
+    # Hierarchical path finding (HPA*) on the static passability of a board.
+    # The board is split in square clusters. The entrances between two adjacent
+    # clusters are pairs of cells on both sides of their border: one per run of open
+    # cells (in the middle), or two (at both ends) for the long runs. A path is found
+    # on the graph of the entrances, then refined cluster by cluster.
+    # The distances between the entrances of a cluster are only computed when a search
+    # needs them. When the terrain changes, only the clusters that contain the changed
+    # cells and their neighbors are updated.
+
+    def __init__(self, board, cluster_size):
+        self.board = board
+        self.cluster_size = cluster_size
+        self._rebuild()
+
+    def _rebuild(self):
+        board = self.board
+        self.version = board._terrain_version
+        (self.height, self.width) = board._static_blocking.shape
+        self.grid = bytearray(np.logical_not(board._static_blocking).tobytes())
+        size = self.cluster_size
+        self.cluster_rows = -(-self.height // size)
+        self.cluster_columns = -(-self.width // size)
+        # (cluster row, cluster column, side) -> [(cell, cell on the other side)] for
+        # the east (0) and south (1) borders of each cluster.
+        self._borders = {}
+        for cluster_row in range(self.cluster_rows):
+            for cluster_column in range(self.cluster_columns):
+                self._update_borders(cluster_row, cluster_column)
+        # cluster -> {entrance: [cells of the entrances of the neighbor clusters]}
+        self._entrances = {}
+        # cluster -> {entrance: [(entrance, distance)]}
+        self._edges = {}
+        # cluster -> {(entrance, entrance): [cells of the path between them]}
+        self._segments = {}
+
+    def _update_borders(self, cluster_row, cluster_column):
+        if cluster_row < 0 or cluster_column < 0:
+            return
+        size = self.cluster_size
+        (width, height) = (self.width, self.height)
+        top = cluster_row * size
+        left = cluster_column * size
+        bottom = min(top + size, height)
+        right = min(left + size, width)
+        if right < width:
+            # East border: (row, right - 1) <-> (row, right)
+            self._borders[(cluster_row, cluster_column, 0)] = self._transitions(
+                [(r * width + right - 1, r * width + right) for r in range(top, bottom)]
+            )
+        if bottom < height:
+            # South border: (bottom - 1, column) <-> (bottom, column)
+            self._borders[(cluster_row, cluster_column, 1)] = self._transitions(
+                [
+                    ((bottom - 1) * width + c, bottom * width + c)
+                    for c in range(left, right)
+                ]
+            )
+
+    def _transitions(self, pairs):
+        grid = self.grid
+        transitions = []
+        run = []
+        for pair in pairs + [None]:
+            if pair is not None and grid[pair[0]] and grid[pair[1]]:
+                run.append(pair)
+                continue
+            if len(run) >= 6:
+                transitions.append(run[0])
+                transitions.append(run[-1])
+            elif run:
+                transitions.append(run[len(run) // 2])
+            run = []
+        return transitions
+
+    def _cluster(self, index):
+        (row, column) = divmod(index, self.width)
+        return (row // self.cluster_size, column // self.cluster_size)
+
+    def _bounds(self, cluster):
+        size = self.cluster_size
+        top = cluster[0] * size
+        left = cluster[1] * size
+        return (top, left, min(top + size, self.height), min(left + size, self.width))
+
+    def _cluster_entrances(self, cluster):
+        entrances = self._entrances.get(cluster)
+        if entrances is not None:
+            return entrances
+        (cluster_row, cluster_column) = cluster
+        entrances = {}
+        for (key, inside) in (
+            ((cluster_row, cluster_column, 0), 0),
+            ((cluster_row, cluster_column, 1), 0),
+            ((cluster_row, cluster_column - 1, 0), 1),
+            ((cluster_row - 1, cluster_column, 1), 1),
+        ):
+            for transition in self._borders.get(key, []):
+                entrances.setdefault(transition[inside], []).append(
+                    transition[1 - inside]
+                )
+        self._entrances[cluster] = entrances
+        return entrances
+
+    def _cluster_edges(self, cluster):
+        edges = self._edges.get(cluster)
+        if edges is not None:
+            return edges
+        entrances = list(self._cluster_entrances(cluster).keys())
+        bounds = self._bounds(cluster)
+        edges = {entrance: [] for entrance in entrances}
+        for (i, entrance) in enumerate(entrances):
+            others = entrances[i + 1 :]
+            if not others:
+                break
+            (distances, _) = _bounded_bfs(
+                self.grid, self.width, entrance, bounds, others
+            )
+            for other in others:
+                distance = distances.get(other)
+                if distance is not None:
+                    edges[entrance].append((other, distance))
+                    edges[other].append((entrance, distance))
+        self._edges[cluster] = edges
+        return edges
+
+    def _segment(self, cluster, a, b):
+        # The path from a to b (excluded) inside a cluster. The paths between two
+        # entrances are cached.
+        segments = self._segments.setdefault(cluster, {})
+        segment = segments.get((a, b))
+        if segment is not None:
+            return segment
+        bounds = self._bounds(cluster)
+        (_, parents) = _bounded_bfs(self.grid, self.width, a, bounds, [b])
+        segment = []
+        index = b
+        while index != a:
+            segment.append(divmod(index, self.width))
+            index = parents[index]
+        segment.reverse()
+        entrances = self._cluster_entrances(cluster)
+        if a in entrances and b in entrances:
+            segments[(a, b)] = segment
+        return segment
+
+    def update(self):
+        # Catch up with the changes of the terrain of the board.
+        board = self.board
+        if board._terrain_version == self.version:
+            return
+        changes = [
+            change for change in board._terrain_changes if change[0] > self.version
+        ]
+        if (
+            board._static_blocking.shape != (self.height, self.width)
+            or len(changes) != board._terrain_version - self.version
+        ):
+            # Too many changes, or a new board (Board.init_board()).
+            self._rebuild()
+            return
+        clusters = set()
+        for (_, row, column) in changes:
+            self.grid[row * self.width + column] = not board._static_blocking[
+                row, column
+            ]
+            clusters.add((row // self.cluster_size, column // self.cluster_size))
+        for (cluster_row, cluster_column) in clusters:
+            # The west and north borders belong to the neighbors.
+            self._update_borders(cluster_row, cluster_column)
+            self._update_borders(cluster_row, cluster_column - 1)
+            self._update_borders(cluster_row - 1, cluster_column)
+        for (cluster_row, cluster_column) in clusters:
+            for cluster in (
+                (cluster_row, cluster_column),
+                (cluster_row + 1, cluster_column),
+                (cluster_row - 1, cluster_column),
+                (cluster_row, cluster_column + 1),
+                (cluster_row, cluster_column - 1),
+            ):
+                self._entrances.pop(cluster, None)
+                self._edges.pop(cluster, None)
+                self._segments.pop(cluster, None)
+        self.version = board._terrain_version
+
+    def find_path(self, start, destination):
+        self.update()
+        width = self.width
+        grid = self.grid
+        origin = start[0] * width + start[1]
+        goal = destination[0] * width + destination[1]
+        if origin == goal:
+            return [(start[0], start[1])]
+        if not grid[goal]:
+            return []
+        start_cluster = self._cluster(origin)
+        goal_cluster = self._cluster(goal)
+        # Connect the start and the goal to the entrances of their clusters.
+        targets = list(self._cluster_entrances(start_cluster).keys())
+        if start_cluster == goal_cluster:
+            targets.append(goal)
+        (distances, _) = _bounded_bfs(
+            grid, width, origin, self._bounds(start_cluster), targets
+        )
+        start_edges = [(t, distances[t]) for t in targets if t in distances]
+        (distances, _) = _bounded_bfs(
+            grid,
+            width,
+            goal,
+            self._bounds(goal_cluster),
+            self._cluster_entrances(goal_cluster).keys(),
+        )
+        goal_edges = {
+            entrance: distance
+            for (entrance, distance) in distances.items()
+            if entrance in self._cluster_entrances(goal_cluster)
+        }
+        if not goal_edges and goal not in dict(start_edges):
+            return []
+        # A* on the entrances.
+        (goal_row, goal_column) = divmod(goal, width)
+        parents = {origin: -1}
+        costs = {origin: 0}
+        closed = set()
+        heap = [(0, 0, origin)]
+        while heap:
+            (_, depth, index) = heapq.heappop(heap)
+            if index in closed:
+                continue
+            if index == goal:
+                break
+            closed.add(index)
+            cost = -depth
+            cluster = self._cluster(index)
+            neighbors = []
+            if index == origin:
+                neighbors.extend(start_edges)
+            entrances = self._cluster_entrances(cluster)
+            if index in entrances:
+                neighbors.extend(self._cluster_edges(cluster)[index])
+                neighbors.extend((other, 1) for other in entrances[index])
+            if index in goal_edges:
+                neighbors.append((goal, goal_edges[index]))
+            for (neighbor, distance) in neighbors:
+                if neighbor in closed:
+                    continue
+                distance += cost
+                if distance < costs.get(neighbor, distance + 1):
+                    costs[neighbor] = distance
+                    parents[neighbor] = index
+                    (r, c) = divmod(neighbor, width)
+                    estimate = distance + abs(r - goal_row) + abs(c - goal_column)
+                    heapq.heappush(heap, (estimate, -distance, neighbor))
+        else:
+            return []
+        # Refine the abstract path: the path between two entrances of a cluster is
+        # found in that cluster only.
+        waypoints = [goal]
+        while parents[waypoints[-1]] != -1:
+            waypoints.append(parents[waypoints[-1]])
+        waypoints.reverse()
+        path = [divmod(origin, width)]
+        for (a, b) in zip(waypoints, waypoints[1:]):
+            cluster = self._cluster(a)
+            if b in self._cluster_entrances(cluster).get(a, []):
+                # Crossing a border
+                path.append(divmod(b, width))
+            else:
+                path.extend(self._segment(cluster, a, b))
+        return path
+
+
+class _DStarLite:
+    # D* Lite (Koenig and Likhachev): a search from the goal to the start that is
+    # repaired when the cost of cells change or when the start moves, instead of
+    # being computed again. A cell is blocked if it contains an item that is not
+    # overlappable (moving items included), except the start and the goal cells.
+
+    def __init__(self, board, goal):
+        self.board = board
+        (self.height, self.width) = board._blocking.shape
+        self.goal = goal[0] * self.width + goal[1]
+        self.start = None
+        self.blocked = None
+        # g-values, right-hand side values and the keys of the queued cells. Missing
+        # cells have an infinite g and rhs.
+        self.g = {}
+        self.rhs = {self.goal: 0}
+        self.keys = {}
+        self.heap = []
+        self.modifier = 0
+
+    def _neighbors(self, index):
+        width = self.width
+        column = index % width
+        neighbors = []
+        if index + width < self.width * self.height:
+            neighbors.append(index + width)
+        if index >= width:
+            neighbors.append(index - width)
+        if column + 1 < width:
+            neighbors.append(index + 1)
+        if column > 0:
+            neighbors.append(index - 1)
+        return neighbors
+
+    def _heuristic(self, a, b):
+        (ar, ac) = divmod(a, self.width)
+        (br, bc) = divmod(b, self.width)
+        return abs(ar - br) + abs(ac - bc)
+
+    def _key(self, index):
+        g = self.g.get(index, _INFINITY)
+        rhs = self.rhs.get(index, _INFINITY)
+        heuristic = self._heuristic(self.start, index) + self.modifier
+        if g < rhs:
+            # Underconsistent cells first (like in the original D* Lite).
+            return (g + heuristic, 0, g)
+        # Break the ties toward the cells closer to the start (larger g), like
+        # _grid_astar() does, instead of flooding the open areas.
+        return (rhs + heuristic, 1, -rhs)
+
+    def _update(self, index):
+        if index != self.goal:
+            rhs = _INFINITY
+            if not self.blocked[index]:
+                g = self.g
+                for neighbor in self._neighbors(index):
+                    if not self.blocked[neighbor]:
+                        rhs = min(rhs, g.get(neighbor, _INFINITY) + 1)
+            if rhs == _INFINITY:
+                self.rhs.pop(index, None)
+            else:
+                self.rhs[index] = rhs
+        if self.g.get(index, _INFINITY) != self.rhs.get(index, _INFINITY):
+            key = self._key(index)
+            self.keys[index] = key
+            heapq.heappush(self.heap, (key, index))
+        else:
+            self.keys.pop(index, None)
+
+    def _top(self):
+        # Drop the outdated entries.
+        heap = self.heap
+        while heap and self.keys.get(heap[0][1]) != heap[0][0]:
+            heapq.heappop(heap)
+        return heap[0] if heap else None
+
+    def _compute(self):
+        g = self.g
+        rhs = self.rhs
+        start = self.start
+        while True:
+            top = self._top()
+            if top is None:
+                break
+            start_key = self._key(start)
+            if top[0] >= start_key and rhs.get(start, _INFINITY) == g.get(
+                start, _INFINITY
+            ):
+                break
+            (key, index) = heapq.heappop(self.heap)
+            del self.keys[index]
+            new_key = self._key(index)
+            if key < new_key:
+                self.keys[index] = new_key
+                heapq.heappush(self.heap, (new_key, index))
+            elif g.get(index, _INFINITY) > rhs.get(index, _INFINITY):
+                g[index] = rhs[index]
+                for neighbor in self._neighbors(index):
+                    self._update(neighbor)
+            else:
+                g.pop(index, None)
+                self._update(index)
+                for neighbor in self._neighbors(index):
+                    self._update(neighbor)
+
+    def find_path(self, start):
+        width = self.width
+        start = start[0] * width + start[1]
+        blocked = self.board._blocking.ravel().copy()
+        blocked[start] = False
+        blocked[self.goal] = False
+        if self.start is None:
+            self.start = start
+            self.blocked = blocked
+            self.keys[self.goal] = self._key(self.goal)
+            heapq.heappush(self.heap, (self.keys[self.goal], self.goal))
+        else:
+            # The start moved: the keys in the queue are lower bounds, fix them with
+            # the key modifier instead of computing them again.
+            self.modifier += self._heuristic(self.start, start)
+            self.start = start
+            changed = np.flatnonzero(blocked != self.blocked).tolist()
+            self.blocked = blocked
+            cells = set(changed)
+            for index in changed:
+                cells.update(self._neighbors(index))
+            for index in cells:
+                self._update(index)
+        self._compute()
+        g = self.g
+        if g.get(start, _INFINITY) == _INFINITY:
+            return []
+        # Follow the g-values down to the goal.
+        path = [divmod(start, width)]
+        index = start
+        while index != self.goal and len(path) <= len(blocked):
+            index = min(
+                (n for n in self._neighbors(index) if not blocked[n]),
+                key=lambda n: g.get(n, _INFINITY),
+            )
+            path.append(divmod(index, width))
+        return path
+
+
+_INFINITY = float("inf")
+
+
+def _shared_memory():
+    # multiprocessing.shared_memory is only available since Python 3.8, we only
+    # import it when the workers are processes.
+    try:
+        from multiprocessing import shared_memory
+    except ImportError:  # pragma: no cover
+        raise base.PglException(
+            "missing_dependency",
+            "Python 3.8 or later is required to compute the paths in worker "
+            "processes. Please use PathFindingService(processes=False).",
+        )
+    return shared_memory
+
+
+# Shared memory blocks attached by a worker process, by name.
+_worker_grids = collections.OrderedDict()
+
+
+def _shared_grid_path(name, width, height, start, destination, algorithm):
+    # Runs in a worker process of a PathFindingService.
+    block = _worker_grids.get(name)
+    if block is None:
+        shared_memory = _shared_memory()
+        try:
+            # The block is owned (and unlinked) by the service, not by the worker.
+            block = shared_memory.SharedMemory(name=name, track=False)
+        except TypeError:  # pragma: no cover
+            # Python < 3.13
+            block = shared_memory.SharedMemory(name=name)
+        _worker_grids[name] = block
+        while len(_worker_grids) > 8:
+            _worker_grids.popitem(last=False)[1].close()
+    else:
+        _worker_grids.move_to_end(name)
+    return _grid_path(block.buf, width, height, start, destination, algorithm)
+
+
 class Actuator(base.PglBaseObject):
     """
     Actuator is the base class for all Actuators. It is mainly a contract class with
@@ -557,8 +1276,19 @@ class PathFinder(Behavioral):
         method is going to circle between the waypoints
         (when the last is visited, go back to the first)
     :type circle_waypoints: bool
-    :param algorithm: ALGO_BFS - BFS, ALGO_ASTAR - AStar
-    :type algorithm: constant
+    :param algorithm: Algorithm.BFS (default), Algorithm.ASTAR, Algorithm.JPS (Jump
+        Point Search), Algorithm.HPASTAR (hierarchical A*) or Algorithm.DSTARLITE
+        (incremental replanning, see :meth:`find_path()`).
+    :type algorithm: :class:`~pygamelib.constants.Algorithm`
+    :param service: A service to compute the paths in the background. If it is set,
+        next_move() does not block on path finding: it requests a path from the
+        service (see :meth:`request_path()`) and keeps following its previous path
+        until the new one is ready. Default: None (the paths are computed right away).
+    :type service: :class:`PathFindingService`
+
+    .. versionadded:: 1.4.0
+       The service parameter and the Algorithm.JPS, Algorithm.HPASTAR and
+       Algorithm.DSTARLITE algorithms.
 
     """
 
@@ -569,6 +1299,7 @@ class PathFinder(Behavioral):
         circle_waypoints=True,
         parent: Optional["board_items.BoardItem"] = None,
         algorithm=Algorithm.BFS,
+        service: Optional["PathFindingService"] = None,
     ):
         effective_parent = parent
         if actuated_object is not None and parent is None:
@@ -585,14 +1316,31 @@ class PathFinder(Behavioral):
         self._waypoint_index = 0
         self.circle_waypoints = circle_waypoints
         self.algorithm = algorithm
+        self.service = service
+        # The pending request to the service and its destination.
+        self._path_request: Optional[futures.Future] = None
+        self._requested_destination: Tuple[Optional[int], Optional[int]] = (None, None)
+        # The last destination found unreachable and the terrain version at that time.
+        self._unreachable = None
+        # The state of the incremental search (Algorithm.DSTARLITE).
+        self._replanner: Optional[_DStarLite] = None
+        # The board and the destination cell of the previous D* Lite request.
+        self._replanner_goal = None
         if (
             type(self.algorithm) is not int and type(self.algorithm) is not Algorithm
-        ) or (self.algorithm != Algorithm.BFS and self.algorithm != Algorithm.ASTAR):
+        ) or self.algorithm not in (
+            Algorithm.BFS,
+            Algorithm.ASTAR,
+            Algorithm.JPS,
+            Algorithm.HPASTAR,
+            Algorithm.DSTARLITE,
+        ):
             # TODO: it would be better to have a method that return a list of
             #      implemented algorithm and to check if self.algorithm is in that list.
             raise base.PglInvalidTypeException(
-                "In Actuator.PathFinder.__init__(..,algorithm) algorithm must be"
-                "either Algorithm.BFS or Algorithm.ASTAR."
+                "In Actuator.PathFinder.__init__(..,algorithm) algorithm must be "
+                "Algorithm.BFS, Algorithm.ASTAR, Algorithm.JPS, Algorithm.HPASTAR or "
+                "Algorithm.DSTARLITE."
             )
 
     def set_destination(self, row: int = 0, column: int = 0):
@@ -648,6 +1396,43 @@ class PathFinder(Behavioral):
         (`Wikipedia: A* <https://en.wikipedia.org/wiki/A*_search_algorithm>`_)
         to find the shortest path to destination.
 
+        Jump Point Search:
+        This method implements a Jump Point Search
+        (`Wikipedia: JPS <https://en.wikipedia.org/wiki/Jump_point_search>`_), an A*
+        search that only expands the cells where the shortest paths can turn. It
+        returns a shortest path too, and it is a lot faster than A* on maps with large
+        open areas.
+
+        Hierarchical A*:
+        This method implements a hierarchical path finding (HPA*) for very large
+        boards. The board is divided in clusters of 10x10 cells and the path is first
+        found on the graph of the entrances between the clusters, then refined inside
+        each cluster. The graph is shared by all the path finders of the board and only
+        the clusters that change are updated. The paths are close to the shortest
+        ones (usually a few percents longer). Like with a
+        :class:`PathFindingService`, the movable items (NPCs, the player, etc.) are
+        ignored: the path can end on the player.
+
+        D* Lite:
+        This method implements a D* Lite search
+        (`Wikipedia: D* <https://en.wikipedia.org/wiki/D*>`_), an incremental search
+        that keeps its state from one call to the next. When the actuated object moves
+        or when items block or free cells, only the affected part of the search is
+        repaired. :meth:`next_move()` updates the path at each move, so the actuated
+        object walks around the moving items (or waits for them) without a full search
+        every frame. The destination cell itself is considered free (it can be
+        occupied by the player for example). The first search of a destination is an
+        A* search: the D* Lite search is only started when the same destination is
+        requested again, and it costs a few times more than an A* search (its state is
+        kept for all the cells it visits). Then each repair is a lot cheaper than a new
+        search. When the destination changes at each move (when chasing the player
+        for example), each call is a plain A* search.
+
+        .. versionchanged:: 1.4.0
+           The A* search works on the passability grid of the board with a binary
+           heap. It is much faster and always returns a shortest path. The Jump Point
+           Search, the hierarchical A* and D* Lite were added.
+
         """
         if self.actuated_object is None:
             raise base.PglException(
@@ -667,8 +1452,98 @@ class PathFinder(Behavioral):
             )
         if self.algorithm == Algorithm.BFS:
             return self.__find_path_bfs()
+        if self.algorithm == Algorithm.HPASTAR:
+            return self.__find_path_hierarchical()
+        if self.algorithm == Algorithm.DSTARLITE:
+            return self.__find_path_incremental()
+
+        return self.__find_path_grid()
 
-        return self.__find_path_astar()
+    def request_path(self) -> None:
+        """Request a path to the destination without waiting for it.
+
+        .. versionadded:: 1.4.0
+
+        If the actuator has a :class:`PathFindingService`, the request is submitted to
+        the service and the path is used by :meth:`next_move()` when it is ready (on a
+        later frame). In the meantime, the actuator keeps following its current path.
+        A new request for the same destination is ignored while the previous one is
+        pending.
+
+        If the actuator has no service, or if its algorithm is Algorithm.HPASTAR or
+        Algorithm.DSTARLITE (their data live in the main process), this is the same as
+        :meth:`find_path()`.
+
+        Example::
+
+            # Chase the player without blocking the game.
+            hunter.actuator.set_destination(game.player.row, game.player.column)
+            hunter.actuator.request_path()
+        """
+        if self.service is None or self.algorithm in (
+            Algorithm.HPASTAR,
+            Algorithm.DSTARLITE,
+        ):
+            self.find_path()
+            return
+        if self.actuated_object is None or not isinstance(
+            self.actuated_object, board_items.Movable
+        ):
+            raise base.PglException(
+                "actuated_object not a Movable object",
+                "PathFinder.actuated_object has to be an instance of a Movable object.",
+            )
+        if self.destination[0] is None or self.destination[1] is None:
+            raise base.PglException(
+                "destination is not defined",
+                "PathFinder.destination has to be defined.",
+            )
+        if (
+            self._path_request is not None
+            and self._requested_destination == self.destination
+        ):
+            return
+        board = self.game.current_board()
+        if self._unreachable == (self.destination, board._terrain_version):
+            return
+        self._requested_destination = self.destination
+        self._path_request = self.service.submit(
+            board,
+            (self.actuated_object.pos[0], self.actuated_object.pos[1]),
+            self.destination,
+            self.algorithm,
+        )
+
+    def _collect_path(self):
+        # Use the path computed by the service if it is ready.
+        request = self._path_request
+        if request is None or not request.done():
+            return
+        self._path_request = None
+        if self._requested_destination != self.destination:
+            # The destination changed in the meantime.
+            self.request_path()
+            return
+        path = request.result()
+        if len(path) == 0:
+            self._unreachable = (
+                self.destination,
+                self.game.current_board()._terrain_version,
+            )
+            self._current_path = []
+            return
+        position = (self.actuated_object.pos[0], self.actuated_object.pos[1])
+        if position in path:
+            # The actuated object might have moved since the request.
+            self._current_path = path[path.index(position) :]
+        else:
+            self.request_path()
+
+    def _refresh_path(self):
+        if self.service is None:
+            self.find_path()
+        else:
+            self.request_path()
 
     def __find_path_bfs(self) -> List[Tuple[int, int]]:
         queue: collections.deque[List[Tuple[int, int]]] = collections.deque(
@@ -697,55 +1572,97 @@ class PathFinder(Behavioral):
                     seen.add((r, c))
         return []
 
-    def __find_path_astar(self) -> List[Tuple[int, int]]:
-
-        queue: PriorityQueue[Tuple[int, List[Tuple[int, int]]]] = PriorityQueue()
-
-        # queue stores a tuple with values:
-        # h - heuristic value = depth + manhattan distance from current node to
-        # destination
-        # type(h) = int
-        # path - path to reach current node from start node
-        # type(path) = list
-        # For each node, depth = len(path)
-
-        assert isinstance(self.actuated_object.pos[0], int)
-        assert isinstance(self.actuated_object.pos[1], int)
-        assert isinstance(self.destination[0], int)
-        assert isinstance(self.destination[1], int)
-        initial_h = abs(self.actuated_object.pos[0] - self.destination[0]) + abs(
-            self.actuated_object.pos[1] - self.destination[1]
+    def __find_path_grid(self) -> List[Tuple[int, int]]:
+        board = self.game.current_board()
+        (width, height) = board.size
+        (row, column) = self.destination
+        if (
+            type(row) is not int
+            or type(column) is not int
+            or not 0 <= row < height
+            or not 0 <= column < width
+        ):
+            return []
+        # A cell can be walked through if all its items are overlappable.
+        grid = np.logical_not(board._blocking).tobytes()
+        path = _grid_path(
+            grid,
+            width,
+            height,
+            (self.actuated_object.pos[0], self.actuated_object.pos[1]),
+            self.destination,
+            self.algorithm,
         )
-
-        queue.put(
-            (initial_h, [(self.actuated_object.pos[0], self.actuated_object.pos[1])])
+        if len(path) > 0:
+            self._current_path = path
+        # We return only a copy of the path as we need to keep the
+        # real one untouched for our own needs.
+        return path.copy()
+
+    def __find_path_hierarchical(self) -> List[Tuple[int, int]]:
+        board = self.game.current_board()
+        (width, height) = board.size
+        (row, column) = self.destination
+        if (
+            type(row) is not int
+            or type(column) is not int
+            or not 0 <= row < height
+            or not 0 <= column < width
+        ):
+            return []
+        hierarchy = board._path_hierarchy
+        if hierarchy is None:
+            hierarchy = board._path_hierarchy = _PathHierarchy(
+                board, _HPA_CLUSTER_SIZE
+            )
+        path = hierarchy.find_path(
+            (self.actuated_object.pos[0], self.actuated_object.pos[1]), (row, column)
         )
-        seen = set()
-        while not queue.empty():
-            h_val, path = queue.get()
-            x, y = path[-1]
-            if (x, y) == self.destination:
+        if len(path) > 0:
+            self._current_path = path
+        # We return only a copy of the path as we need to keep the
+        # real one untouched for our own needs.
+        return path.copy()
+
+    def __find_path_incremental(self) -> List[Tuple[int, int]]:
+        board = self.game.current_board()
+        (width, height) = board.size
+        (row, column) = self.destination
+        if (
+            type(row) is not int
+            or type(column) is not int
+            or not 0 <= row < height
+            or not 0 <= column < width
+            or board._static_blocking[row, column]
+        ):
+            return []
+        start = (self.actuated_object.pos[0], self.actuated_object.pos[1])
+        goal = row * width + column
+        planner = self._replanner
+        if (
+            planner is None
+            or planner.board is not board
+            or planner.goal != goal
+            or planner.blocked.shape != (width * height,)
+        ):
+            self._replanner = None
+            if self._replanner_goal != (board, goal):
+                # A new destination (when chasing a moving target for example): one
+                # A* search is a lot cheaper than a new D* Lite search. The planner is
+                # only built when the same destination is requested again.
+                self._replanner_goal = (board, goal)
+                grid = bytearray(np.logical_not(board._blocking).tobytes())
+                grid[goal] = 1
+                path = _grid_astar(grid, width, height, start, (row, column))
                 self._current_path = path
-                # We return only a copy of the path as we need to keep the
-                # real one untouched for our own needs.
                 return path.copy()
-
-            # r = row c = column
-            for r, c in ((x + 1, y), (x - 1, y), (x, y + 1), (x, y - 1)):
-                h_val = (
-                    len(path)
-                    + abs(self.destination[0] - r)
-                    + abs(self.destination[1] - c)
-                )
-                if (
-                    0 <= c < self.game.current_board().size[0]
-                    and 0 <= r < self.game.current_board().size[1]
-                    and self.game.current_board().item(r, c).overlappable()
-                    and ((r, c) not in seen)
-                ):
-                    queue.put((h_val, path + [(r, c)]))
-                    seen.add((r, c))
-        return []
+            planner = self._replanner = _DStarLite(board, (row, column))
+        path = planner.find_path(start)
+        # An empty path means that the destination cannot be reached for now: wait.
+        self._current_path = path
+        # We return only a copy of the path as we need to keep the
+        # real one untouched for our own needs.
+        return path.copy()
 
     def current_path(self) -> List[Tuple[int, int]]:
         """This method simply return a copy of the current path of the actuator.
@@ -796,6 +1713,10 @@ class PathFinder(Behavioral):
          - In any case, if there is no more waypoints in the path this method \
             returns NO_DIR (see :py:mod:`~pygamelib.constants`)
 
+        With Algorithm.DSTARLITE, the path is updated (:meth:`find_path()`) at each
+        call: this is cheap while the destination stays the same, and it costs one A*
+        search per call when the destination changes at each move.
+
         Example::
 
             seeker = NPC(model=graphics.Models.SKULL)
@@ -813,13 +1734,23 @@ class PathFinder(Behavioral):
         if self.destination[0] is None or self.destination[1] is None:
             return Direction.NO_DIR
 
+        if self.service is not None:
+            self._collect_path()
+
+        if self.algorithm == Algorithm.DSTARLITE and (
+            self.actuated_object.pos[0] != self.destination[0]
+            or self.actuated_object.pos[1] != self.destination[1]
+        ):
+            # The path is repaired at each move.
+            self.find_path()
+
         # If path is empty and actuated_object is not at destination,
         # try to find a path to destination
         if len(self._current_path) == 0 and (
             self.actuated_object.pos[0] != self.destination[0]
             or self.actuated_object.pos[1] != self.destination[1]
         ):
-            self.find_path()
+            self._refresh_path()
 
         # If path is still empty return NO_DIR (destination is unreachable or
         # the current waypoint is reached)
@@ -836,7 +1767,7 @@ class PathFinder(Behavioral):
                 if isinstance(r, int) and isinstance(c, int):
                     # Set the new destination and calculate the path
                     self.set_destination(r, c)
-                    self.find_path()
+                    self._refresh_path()
                 else:
                     # If there are no more waypoints, then we return NO_DIR
                     return Direction.NO_DIR
@@ -891,6 +1822,11 @@ class PathFinder(Behavioral):
             return Direction.DLUP
         elif dr > 1 or dr < -1 or dc > 1 or dc < -1:
             # If we are here it means that something is blocking the movement
+            if self.service is not None:
+                # Wait for a new path.
+                self._current_path = []
+                self.request_path()
+                return Direction.NO_DIR
             self.find_path()
             return self.next_move()
         else:
@@ -1062,3 +1998,380 @@ class PathFinder(Behavioral):
         if "destination" in data.keys():
             act.destination = data["destination"]
         return act
+
+
+class FlowFieldActuator(Actuator):
+    """
+    .. versionadded:: 1.4.0
+
+    A FlowFieldActuator moves its parent toward a target along the shortest path,
+    like a :class:`PathFinder`, but without looking for a path. It reads the next step
+    from the distance field of the board (see
+    :meth:`~pygamelib.engine.Board.distance_field()`), which is computed once for all
+    the actuators that follow the same target. Each move is then a constant time
+    lookup, which makes it the actuator of choice for hordes of NPCs chasing the
+    player.
+
+    The distance field ignores the movable items: NPCs wait when all the cells that
+    are closer to the target are occupied. The actuator returns NO_DIR when its parent
+    is next to the target (or on it) and when the target cannot be reached.
+
+    :param game: A reference to the instantiated game engine.
+    :type game: pygamelib.engine.Game
+    :param parent: The parent object to actuate.
+    :type parent: pygamelib.board_items.BoardItem
+    :param target: An item to follow (the player for example). Its position is read at
+       each move. If it is None, the destination set with :meth:`set_destination()`
+       is used.
+    :type target: pygamelib.board_items.BoardItem
+
+    .. important:: Like PathFinder, this actuator assumes a one step movement.
+
+    Example::
+
+        for npc in horde:
+            npc.actuator = FlowFieldActuator(game=game, parent=npc, target=game.player)
+    """
+
+    def __init__(
+        self,
+        game: Optional["engine.Game"] = None,
+        parent: Optional["board_items.BoardItem"] = None,
+        target: Optional["board_items.BoardItem"] = None,
+    ):
+        super().__init__(parent)
+        self.game = game
+        self.target = target
+        self.destination: Tuple[Optional[int], Optional[int]] = (None, None)
+
+    def set_destination(self, row: int = 0, column: int = 0):
+        """Set the targeted destination. It is only used if target is None.
+
+        :param row: "row" coordinate on the board grid
+        :type row: int
+        :param column: "column" coordinate on the board grid
+        :type column: int
+        :raises PglInvalidTypeException: if row or column are not int.
+
+        Example::
+
+            npc.actuator.set_destination(exit_door.row, exit_door.column)
+        """
+        if type(row) is not int or type(column) is not int:
+            raise base.PglInvalidTypeException(
+                "FlowFieldActuator.set_destination(row, column): row and column must "
+                "be int."
+            )
+        self.destination = (row, column)
+
+    def next_move(self) -> int:
+        """Return the direction of the next step toward the target.
+
+        :return: The next movement
+        :rtype: int | :py:const:`pygamelib.Direction.NO_DIR`
+
+        Example::
+
+            game.current_board().move(npc, npc.actuator.next_move(), 1)
+        """
+        if self.state != State.RUNNING or self.parent is None:
+            return Direction.NO_DIR
+        if self.target is not None:
+            (target_row, target_column) = (self.target.row, self.target.column)
+        else:
+            (target_row, target_column) = self.destination
+        if target_row is None or target_column is None:
+            return Direction.NO_DIR
+        board = self.game.current_board()
+        (width, height) = board.size
+        if not (0 <= target_row < height and 0 <= target_column < width):
+            return Direction.NO_DIR
+        field = board.distance_field(target_row, target_column)
+        (row, column) = (self.parent.row, self.parent.column)
+        distance = field[row, column]
+        if distance <= 0:
+            # On the target or the target cannot be reached.
+            return Direction.NO_DIR
+        distance -= 1
+        blocking = board._blocking
+        # Same order as PathFinder: down, up, right, left.
+        if row + 1 < height and field[row + 1, column] == distance:
+            if not blocking[row + 1, column]:
+                return Direction.DOWN
+        if row > 0 and field[row - 1, column] == distance:
+            if not blocking[row - 1, column]:
+                return Direction.UP
+        if column + 1 < width and field[row, column + 1] == distance:
+            if not blocking[row, column + 1]:
+                return Direction.RIGHT
+        if column > 0 and field[row, column - 1] == distance:
+            if not blocking[row, column - 1]:
+                return Direction.LEFT
+        # All the cells that are closer to the target are occupied: wait.
+        return Direction.NO_DIR
+
+    def serialize(self) -> dict:
+        """Return a dictionary with all the attributes of this object.
+
+        The target is not serialized, only the destination.
+
+        :return: A dictionary with all the attributes of this object.
+        :rtype: dict
+        """
+        return {
+            "type": "FlowFieldActuator",
+            "destination": self.destination,
+            "state": self.state,
+        }
+
+    @classmethod
+    def load(cls, data: dict) -> "FlowFieldActuator":
+        """Load data and create a new FlowFieldActuator out of it.
+
+        :param data: Data to create a new actuator (usually generated by
+           :meth:`serialize()`)
+        :type data: dict
+
+        :return: A new actuator.
+        :rtype: FlowFieldActuator
+
+        Example::
+
+            flow_field_actuator = FlowFieldActuator.load(actuator_data)
+        """
+        act = cls()
+        if "state" in data.keys():
+            act.state = data["state"]
+        if "destination" in data.keys():
+            act.destination = tuple(data["destination"])
+        return act
+
+
+class _GridSnapshot:
+    # A snapshot of the passability of a board, shared with the workers of a
+    # PathFindingService.
+    __slots__ = ("board", "version", "width", "height", "grid", "block", "pending")
+
+    def __init__(self, board, version, grid, block):
+        self.board = board
+        self.version = version
+        (self.height, self.width) = board._static_blocking.shape
+        # bytes in thread mode, None in process mode (the data is in block).
+        self.grid = grid
+        self.block = block
+        self.pending = 0
+
+
+class PathFindingService:
+    """
+    .. versionadded:: 1.4.0
+
+    A PathFindingService computes paths in a pool of workers instead of the main
+    thread. It allows dozens of NPCs to look for a path in the same frame without
+    slowing the game down.
+
+    The paths are computed on a snapshot of the passability of the board: a cell can
+    be walked through if it does not contain a non-overlappable item that is not
+    movable (a wall for example). Moving items (NPCs, the player, etc.) are ignored:
+    the path finder handles them when it follows the path. In process mode (the
+    default), the snapshot is stored in shared memory and shared by all the workers.
+    A new snapshot is taken only when the static items of the board change.
+
+    :meth:`submit()` returns a :class:`concurrent.futures.Future`. The
+    :class:`PathFinder` actuators that are given a service use it automatically: they
+    submit a request and keep following their previous path until the new one is
+    ready.
+
+    :param max_workers: The number of workers. If None, it is the number of
+       processors of the machine (for processes).
+    :type max_workers: int
+    :param processes: If True (default), the paths are computed in worker processes.
+       If False, they are computed in worker threads (which frees the main loop but
+       does not use more than one processor). The worker processes require Python
+       3.8 or later.
+    :type processes: bool
+    :raise: :class:`~pygamelib.base.PglException` if processes is True and the shared
+       memory is not available (Python < 3.8).
+
+    Example::
+
+        service = PathFindingService(max_workers=4)
+        for npc in hunters:
+            npc.actuator = PathFinder(game=game, parent=npc, service=service)
+        # When the game is over
+        service.shutdown()
+
+    .. important:: Call :meth:`shutdown()` (or use the service as a context manager)
+       to stop the workers and free the shared memory.
+    """
+
+    def __init__(self, max_workers: Optional[int] = None, processes: bool = True):
+        if max_workers is not None and (
+            type(max_workers) is not int or max_workers < 1
+        ):
+            raise base.PglInvalidTypeException(
+                "PathFindingService(max_workers): max_workers must be a strictly "
+                "positive int."
+            )
+        self.processes = processes
+        if processes:
+            # Fail early if the shared memory is not available.
+            _shared_memory()
+            self._executor = futures.ProcessPoolExecutor(max_workers=max_workers)
+        else:
+            self._executor = futures.ThreadPoolExecutor(max_workers=max_workers)
+        self._snapshots = {}
+        self._retired = []
+        self._lock = threading.Lock()
+
+    def submit(
+        self,
+        board: "engine.Board",
+        start: Tuple[int, int],
+        destination: Tuple[int, int],
+        algorithm: Algorithm = Algorithm.BFS,
+    ) -> futures.Future:
+        """Submit a path request.
+
+        The result of the returned future is the path from start to destination as a
+        list of (row, column) tuples (start and destination included), like
+        :meth:`PathFinder.find_path()`. It is an empty list if the destination cannot
+        be reached.
+
+        :param board: The board to find a path on.
+        :type board: :class:`~pygamelib.engine.Board`
+        :param start: The (row, column) of the start of the path.
+        :type start: tuple
+        :param destination: The (row, column) of the destination.
+        :type destination: tuple
+        :param algorithm: The algorithm to use (Algorithm.BFS, Algorithm.ASTAR or
+           Algorithm.JPS). Algorithm.HPASTAR and Algorithm.DSTARLITE are not supported:
+           their data are kept in the main process.
+        :type algorithm: :class:`~pygamelib.constants.Algorithm`
+        :returns: A future for the path.
+        :rtype: :class:`concurrent.futures.Future`
+        :raise: :class:`~pygamelib.base.PglInvalidTypeException` if start or
+           destination are not (int, int) tuples inside the board, or if the algorithm
+           is not supported.
+
+        Example::
+
+            future = service.submit(board, (npc.row, npc.column), (10, 12))
+            # Later
+            if future.done():
+                path = future.result()
+        """
+        (width, height) = board.size
+        for position in [start, destination]:
+            if (
+                not isinstance(position, (tuple, list))
+                or len(position) != 2
+                or type(position[0]) is not int
+                or type(position[1]) is not int
+                or not 0 <= position[0] < height
+                or not 0 <= position[1] < width
+            ):
+                raise base.PglInvalidTypeException(
+                    "PathFindingService.submit(board, start, destination): start and "
+                    "destination must be (row, column) tuples of int inside the board."
+                )
+        if algorithm not in (Algorithm.BFS, Algorithm.ASTAR, Algorithm.JPS):
+            raise base.PglInvalidTypeException(
+                "PathFindingService.submit(board, start, destination, algorithm): "
+                "algorithm must be Algorithm.BFS, Algorithm.ASTAR or Algorithm.JPS."
+            )
+        start = (start[0], start[1])
+        destination = (destination[0], destination[1])
+        with self._lock:
+            snapshot = self._snapshot(board)
+            snapshot.pending += 1
+        if self.processes:
+            future = self._executor.submit(
+                _shared_grid_path,
+                snapshot.block.name,
+                snapshot.width,
+                snapshot.height,
+                start,
+                destination,
+                algorithm,
+            )
+        else:
+            future = self._executor.submit(
+                _grid_path,
+                snapshot.grid,
+                snapshot.width,
+                snapshot.height,
+                start,
+                destination,
+                algorithm,
+            )
+        future.add_done_callback(lambda f: self._release(snapshot))
+        return future
+
+    def shutdown(self, wait: bool = True) -> None:
+        """Stop the workers and free the shared memory.
+
+        :param wait: If True (default), wait for the pending requests to complete.
+        :type wait: bool
+
+        Example::
+
+            service.shutdown()
+        """
+        if sys.version_info >= (3, 9):
+            self._executor.shutdown(wait=wait, cancel_futures=not wait)
+        else:  # pragma: no cover
+            self._executor.shutdown(wait=wait)
+        with self._lock:
+            for snapshot in list(self._snapshots.values()) + self._retired:
+                self._free(snapshot)
+            self._snapshots.clear()
+            self._retired.clear()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.shutdown()
+
+    def _snapshot(self, board):
+        # Return the current snapshot of a board, take a new one if the board changed.
+        # Must be called with the lock.
+        snapshot = self._snapshots.get(id(board))
+        if (
+            snapshot is not None
+            and snapshot.board is board
+            and snapshot.version == board._terrain_version
+        ):
+            return snapshot
+        data = np.logical_not(board._static_blocking).astype(np.uint8).tobytes()
+        block = None
+        grid = data
+        if self.processes:
+            block = _shared_memory().SharedMemory(create=True, size=max(1, len(data)))
+            block.buf[: len(data)] = data
+            grid = None
+        if snapshot is not None:
+            # The old snapshot is freed when its last request is done.
+            self._retired.append(snapshot)
+            self._free_retired()
+        snapshot = _GridSnapshot(board, board._terrain_version, grid, block)
+        self._snapshots[id(board)] = snapshot
+        return snapshot
+
+    def _release(self, snapshot):
+        with self._lock:
+            snapshot.pending -= 1
+            self._free_retired()
+
+    def _free_retired(self):
+        for snapshot in [s for s in self._retired if s.pending <= 0]:
+            self._free(snapshot)
+            self._retired.remove(snapshot)
+
+    @staticmethod
+    def _free(snapshot):
+        if snapshot.block is not None:
+            snapshot.block.close()
+            snapshot.block.unlink()
+            snapshot.block = None
@@ -1,10 +1,15 @@
 from pygamelib.constants import Direction
 from pygamelib.functions import pgl_isinstance
 import math
+import copy
+import sys
+import threading
+import numpy as np
 from colorama import Fore, Back, Style, init
 from blessed import Terminal
 
 # import time
+from contextlib import contextmanager
 from typing import Any, Optional
 
 __docformat__ = "restructuredtext"
@@ -30,11 +35,20 @@ exceptions.
    pygamelib.base.PglOutOfBoardBoundException
    pygamelib.base.Vector2D
    pygamelib.base.Text
+
+It also provides the :func:`batch_notifications` context manager.
 """
 
 # Initialize terminal colors for colorama.
 init()
 
+# The notifications queued by batch_notifications(), per thread.
+_notification_batch = threading.local()
+# The number of batches currently active in all the threads. It is only used to keep
+# PglBaseObject.notify() fast when no batch is active.
+_active_batches = 0
+_active_batches_lock = threading.Lock()
+
 
 class PglBaseObject(object):
     """The base object of most of the pygamelib's classes.
@@ -65,12 +79,19 @@ class PglBaseObject(object):
     modified to mess up things. It shouldn't be done lightly. You have been warned!
     """
 
+    # The notifications queued while suspend_notifications() is active. None when the
+    # notifications are not suspended.
+    _suspended_notifications = None
+
     def __init__(self) -> None:
         """
         Like the object class, this class constructor takes no parameter.
         """
         super().__init__()
-        self._observers = []
+        # The observers of all the events, indexed by their id().
+        self._observers = {}
+        # The observers of specific events: {event: {id(observer): observer}}
+        self._topic_observers = None
         self._screen_row = -1
         """The absolute row (or y) coordinate on the screen."""
         self._screen_column = -1
@@ -138,6 +159,9 @@ class PglBaseObject(object):
         """
         Notify all the observers that a change occurred.
 
+        The observers that are attached to all the events and the ones that are
+        attached to this specific event (attribute) are notified.
+
         :param modifier: An optional parameter that identify the modifier object to
            exclude it from the notified objects.
         :type modifier: :class:`~pygamelib.base.PglBaseObject`
@@ -155,19 +179,31 @@ class PglBaseObject(object):
            color = Color(255,200,125)
            color.attach(some_text_object)
            color.notify()
+
+        .. versionadded:: 1.4.0
+           Inside a :func:`batch_notifications` block, or while the object's
+           notifications are suspended (see :meth:`suspend_notifications()`), the
+           notification is queued and delivered when the block ends.
         """
-        # Let's get an eventual modifier out of the list so we don't have to add an if
-        # to the for loop.
-        cache = None
-        if modifier in self._observers:
-            cache = self._observers.pop(self._observers.index(modifier))
-        for observer in self._observers:
+        if (
+            _active_batches or self._suspended_notifications is not None
+        ) and self._queue_notification(modifier, attribute, value):
+            return
+        observers = self._observers
+        if self._topic_observers is not None:
+            subscribers = self._topic_observers.get(attribute)
+            if subscribers:
+                observers = {**observers, **subscribers}
+        if not observers:
+            return
+        # Iterate over a copy, the observers might attach or detach objects.
+        if id(modifier) in observers:
+            observers = observers.copy()
+            del observers[id(modifier)]
+        for observer in tuple(observers.values()):
             observer.handle_notification(self, attribute, value)
-        # Restore the cached object
-        if cache is not None:
-            self._observers.append(cache)
 
-    def attach(self, observer):
+    def attach(self, observer, topics=None):
         """
         Attach an observer to this instance. It means that until it is detached, it will
         be notified every time that a notification is issued (usually on changes).
@@ -175,8 +211,20 @@ class PglBaseObject(object):
         An object cannot add itself to the list of observers (to avoid infinite
         recursions).
 
+        .. versionadded:: 1.4.0
+           The topics parameter.
+
+        By default, the observer is notified of all the events. If topics is set, it
+        is only notified of these events (the attribute parameter of
+        :meth:`notify()`). It is a lot cheaper than receiving all the events and
+        filtering them in :meth:`handle_notification()`. Attaching an observer to all
+        the events removes its subscriptions to specific events.
+
         :param observer: An observer to attach to this object.
         :type observer: :class:`~pygamelib.base.PglBaseObject`
+        :param topics: An event name or a list of event names to subscribe to. If None
+           (default), the observer is notified of all the events.
+        :type topics: str | list
 
         :returns: True or False depending on the success of the operation.
         :rtype: bool
@@ -187,21 +235,53 @@ class PglBaseObject(object):
             screen = Game.instance().screen
             # screen will be notified of all changes in myboard
             myboard.attach(screen)
+            # text is only notified of the changes of the red component
+            color.attach(text, "pygamelib.gfx.core.Color.r:changed")
 
         """
-        if observer == self:
+        if observer is self:
+            return False
+        key = id(observer)
+        if key in self._observers:
             return False
-        if observer not in self._observers:
-            self._observers.append(observer)
+        if topics is None:
+            self._observers[key] = observer
+            # The observer receives everything now.
+            if self._topic_observers is not None:
+                self.__unsubscribe(key, list(self._topic_observers.keys()))
             return True
-
-    def detach(self, observer):
+        if isinstance(topics, str):
+            topics = [topics]
+        elif not isinstance(topics, (list, tuple, set, frozenset)) or not all(
+            isinstance(topic, str) for topic in topics
+        ):
+            raise PglInvalidTypeException(
+                "PglBaseObject.attach(observer, topics): topics must be a str or a "
+                "list of str."
+            )
+        if self._topic_observers is None:
+            self._topic_observers = {}
+        added = False
+        for topic in topics:
+            subscribers = self._topic_observers.setdefault(topic, {})
+            if key not in subscribers:
+                subscribers[key] = observer
+                added = True
+        return added
+
+    def detach(self, observer, topics=None):
         """
         Detach an observer from this instance.
         If observer is not in the list this returns False.
 
+        .. versionadded:: 1.4.0
+           The topics parameter.
+
         :param observer: An observer to detach from this object.
         :type observer: :class:`~pygamelib.base.PglBaseObject`
+        :param topics: An event name or a list of event names to unsubscribe from. If
+           None (default), the observer is completely detached.
+        :type topics: str | list
 
         :returns: True or False depending on the success of the operation.
         :rtype: bool
@@ -211,12 +291,99 @@ class PglBaseObject(object):
             # screen will no longer be notified of the changes in myboard.
             myboard.detach(screen)
         """
+        key = id(observer)
+        if topics is None:
+            found = self._observers.pop(key, None) is not None
+            if self._topic_observers is not None:
+                topics = list(self._topic_observers.keys())
+                found = self.__unsubscribe(key, topics) or found
+            return found
+        if isinstance(topics, str):
+            topics = [topics]
+        if self._topic_observers is None:
+            return False
+        return self.__unsubscribe(key, topics)
+
+    def __unsubscribe(self, key, topics):
+        found = False
+        for topic in topics:
+            subscribers = self._topic_observers.get(topic)
+            if subscribers is not None and subscribers.pop(key, None) is not None:
+                found = True
+                if not subscribers:
+                    del self._topic_observers[topic]
+        return found
+
+    def _queue_notification(self, modifier, attribute, value):
+        # Returns False if the notification has to be delivered right away.
+        queue = self._suspended_notifications
+        if queue is None:
+            queue = getattr(_notification_batch, "queue", None)
+            if queue is None:
+                return False
+        # Only the last value of each attribute is delivered, at the position of its
+        # first change.
+        queue[(id(self), attribute)] = (self, modifier, attribute, value)
+        return True
+
+    @contextmanager
+    def suspend_notifications(self):
+        """
+        A context manager that suspends the notifications of this object.
+
+        .. versionadded:: 1.4.0
+
+        The notifications issued by the object inside the with block are queued
+        and delivered when the block ends. They are deduplicated by attribute: if an
+        attribute changes several times, the observers are notified only once, with the
+        last value. The with blocks can be nested, the notifications are delivered
+        when the outermost block ends.
+
+        To batch the notifications of several objects, use
+        :func:`~pygamelib.base.batch_notifications`.
 
+        Example::
+
+            with color.suspend_notifications():
+                color.r = 10
+                color.r = 20
+                color.g = 30
+            # The observers of color are notified once of the change of r (with the
+            # value 20) and once of the change of g.
+        """
+        if self._suspended_notifications is not None:
+            yield self
+            return
+        self._suspended_notifications = {}
         try:
-            self._observers.remove(observer)
-            return True
-        except ValueError:
-            return False
+            yield self
+        finally:
+            queue = self._suspended_notifications
+            del self._suspended_notifications
+            # If a batch is active, the notifications are moved to it.
+            for (subject, modifier, attribute, value) in queue.values():
+                subject.notify(modifier, attribute, value)
+
+    def __setstate__(self, state):
+        # The observers are indexed by their id(), so the indexes have to be rebuilt
+        # when the object is copied (or unpickled).
+        slots = None
+        if isinstance(state, tuple):
+            (state, slots) = state
+        if state:
+            self.__dict__.update(state)
+        if slots:
+            for (name, value) in slots.items():
+                setattr(self, name, value)
+        observers = self.__dict__.get("_observers")
+        if observers:
+            self._observers = {id(o): o for o in observers.values()}
+        topic_observers = self.__dict__.get("_topic_observers")
+        if topic_observers:
+            self._topic_observers = {
+                topic: {id(o): o for o in subscribers.values()}
+                for (topic, subscribers) in topic_observers.items()
+            }
 
     def handle_notification(self, subject, attribute=None, value=None):
         """
@@ -241,6 +408,50 @@ class PglBaseObject(object):
         pass
 
 
+@contextmanager
+def batch_notifications():
+    """
+    A context manager that batches the notifications of all the objects.
+
+    .. versionadded:: 1.4.0
+
+    The notifications issued inside the with block (by the current thread) are queued
+    and delivered when the block ends. They are deduplicated by (subject, attribute):
+    if the same attribute of an object changes several times, its observers are
+    notified only once, with the last value. The notifications are delivered in the
+    order of the first change of each attribute.
+
+    This is useful for bulk changes: each notification usually leads to an update of
+    the observers (color caches rebuild, screen refresh, etc.).
+    The with blocks can be nested, the notifications are delivered when the outermost
+    block ends.
+
+    Example::
+
+        with base.batch_notifications():
+            for sprixel in sprite.sprixels():
+                sprixel.bg_color.r = 0
+                sprixel.bg_color.r = 255
+        # The observers of each color are notified once here.
+    """
+    global _active_batches
+    if getattr(_notification_batch, "queue", None) is not None:
+        yield
+        return
+    _notification_batch.queue = {}
+    with _active_batches_lock:
+        _active_batches += 1
+    try:
+        yield
+    finally:
+        queue = _notification_batch.queue
+        _notification_batch.queue = None
+        with _active_batches_lock:
+            _active_batches -= 1
+        for (subject, modifier, attribute, value) in queue.values():
+            subject.notify(modifier, attribute, value)
+
+
 class Console:
     __instance = None
 
@@ -287,6 +498,16 @@ class Text(PglBaseObject):
     game :class:`~pygamelib.engine.Board`.
     """
 
+    # The events of the colors that change the rendering of the text.
+    _COLOR_EVENTS = (
+        "pygamelib.gfx.core.Color.r:changed",
+        "pygamelib.gfx.core.Color.g:changed",
+        "pygamelib.gfx.core.Color.b:changed",
+    )
+    # When the colors change, the color cache is rebuilt on the next rendering only.
+    # Changing the 3 components of a color does not rebuild it 3 times.
+    __color_cache_dirty = False
+
     def __init__(self, text="", fg_color=None, bg_color=None, style="", font=None):
         """
         :param text: The text to manipulate
@@ -315,7 +536,7 @@ class Text(PglBaseObject):
         if fg_color is None or pgl_isinstance(fg_color, "pygamelib.gfx.core.Color"):
             self.__fg_color = fg_color
             if fg_color is not None:
-                fg_color.attach(self)
+                fg_color.attach(self, Text._COLOR_EVENTS)
         else:
             raise PglInvalidTypeException(
                 "Text(text, bg_color, fg_color, style): fg_color needs to be a "
@@ -324,7 +545,7 @@ class Text(PglBaseObject):
         if bg_color is None or pgl_isinstance(bg_color, "pygamelib.gfx.core.Color"):
             self.__bg_color = bg_color
             if bg_color is not None:
-                bg_color.attach(self)
+                bg_color.attach(self, Text._COLOR_EVENTS)
         else:
             raise PglInvalidTypeException(
                 "Text(text, bg_color, fg_color, style): bg_color needs to be a "
@@ -411,12 +632,8 @@ class Text(PglBaseObject):
         return obj
 
     def handle_notification(self, target, attribute=None, value=None):
-        if (
-            attribute == "pygamelib.gfx.core.Color.r:changed"
-            or attribute == "pygamelib.gfx.core.Color.g:changed"
-            or attribute == "pygamelib.gfx.core.Color.b:changed"
-        ):
-            self.__build_color_cache()
+        if attribute in Text._COLOR_EVENTS:
+            self.__color_cache_dirty = True
 
     @property
     def text(self):
@@ -458,7 +675,7 @@ class Text(PglBaseObject):
             if self.__bg_color is not None:
                 self.__bg_color.detach(self)
             self.__bg_color = value
-            self.__bg_color.attach(self)
+            self.__bg_color.attach(self, Text._COLOR_EVENTS)
             self.notify(self, "pygamelib.base.Text.bg_color:changed", value)
         elif value is None:
             if self.__bg_color is not None:
@@ -492,7 +709,7 @@ class Text(PglBaseObject):
             if self.__fg_color is not None:
                 self.__fg_color.detach(self)
             self.__fg_color = value
-            self.__fg_color.attach(self)
+            self.__fg_color.attach(self, Text._COLOR_EVENTS)
             self.notify(self, "pygamelib.base.Text.fg_color:changed", value)
         elif value is None:
             if self.__fg_color is not None:
@@ -518,8 +735,11 @@ class Text(PglBaseObject):
             self.fg_color, "pygamelib.gfx.core.Color"
         ):
             self.__fgcc = t.color_rgb(self.fg_color.r, self.fg_color.g, self.fg_color.b)
+        self.__color_cache_dirty = False
 
     def __repr__(self):
+        if self.__color_cache_dirty:
+            self.__build_color_cache()
         return "".join([self.__bgcc, self.__fgcc, self.style, self.text, "\x1b[0m"])
 
     def __str__(self):
@@ -622,6 +842,8 @@ class Text(PglBaseObject):
         :type width: int
 
         """
+        if self.__color_cache_dirty:
+            self.__build_color_cache()
         row_idx = 0
         # Here we have some duplicate code. The reason is optimization.
         # If we were to test if the font is set or not in the loop, we would execute
@@ -1450,6 +1672,243 @@ class Math(object):
         return (1 - t) * a + t * b
 
 
+# Sentinel returned by _history_diff() when there's no difference.
+_UNCHANGED = object()
+# The step from an object to its attributes in the paths of _history_diff().
+_ATTRIBUTES = object()
+
+
+class _HistoryDiffMemo:
+    # The containers visited by _history_diff().
+    def __init__(self):
+        # id of the containers of old -> (id of their counterpart in new, delta)
+        self.deltas = {}
+        # id of the containers of new -> (container, path from the root of new)
+        self.paths = {}
+
+
+class _HistoryReference:
+    # Stands for a container of the new state in the copy stored by a delta. It is
+    # replaced by the object found at path in the reconstructed state.
+    __slots__ = ("path",)
+
+    def __init__(self, path):
+        self.path = path
+
+
+class _HistoryCopyMemo(dict):
+    # A copy.deepcopy() memo that references the containers already visited by
+    # _history_diff() instead of copying them. Otherwise, the copy of a new item
+    # would drag a copy of the whole board it belongs to.
+    def __init__(self, paths):
+        super().__init__()
+        self.paths = paths
+        self.references = []
+
+    def get(self, key, default=None):
+        if key in self:
+            return self[key]
+        visited = self.paths.get(key)
+        if visited is None:
+            return default
+        reference = _HistoryReference(visited[1])
+        self[key] = reference
+        self.references.append(reference)
+        return reference
+
+
+def _history_copy(value, memo, path=None):
+    # A "r" delta: replace by a copy of value. If the path of value in the new state
+    # is given, the next copies can reference it.
+    copy_memo = _HistoryCopyMemo(memo.paths)
+    delta = ("r", copy.deepcopy(value, copy_memo), copy_memo.references)
+    if path is not None:
+        _history_register(value, memo, path)
+    return delta
+
+
+def _history_register(value, memo, path):
+    # Make value (at path in the new state) referenceable by the next copies.
+    if isinstance(value, (dict, list, set, np.ndarray)) or (
+        hasattr(value, "__dict__") and not isinstance(value, type)
+    ):
+        memo.paths.setdefault(id(value), (value, path))
+
+
+def _history_diff(old, new, memo, path=()):
+    # Return a forward structural delta that transforms old into new (see
+    # _history_apply()), or _UNCHANGED. memo is a _HistoryDiffMemo: it protects
+    # against reference cycles and keeps the shared objects consistent. path is the
+    # path of new from the root of the new state.
+    if old is new:
+        return _UNCHANGED
+    if type(old) is not type(new):
+        return _history_copy(new, memo, path)
+    if isinstance(new, np.ndarray):
+        if old.shape != new.shape or old.dtype != new.dtype:
+            return _history_copy(new, memo, path)
+        if new.dtype != object:
+            changes = np.flatnonzero(old != new)
+            if changes.size == 0:
+                return _UNCHANGED
+            return ("a", changes, new.ravel()[changes].copy())
+    elif isinstance(new, (str, bytes)):
+        if old == new:
+            return _UNCHANGED
+        # Keep the common prefix and suffix, store the middle.
+        limit = min(len(old), len(new))
+        prefix = 0
+        while prefix < limit and old[prefix] == new[prefix]:
+            prefix += 1
+        suffix = 0
+        while (
+            suffix < limit - prefix
+            and old[len(old) - 1 - suffix] == new[len(new) - 1 - suffix]
+        ):
+            suffix += 1
+        return ("s", prefix, suffix, new[prefix : len(new) - suffix])
+    elif not isinstance(new, (dict, list)) and (
+        not hasattr(new, "__dict__") or isinstance(new, type)
+    ):
+        try:
+            if old == new:
+                return _UNCHANGED
+        except Exception:  # pragma: no cover
+            pass
+        return _history_copy(new, memo, path)
+    visited = memo.deltas.get(id(old))
+    if visited is not None:
+        if visited[0] == id(new):
+            # A reference cycle (the delta is still being built) or the same objects
+            # referenced from several places: the same delta is applied only once to
+            # each object (see _history_apply()).
+            return visited[1]
+        # old is shared by several parents but its counterparts are different
+        # objects: it cannot be modified in place.
+        return _history_copy(new, memo, path)
+    memo.deltas[id(old)] = (id(new), _UNCHANGED)
+    memo.paths.setdefault(id(new), (new, path))
+    if isinstance(new, np.ndarray):
+        # An array of objects (like the matrix of a Board): element by element.
+        changes = {}
+        for (i, (o, n)) in enumerate(zip(old.flat, new.flat)):
+            d = _history_diff(o, n, memo, path + (i,))
+            if d is not _UNCHANGED:
+                changes[i] = d
+        delta = ("e", changes) if len(changes) > 0 else _UNCHANGED
+    elif isinstance(new, dict):
+        changes = {}
+        for k, v in new.items():
+            if k in old:
+                d = _history_diff(old[k], v, memo, path + (k,))
+                if d is not _UNCHANGED:
+                    changes[k] = d
+            else:
+                changes[k] = _history_copy(v, memo, path + (k,))
+        removed = [k for k in old.keys() if k not in new]
+        if len(changes) == 0 and len(removed) == 0:
+            delta = _UNCHANGED
+        else:
+            delta = ("d", changes, removed)
+    elif isinstance(new, list):
+        changes = {}
+        common = min(len(old), len(new))
+        for i in range(common):
+            d = _history_diff(old[i], new[i], memo, path + (i,))
+            if d is not _UNCHANGED:
+                changes[i] = d
+        if len(changes) == 0 and len(old) == len(new):
+            delta = _UNCHANGED
+        else:
+            delta = ("l", changes, common, _history_copy(new[common:], memo))
+            for i in range(common, len(new)):
+                _history_register(new[i], memo, path + (i,))
+    else:
+        delta = _history_diff(
+            old.__dict__, new.__dict__, memo, path + (_ATTRIBUTES,)
+        )
+        if delta is not _UNCHANGED:
+            delta = ("o", delta)
+    memo.deltas[id(old)] = (id(new), delta)
+    return delta
+
+
+def _history_resolve(root, path):
+    # Return the object at path (see _history_diff()) from root.
+    value = root
+    for key in path:
+        if key is _ATTRIBUTES:
+            value = value.__dict__
+        elif isinstance(value, np.ndarray):
+            value = value.flat[key]
+        else:
+            value = value[key]
+    return value
+
+
+def _history_apply(value, delta, applied=None, root=None):
+    # Apply a delta created by _history_diff() to value and return the result. Mutable
+    # containers are modified in place. applied holds the (object, delta) pairs
+    # already applied: a delta shared by several parents is applied once per object.
+    # root is the root of the state (value at the top level call).
+    if applied is None:
+        (applied, root) = (set(), value)
+    kind = delta[0]
+    if kind == "r":
+        return copy.deepcopy(
+            delta[1], {id(r): _history_resolve(root, r.path) for r in delta[2]}
+        )
+    elif kind == "s":
+        (_, prefix, suffix, middle) = delta
+        return value[:prefix] + middle + value[len(value) - suffix :]
+    if (id(value), id(delta)) in applied:
+        return value
+    applied.add((id(value), id(delta)))
+    if kind == "a":
+        value.flat[delta[1]] = delta[2]
+    elif kind == "e":
+        for (i, d) in delta[1].items():
+            index = np.unravel_index(i, value.shape)
+            value[index] = _history_apply(value[index], d, applied, root)
+    elif kind == "d":
+        for k in delta[2]:
+            del value[k]
+        for k, d in delta[1].items():
+            value[k] = _history_apply(value.get(k), d, applied, root)
+    elif kind == "l":
+        for i, d in delta[1].items():
+            value[i] = _history_apply(value[i], d, applied, root)
+        del value[delta[2] :]
+        value.extend(_history_apply(None, delta[3], applied, root))
+    else:
+        # "o": an object's attributes
+        _history_apply(value.__dict__, delta[1], applied, root)
+    return value
+
+
+def _estimate_size(obj, seen=None):
+    # Rough estimation of the memory used by an object and everything it references.
+    if seen is None:
+        seen = set()
+    if id(obj) in seen:
+        return 0
+    seen.add(id(obj))
+    if isinstance(obj, np.ndarray):
+        if obj.dtype == object:
+            return obj.nbytes + sum([_estimate_size(o, seen) for o in obj.flat])
+        return obj.nbytes
+    size = sys.getsizeof(obj)
+    if isinstance(obj, dict):
+        for k, v in obj.items():
+            size += _estimate_size(k, seen) + _estimate_size(v, seen)
+    elif isinstance(obj, (list, tuple, set, frozenset)):
+        for v in obj:
+            size += _estimate_size(v, seen)
+    elif hasattr(obj, "__dict__") and not isinstance(obj, type):
+        size += _estimate_size(obj.__dict__, seen)
+    return size
+
+
 class History:
     """
     .. versionadded:: 1.4.0
@@ -1500,14 +1959,82 @@ class History:
 
     __instance = None
 
-    def __init__(self) -> None:
+    def __init__(
+        self,
+        delta: bool = False,
+        keyframe_interval: Optional[int] = None,
+        max_memory: Optional[int] = None,
+    ) -> None:
         """
-        The constructor takes no parameters. In the future, it could take some, like
-        the maximum size of the history for example.
+        By default, the History stores every action as is. This is perfect for small
+        actions (like the content of a :class:`~pygamelib.gfx.ui.LineInput`) but when
+        big states (like a board or a sprite) are pushed over and over, the memory
+        grows with the full size of the state for each action.
+
+        In delta mode, the History stores a deep copy of the first action and then
+        only the structural differences (deltas) between each action and the
+        previous one. Dictionaries, lists, strings, numpy arrays (including arrays of
+        objects, like the matrix of a :class:`~pygamelib.engine.Board`) and the
+        attributes of objects are compared recursively. The new objects are stored
+        without the objects of the state they reference (like the board of an item).
+        The actions are then reconstructed on demand when undoing or redoing.
+        Periodic keyframes (full copies) can be used to bound the reconstruction time
+        and a memory cap can be set to automatically forget the oldest actions.
+
+        :param delta: Enable the delta mode. Default: False.
+        :type delta: bool
+        :param keyframe_interval: In delta mode, store a full copy of the action every
+           keyframe_interval actions. If None (default), only the oldest action is a
+           full copy.
+        :type keyframe_interval: int
+        :param max_memory: In delta mode, the (estimated) maximum amount of memory in
+           bytes used by the history. When it is exceeded, the oldest actions are
+           evicted (but never the current one). If None (default), there's no limit.
+        :type max_memory: int
+
+        .. versionchanged:: 1.4.0
+           Added the delta, keyframe_interval and max_memory parameters.
+
+        Example::
+
+            history = History(delta=True, keyframe_interval=50, max_memory=2**24)
+            history.add(board_state)
+
+        .. important:: In delta mode, the actions are copied when they are added (so
+           you can keep modifying the same object and add it again), and undo()/redo()
+           give you a reconstructed copy of the action, not the original object.
         """
+        if keyframe_interval is not None and (
+            type(keyframe_interval) is not int or keyframe_interval < 1
+        ):
+            raise PglInvalidTypeException(
+                "History(keyframe_interval): keyframe_interval must be a strictly "
+                "positive int."
+            )
+        if max_memory is not None and type(max_memory) is not int:
+            raise PglInvalidTypeException(
+                "History(max_memory): max_memory must be an int."
+            )
+        self.__delta = delta
+        self.__keyframe_interval = keyframe_interval
+        self.__max_memory = max_memory
         self.__past_actions = []
         self.__current_action = None
         self.__future_actions = []
+        self.__reset_timeline()
+
+    def __reset_timeline(self):
+        # Delta mode: the timeline is a list of entries that are either a keyframe
+        # ("k", full copy) or a delta ("d", delta from the previous entry). Each entry
+        # has an estimated size and position is the index of the current action.
+        self.__timeline = [("k", None)]
+        self.__sizes = [0]
+        self.__memory = 0
+        self.__since_keyframe = [0]
+        self.__position = 0
+        # A pristine copy of the current action (None if it has to be reconstructed)
+        self.__snapshot = None
+        self.__snapshot_valid = True
 
     @classmethod
     def instance(cls, *args, **kwargs):
@@ -1541,11 +2068,72 @@ class History:
             global_history.add('Hello')
             print(global_history.current)  # print "Hello"
         """
+        if self.__delta:
+            self.__add_delta(action)
+            return
         self.__past_actions.append(self.__current_action)
         self.__current_action = action
         if len(self.__future_actions) > 0:
             self.__future_actions.clear()
 
+    def __add_delta(self, action):
+        # Forget the future
+        self.__memory -= sum(self.__sizes[self.__position + 1 :])
+        del self.__timeline[self.__position + 1 :]
+        del self.__sizes[self.__position + 1 :]
+        del self.__since_keyframe[self.__position + 1 :]
+        if not self.__snapshot_valid:
+            self.__snapshot = self.__reconstruct(self.__position)
+        snapshot = copy.deepcopy(action)
+        since_keyframe = self.__since_keyframe[self.__position] + 1
+        if (
+            self.__keyframe_interval is not None
+            and since_keyframe >= self.__keyframe_interval
+        ):
+            entry = ("k", snapshot)
+            since_keyframe = 0
+        else:
+            entry = ("d", _history_diff(self.__snapshot, action, _HistoryDiffMemo()))
+        self.__timeline.append(entry)
+        self.__sizes.append(_estimate_size(entry[1]))
+        self.__memory += self.__sizes[-1]
+        self.__since_keyframe.append(since_keyframe)
+        self.__position += 1
+        self.__snapshot = snapshot
+        self.__snapshot_valid = True
+        self.__current_action = action
+        self.__evict()
+
+    def __reconstruct(self, index):
+        # Rebuild the action at index from the closest keyframe.
+        start = index
+        while self.__timeline[start][0] != "k":
+            start -= 1
+        state = copy.deepcopy(self.__timeline[start][1])
+        for i in range(start + 1, index + 1):
+            if self.__timeline[i][1] is not _UNCHANGED:
+                state = _history_apply(state, self.__timeline[i][1])
+        return state
+
+    def __evict(self):
+        # Evict the oldest actions until the memory usage is under max_memory.
+        if self.__max_memory is None:
+            return
+        while self.__memory > self.__max_memory and self.__position > 0:
+            # The next entry becomes the oldest one, it needs to be a keyframe.
+            if self.__timeline[1][0] != "k":
+                state = self.__reconstruct(1)
+                self.__timeline[1] = ("k", state)
+                self.__memory -= self.__sizes[1]
+                self.__sizes[1] = _estimate_size(state)
+                self.__memory += self.__sizes[1]
+                self.__since_keyframe[1] = 0
+            del self.__timeline[0]
+            self.__memory -= self.__sizes[0]
+            del self.__sizes[0]
+            del self.__since_keyframe[0]
+            self.__position -= 1
+
     def undo(self) -> None:
         """Step backward into the actions' timeline.
 
@@ -1563,6 +2151,12 @@ class History:
             global_history.undo()
             print(global_history.current)  # print "Hel"
         """
+        if self.__delta:
+            if self.__position > 0:
+                self.__position -= 1
+                self.__current_action = self.__reconstruct(self.__position)
+                self.__snapshot_valid = False
+            return
         if len(self.__past_actions) <= 0:
             return
         self.__future_actions.append(self.__current_action)
@@ -1588,6 +2182,12 @@ class History:
             print(global_history.current)  # print "Hello"
 
         """
+        if self.__delta:
+            if self.__position < len(self.__timeline) - 1:
+                self.__position += 1
+                self.__current_action = self.__reconstruct(self.__position)
+                self.__snapshot_valid = False
+            return
         if len(self.__future_actions) <= 0:
             return
         self.__past_actions.append(self.__current_action)
@@ -1601,6 +2201,32 @@ class History:
         self.__past_actions = []
         self.__current_action = None
         self.__future_actions = []
+        self.__reset_timeline()
+
+    @property
+    def memory_usage(self) -> int:
+        """
+        memory_usage is a read-only property that gives an estimation (in bytes) of the
+        memory used by the actions stored in the history.
+
+        .. versionadded:: 1.4.0
+
+        Example::
+
+            if history.memory_usage > 2**20:
+                print("More than 1 MB of history!")
+        """
+        if self.__delta:
+            return self.__memory
+        seen = set()
+        return sum(
+            [
+                _estimate_size(a, seen)
+                for a in self.__past_actions
+                + [self.__current_action]
+                + self.__future_actions
+            ]
+        )
 
     @property
     def current(self) -> object:
@@ -1610,3 +2236,362 @@ class History:
         To add an action and set it as current, use the :py:meth:`add()` method.
         """
         return self.__current_action
+
+
+class Timer:
+    """
+    .. versionadded:: 1.4.0
+
+    A Timer is the handle of a callback scheduled with a :class:`Scheduler`. You do
+    not create it directly, it is returned by :meth:`Scheduler.call_later()` and
+    :meth:`Scheduler.call_every()`.
+
+    It can be used to cancel the callback, and to know when it is going to be called
+    next.
+
+    Example::
+
+        timer = game.scheduler.call_every(0.5, blink, cursor)
+        # later
+        timer.cancel()
+    """
+
+    __slots__ = (
+        "_scheduler",
+        "_tick",
+        "deadline",
+        "interval",
+        "callback",
+        "args",
+        "kwargs",
+        "cancelled",
+    )
+
+    def __init__(self, scheduler, deadline, interval, callback, args, kwargs):
+        self._scheduler = scheduler
+        # The tick of the wheel at which the timer expires.
+        self._tick = 0
+        #: The time (on the scheduler clock) at which the callback is going to be
+        #: called.
+        self.deadline = deadline
+        #: The interval between 2 calls of a periodic timer (None for a one-shot
+        #: timer).
+        self.interval = interval
+        self.callback = callback
+        self.args = args
+        self.kwargs = kwargs
+        #: True if the timer was cancelled.
+        self.cancelled = False
+
+    @property
+    def active(self) -> bool:
+        """Tell if the timer is still waiting to be called (read only).
+
+        :rtype: bool
+        """
+        return not self.cancelled and self._scheduler is not None
+
+    def cancel(self) -> None:
+        """Cancel the timer. The callback is not going to be called anymore.
+
+        Cancelling a timer that already expired (or was already cancelled) does
+        nothing.
+
+        Example::
+
+            timer.cancel()
+        """
+        if self.active:
+            self.cancelled = True
+            self._scheduler._pending -= 1
+
+    def __lt__(self, other):
+        return self.deadline < other.deadline
+
+
+class Scheduler:
+    """
+    .. versionadded:: 1.4.0
+
+    The Scheduler calls functions after a delay or periodically. It is a replacement
+    for the timers that are usually built by accumulating the elapsed time in the
+    update function, which requires polling every timer at every frame.
+
+    The Scheduler has its own clock, that only moves forward when :meth:`update()` is
+    called with the elapsed time. Therefore, the timers are paused when the game is
+    paused and they work the same way in real time and in fixed timestep mode. The
+    :class:`~pygamelib.engine.Game` object owns a Scheduler (Game.scheduler) and
+    updates it at every frame of its main loop.
+
+    Internally, the timers are stored in a hierarchical timer wheel: the first wheel
+    holds the timers that expire in the next 256 ticks (of resolution seconds), the
+    next wheels hold the timers that expire later with a coarser granularity. A timer
+    is moved to a finer wheel when its time approaches. The cost of an update is
+    proportional to the number of ticks elapsed and to the number of timers that are
+    due, not to the number of pending timers. The timers are called in the order of
+    their deadlines.
+
+    Example::
+
+        def spawn(game, row, column):
+            game.add_npc(game.current_level, board_items.NPC(), row, column)
+
+        game.scheduler.call_later(2.5, spawn, game, 10, 10)
+        blink = game.scheduler.call_every(0.5, cursor.toggle)
+        # Stop blinking
+        blink.cancel()
+    """
+
+    # Number of bits (i.e the size) of each wheel. The first wheel is the finest.
+    _WHEEL_BITS = (8, 6, 6, 6)
+
+    def __init__(self, resolution: float = 0.01) -> None:
+        """
+        :param resolution: The duration of a tick of the scheduler in seconds. It is
+           the precision of the timers. Default: 0.01.
+        :type resolution: float
+
+        Example::
+
+            scheduler = Scheduler(resolution=0.005)
+        """
+        if type(resolution) not in [int, float] or resolution <= 0:
+            raise PglInvalidTypeException(
+                "Scheduler(resolution): resolution must be a positive number."
+            )
+        self.resolution = resolution
+        self._time = 0.0
+        self._tick = 0
+        self._pending = 0
+        self._wheels = [[[] for _ in range(1 << bits)] for bits in self._WHEEL_BITS]
+        # The number of timers in each wheel.
+        self._counts = [0] * len(self._WHEEL_BITS)
+        # Timers that are too far in the future for the wheels.
+        self._overflow = []
+        # The position of the first bit of each wheel in the tick count.
+        self._shifts = []
+        shift = 0
+        for bits in self._WHEEL_BITS:
+            self._shifts.append(shift)
+            shift += bits
+        self._span_bits = shift
+        self._span = 1 << shift
+
+    @property
+    def time(self) -> float:
+        """The current time of the scheduler clock in seconds (read only).
+
+        :rtype: float
+        """
+        return self._time
+
+    def __len__(self) -> int:
+        return self._pending
+
+    def call_later(self, delay: float, callback, *args, **kwargs) -> Timer:
+        """Call a function once, after a delay.
+
+        The extra positional and keyword arguments are passed to the callback.
+
+        :param delay: The delay in seconds.
+        :type delay: float
+        :param callback: The function to call.
+        :type callback: callable
+        :returns: The handle of the timer.
+        :rtype: :class:`Timer`
+        :raise: :class:`PglInvalidTypeException` if delay is not a positive number or
+           if callback is not callable.
+
+        Example::
+
+            game.scheduler.call_later(3, game.change_level, 2)
+        """
+        if type(delay) not in [int, float] or delay < 0:
+            raise PglInvalidTypeException(
+                "Scheduler.call_later(delay, callback): delay must be a positive "
+                "number."
+            )
+        return self._add(delay, None, callback, args, kwargs, "call_later")
+
+    def call_every(self, interval: float, callback, *args, **kwargs) -> Timer:
+        """Call a function periodically.
+
+        The callback is first called after interval seconds, and then every interval
+        seconds until the timer is cancelled. The deadlines do not drift: they are
+        always a multiple of interval after the first call.
+
+        The extra positional and keyword arguments are passed to the callback.
+
+        :param interval: The interval between 2 calls in seconds. It must be greater
+           than 0.
+        :type interval: float
+        :param callback: The function to call.
+        :type callback: callable
+        :returns: The handle of the timer.
+        :rtype: :class:`Timer`
+        :raise: :class:`PglInvalidTypeException` if interval is not a strictly
+           positive number or if callback is not callable.
+
+        Example::
+
+            regen = game.scheduler.call_every(1.0, player.heal, 1)
+        """
+        if type(interval) not in [int, float] or interval <= 0:
+            raise PglInvalidTypeException(
+                "Scheduler.call_every(interval, callback): interval must be a strictly "
+                "positive number."
+            )
+        return self._add(interval, interval, callback, args, kwargs, "call_every")
+
+    def cancel(self, timer: Timer) -> None:
+        """Cancel a timer. This is the same as calling :meth:`Timer.cancel()`.
+
+        :param timer: The timer to cancel.
+        :type timer: :class:`Timer`
+
+        Example::
+
+            game.scheduler.cancel(timer)
+        """
+        if not isinstance(timer, Timer):
+            raise PglInvalidTypeException(
+                "Scheduler.cancel(timer): timer must be a Timer."
+            )
+        timer.cancel()
+
+    def clear(self) -> None:
+        """Cancel all the pending timers.
+
+        Example::
+
+            game.scheduler.clear()
+        """
+        for wheel in self._wheels:
+            for slot in wheel:
+                for timer in slot:
+                    timer._scheduler = None
+                slot.clear()
+        self._counts = [0] * len(self._wheels)
+        for timer in self._overflow:
+            timer._scheduler = None
+        self._overflow.clear()
+        self._pending = 0
+
+    def update(self, elapsed_time: float) -> int:
+        """Move the clock forward and call the callbacks that are due.
+
+        The :class:`~pygamelib.engine.Game` object calls this method at every frame
+        (or every tick in fixed timestep mode), you only need to call it if you use
+        a Scheduler of your own.
+
+        :param elapsed_time: The time elapsed since the last update in seconds.
+        :type elapsed_time: float
+        :returns: The number of callbacks that were called.
+        :rtype: int
+
+        Example::
+
+            scheduler.update(elapsed)
+        """
+        self._time += elapsed_time
+        target = int(self._time / self.resolution)
+        due = []
+        wheel0 = self._wheels[0]
+        mask0 = len(wheel0) - 1
+        counts = self._counts
+        while self._tick < target:
+            # If the finest wheels are empty, nothing can expire before the next turn
+            # of the first wheel that is not empty: jump there directly.
+            level = 0
+            while level < len(counts) and counts[level] == 0:
+                level += 1
+            if level == len(counts) and not self._overflow:
+                self._tick = target
+                break
+            if level > 0:
+                shift = self._shifts[level] if level < len(counts) else self._span_bits
+                tick = ((self._tick >> shift) + 1) << shift
+                if tick > target:
+                    self._tick = target
+                    break
+                self._tick = tick
+            else:
+                self._tick += 1
+            index = self._tick & mask0
+            if index == 0:
+                self._cascade(1)
+            slot = wheel0[index]
+            if slot:
+                counts[0] -= len(slot)
+                due.extend(slot)
+                slot.clear()
+        count = 0
+        if due:
+            due.sort()
+            for timer in due:
+                if timer.cancelled:
+                    continue
+                if timer.interval is None:
+                    timer._scheduler = None
+                    self._pending -= 1
+                else:
+                    timer.deadline += timer.interval
+                    self._arm(timer)
+                timer.callback(*timer.args, **timer.kwargs)
+                count += 1
+        return count
+
+    def _add(self, delay, interval, callback, args, kwargs, caller):
+        if not callable(callback):
+            raise PglInvalidTypeException(
+                f"Scheduler.{caller}(): callback must be callable."
+            )
+        timer = Timer(self, self._time + delay, interval, callback, args, kwargs)
+        self._pending += 1
+        self._arm(timer)
+        return timer
+
+    def _arm(self, timer):
+        # The timer expires at the first tick that is at or after its deadline, but
+        # never in the past (it would never be reached).
+        timer._tick = max(math.ceil(timer.deadline / self.resolution), self._tick + 1)
+        self._schedule(timer)
+
+    def _schedule(self, timer):
+        tick = timer._tick
+        delta = tick - self._tick
+        if delta >= self._span:
+            self._overflow.append(timer)
+            return
+        for level in range(len(self._wheels) - 1, -1, -1):
+            shift = self._shifts[level]
+            # A timer goes in the coarsest wheel in which it is not in the current
+            # slot.
+            if level == 0 or (tick >> shift) != (self._tick >> shift):
+                wheel = self._wheels[level]
+                wheel[(tick >> shift) & (len(wheel) - 1)].append(timer)
+                self._counts[level] += 1
+                return
+
+    def _cascade(self, level):
+        # Move the timers of the current slot of a wheel to the finer wheels. It is
+        # called when all the lower wheels did a full turn.
+        if level >= len(self._wheels):
+            overflow = self._overflow
+            self._overflow = []
+            for timer in overflow:
+                if not timer.cancelled:
+                    self._schedule(timer)
+            return
+        wheel = self._wheels[level]
+        index = (self._tick >> self._shifts[level]) & (len(wheel) - 1)
+        if index == 0:
+            self._cascade(level + 1)
+        slot = wheel[index]
+        if slot:
+            timers = list(slot)
+            self._counts[level] -= len(timers)
+            slot.clear()
+            for timer in timers:
+                if not timer.cancelled:
+                    self._schedule(timer)
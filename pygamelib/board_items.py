@@ -37,6 +37,7 @@ from pygamelib.constants import Direction, Permission
 from pygamelib.gfx import core
 from pygamelib import actuators
 from pygamelib.functions import pgl_isinstance
+import numpy as np
 
 
 class BoardItem(base.PglBaseObject):
@@ -1016,6 +1017,33 @@ class BoardComplexItem(BoardItem):
                     )
                     self._item_matrix[row][col].parent = self
         self._size = self.__sprite.size
+        self._footprint = np.array(
+            [
+                [not isinstance(i, BoardItemVoid) for i in row]
+                for row in self._item_matrix
+            ],
+            dtype=bool,
+        ).reshape((self._size[1], self._size[0]))
+
+    @property
+    def footprint(self):
+        """A read-only property that gives the footprint mask of the complex item.
+
+        .. versionadded:: 1.4.0
+
+        The footprint is a 2D numpy array of booleans (of shape [HEIGHT, WIDTH]) that is
+        True for each cell that is actually occupied by a component of the item (i.e
+        not a BoardItemVoid coming from the null_sprixel). It is computed when the
+        sprite is updated and used by the board for fast collision detection.
+
+        :rtype: numpy.ndarray
+
+        Example::
+
+            # Number of cells actually occupied by the item
+            print(item.footprint.sum())
+        """
+        return self._footprint
 
     def item(self, row, column):
         """
@@ -1149,6 +1177,9 @@ class Movable(BoardItem):
     BoardItem.overlappable()
     """
 
+    # The number of times the movement_speed of a Movable was changed.
+    _movement_speed_changes = 0
+
     def __init__(
         self,
         step: int = None,
@@ -1170,9 +1201,9 @@ class Movable(BoardItem):
         self.step = 1
         if step is not None:
             self.step = step
-        self.movement_speed = 1.0
+        self._movement_speed = 1.0
         if movement_speed is not None:
-            self.movement_speed = movement_speed
+            self._movement_speed = movement_speed
 
         self._movement_vector = base.Vector2D(self.step_vertical, self.step_horizontal)
         self._accumulator = base.Vector2D(0.0, 0.0)
@@ -1209,6 +1240,23 @@ class Movable(BoardItem):
                 "Movable.dtmove(value): value needs to be an int or float."
             )
 
+    @property
+    def movement_speed(self):
+        """The time (in seconds) between 2 movements of the Movable (only used in
+        MODE_RT).
+
+        .. versionchanged:: 1.4.0
+           It is a property: the game takes a new movement speed into account
+           immediately (for haste or slow effects for example).
+        """
+        return self._movement_speed
+
+    @movement_speed.setter
+    def movement_speed(self, value):
+        self._movement_speed = value
+        # The NPC move queues of the Game re-key their NPCs when this count changes.
+        Movable._movement_speed_changes += 1
+
     def serialize(self) -> dict:
         """Serialize the Immovable object.
 
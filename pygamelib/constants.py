@@ -115,6 +115,22 @@ class Algorithm(enum.IntEnum):
 
     BFS = 90000100
     ASTAR = 90000101
+    JPS = 90000102
+    HPASTAR = 90000103
+    DSTARLITE = 90000104
+
+
+class Compression(enum.IntEnum):
+    """
+    Compression algorithms that can be used when data are saved in a binary format (for
+    example with :meth:`~pygamelib.engine.Board.serialize_binary()`).
+
+    LZ4 requires the optional `lz4 <https://pypi.org/project/lz4/>`_ package.
+    """
+
+    NONE = 80000001
+    ZLIB = 80000002
+    LZ4 = 80000003
 
 
 class TextStyle(str, enum.Enum):
@@ -22,22 +22,175 @@ The Board class is the base class for all levels.
 
 """
 from pygamelib import board_items, base, actuators
-from pygamelib.constants import EngineConstant, EngineMode, State, Permission, Direction
+from pygamelib.constants import (
+    EngineConstant,
+    EngineMode,
+    State,
+    Permission,
+    Direction,
+    Compression,
+)
 from pygamelib.assets import graphics
 from pygamelib.gfx import core, particles
 from pygamelib.functions import pgl_isinstance
 from blessed import Terminal
+from blessed.keyboard import Keystroke
+from concurrent import futures
+import asyncio
+import collections
+import contextlib
+import functools
+import heapq
+import inspect
 import random
 import json
+import queue
 import sys
 import time
 import copy
 import ast
+import codecs
+import os
+import threading
+import struct
+import zlib
 import numpy as np
 
 # We need to ignore that one as it is used by user to compare keys (i.e Utils.key.UP)
 from readchar import readkey, key  # noqa: F401
 
+# The binary board format starts with this magic number, followed by the format version
+# and the compression algorithm (see Board.serialize_binary()).
+_BINARY_BOARD_MAGIC = b"PGLB"
+_BINARY_BOARD_VERSION = 1
+_BINARY_BOARD_COMPRESSION_CODES = {
+    Compression.NONE: 0,
+    Compression.ZLIB: 1,
+    Compression.LZ4: 2,
+}
+# The number of NPCs of an inactive level moved between two checks of the background
+# budget (see Game.set_level_tick_rate()).
+_BACKGROUND_SLICE = 16
+# The input recordings start with this magic number, followed by the format version
+# (see Game.record_inputs()).
+_INPUT_RECORDING_MAGIC = b"PGLI"
+_INPUT_RECORDING_VERSION = 1
+
+
+def _lz4_frame():
+    # lz4 is an optional dependency, we only import it when it's actually needed.
+    try:
+        import lz4.frame
+    except ImportError:
+        raise base.PglException(
+            "missing_dependency",
+            "The lz4 package is required to use Compression.LZ4. Please install it "
+            "with: pip install lz4",
+        )
+    return lz4.frame
+
+
+def _compress(payload: bytes, compression: Compression) -> bytes:
+    if compression == Compression.ZLIB:
+        return zlib.compress(payload)
+    elif compression == Compression.LZ4:
+        return _lz4_frame().compress(payload)
+    return payload
+
+
+def _decompress(payload: bytes, compression: Compression) -> bytes:
+    if compression == Compression.ZLIB:
+        return zlib.decompress(payload)
+    elif compression == Compression.LZ4:
+        return _lz4_frame().decompress(payload)
+    return payload
+
+
+class _JsonObjectReader:
+    # Incremental reader for a JSON object stored in a binary file. It iterates over
+    # the members of (nested) objects and decodes the values one at a time, without
+    # ever loading the whole file in memory.
+
+    def __init__(self, stream, chunk_size=65536):
+        self._stream = stream
+        self._chunk_size = chunk_size
+        self._decoder = json.JSONDecoder()
+        self._utf8 = codecs.getincrementaldecoder("utf-8")()
+        self._buffer = ""
+        self._pos = 0
+        self._eof = False
+        self.bytes_read = 0
+
+    def _fill(self, size=None):
+        # Drop what was already consumed and append the next chunk to the buffer.
+        if self._eof:
+            return
+        raw = self._stream.read(size or self._chunk_size)
+        self.bytes_read += len(raw)
+        if not raw:
+            self._eof = True
+        self._buffer = self._buffer[self._pos :] + self._utf8.decode(
+            raw, final=self._eof
+        )
+        self._pos = 0
+
+    def _peek(self):
+        # Return the next non whitespace character without consuming it.
+        while True:
+            buffer = self._buffer
+            while self._pos < len(buffer) and buffer[self._pos] in " \t\n\r":
+                self._pos += 1
+            if self._pos < len(self._buffer):
+                return self._buffer[self._pos]
+            if self._eof:
+                raise json.JSONDecodeError(
+                    "Unexpected end of data", self._buffer, self._pos
+                )
+            self._fill()
+
+    def _expect(self, char):
+        if self._peek() != char:
+            raise json.JSONDecodeError(f"Expecting '{char}'", self._buffer, self._pos)
+        self._pos += 1
+
+    def value(self):
+        """Decode and return the next value."""
+        self._peek()
+        size = self._chunk_size
+        while True:
+            try:
+                (obj, end) = self._decoder.raw_decode(self._buffer, self._pos)
+                # A number could be truncated by the end of the buffer.
+                if end < len(self._buffer) or self._eof:
+                    self._pos = end
+                    return obj
+            except json.JSONDecodeError:
+                if self._eof:
+                    raise
+            # Read bigger and bigger chunks to avoid decoding a big value over and over.
+            self._fill(size)
+            size *= 2
+
+    def members(self):
+        """Iterate over the keys of the object that starts at the current position.
+
+        The value associated to each key must be consumed (with value() or members())
+        before moving to the next key.
+        """
+        self._expect("{")
+        if self._peek() == "}":
+            self._pos += 1
+            return
+        while True:
+            member = self.value()
+            self._expect(":")
+            yield member
+            if self._peek() == ",":
+                self._pos += 1
+            else:
+                self._expect("}")
+                return
+
 
 class Board(base.PglBaseObject):
     """A class that represent a game board.
@@ -185,6 +338,13 @@ class Board(base.PglBaseObject):
         self._immovables = set()
         # Init the list of particle emitters.
         self._particle_emitters = set()
+        # Incremented each time the static blocking data (the "terrain") change.
+        self._terrain_version = 0
+        # The last terrain changes as (version, row, column), for the caches that are
+        # updated incrementally (see actuators._PathHierarchy).
+        self._terrain_changes = collections.deque(maxlen=Board._TERRAIN_CHANGES_SIZE)
+        # The graph used by the hierarchical path finding (see actuators.PathFinder).
+        self._path_hierarchy = None
         # If sanity check passed then, initialize the board
         self.init_board()
 
@@ -215,6 +375,19 @@ class Board(base.PglBaseObject):
 
             myboard.init_board()
         """
+        # Maintained numpy view of the cells that cannot be entered (i.e: that contain
+        # at least one item that is not overlappable). See _update_blocking().
+        self._blocking = np.zeros((self.size[1], self.size[0]), dtype=bool)
+        # Same but only for the items that are not movable (walls, etc.). These cells
+        # are also the ones that block the view.
+        self._static_blocking = np.zeros((self.size[1], self.size[0]), dtype=bool)
+        self._terrain_version += 1
+        self._fov_cache = {}
+        # (row, column) of a target -> (terrain version, distance field)
+        self._distance_fields = {}
+        # The cells changed since the last snapshot image (see Game.snapshot()).
+        self._dirty_cells = set()
+        self._snapshot_image = None
         if self.ui_board_void_cell_sprixel is not None and isinstance(
             self.ui_board_void_cell_sprixel, core.Sprixel
         ):
@@ -295,6 +468,39 @@ class Board(base.PglBaseObject):
         # layers.
         self._matrix[row][column][layer] = self.generate_void_cell()
         self._matrix[row][column][layer].store_position(row, column, layer)
+        self._update_blocking(row, column)
+
+    def _update_blocking(self, row, column):
+        # Keep the blocking grids in sync with a cell: it is blocking if at least one of
+        # its items is not overlappable. It is statically blocking (and opaque) if one
+        # of these items is not movable.
+        # WARNING: call that method after each change in a cell of the matrix!
+        blocking = False
+        static_blocking = False
+        for i in self._matrix[row][column]:
+            if i is not None and not i.overlappable():
+                blocking = True
+                if not isinstance(i, board_items.Movable) and not isinstance(
+                    i.parent, board_items.Movable
+                ):
+                    static_blocking = True
+                    break
+        self._blocking[row, column] = blocking
+        self._dirty_cells.add((row, column))
+        if self._static_blocking[row, column] != static_blocking:
+            self._static_blocking[row, column] = static_blocking
+            self._terrain_changed(row, column)
+
+    _TERRAIN_CHANGES_SIZE = 4096
+
+    def _terrain_changed(self, row, column):
+        # Invalidate the cached data that depend on the static blocking of a cell.
+        self._terrain_version += 1
+        self._terrain_changes.append((self._terrain_version, row, column))
+        for origin in list(self._fov_cache.keys()):
+            (origin_row, origin_column, radius) = origin
+            if max(abs(origin_row - row), abs(origin_column - column)) <= radius:
+                del self._fov_cache[origin]
 
     def check_sanity(self) -> None:
         """Check the board sanity.
@@ -938,39 +1144,7 @@ class Board(base.PglBaseObject):
                 ):
                     self._particle_emitters.add(item.particle_emitter)
             if isinstance(item, board_items.BoardComplexItem):
-                # First, we get the highest required layer
-                max_layer = layer
-                for ir in range(0, item.size[1]):
-                    for ic in range(0, item.size[0]):
-                        inner_pos_layer = layer
-                        if layer >= len(self._matrix[row + ir][column + ic]):
-                            break
-                        else:
-                            existing_item = self._matrix[row + ir][column + ic][
-                                inner_pos_layer
-                            ]
-                            while (
-                                existing_item.restorable()
-                                and existing_item.overlappable()
-                            ):
-                                inner_pos_layer += 1
-                                try:
-                                    existing_item = self._matrix[row + ir][column + ic][
-                                        inner_pos_layer
-                                    ]
-                                except IndexError:
-                                    self._create_missing_layers(
-                                        row + ir, column + ic, inner_pos_layer
-                                    )
-                                    existing_item = self._matrix[row + ir][column + ic][
-                                        inner_pos_layer
-                                    ]
-                            if inner_pos_layer > max_layer:
-                                max_layer = inner_pos_layer
-                # Game.instance().session_log(f"place_item: max_layer={max_layer}")
-                # TODO: code écris tard, vérifier que ça marche et supprimer la partie
-                # vérification des layers dans _move_complex. Puis finisaliser cette
-                # fonction.
+                max_layer = self._complex_item_layer(item, row, column, layer)
                 for ir in range(0, item.size[1]):
                     for ic in range(0, item.size[0]):
                         itm = item.item(ir, ic)
@@ -985,69 +1159,11 @@ class Board(base.PglBaseObject):
                             itm._auto_layer = auto_layer
                 item.store_position(row, column, max_layer)
                 self.notify(self, "pygamelib.engine.Board.place_item:item_placed", item)
-                if isinstance(item, board_items.Movable):
-                    self._movables.add(item)
-                elif isinstance(item, board_items.Immovable):
-                    self._immovables.add(item)
+                self._index_item(item)
             elif isinstance(item, board_items.BoardItem):
-                # First we look at the layers to see if the specified layer exists.
-                existing_item = None
-                try:
-                    existing_item = self._matrix[row][column][layer]
-                except IndexError:
-                    # The layer might not exist yet
-                    self._create_missing_layers(row, column, layer)
-                    existing_item = self._matrix[row][column][layer]
-                # If not and if the item is overlappable and restorable we increase the
-                # layer number (to create a new layer).
-                # existing_item should *never* be None here. If so, there's a big
-                # problem. Therefor, it's better to not test and let the game crash.
-                # if existing_item.restorable() and existing_item.overlappable():
-                #     layer += 1
-                #     self._adjust_items_layers(row, column, layer, +1)
-                while existing_item.restorable() and existing_item.overlappable():
-                    layer += 1
-                    try:
-                        existing_item = self._matrix[row][column][layer]
-                    except IndexError:
-                        self._create_missing_layers(row, column, layer)
-                        existing_item = self._matrix[row][column][layer]
-                # If we are replacing a void item and the item's background is
-                # transparent, let's grab it's background color.
-                # An alternative would be to have the BoardItemVoid to be restorable,
-                # and to never overwrite it. But I'm afraid of the impact on the
-                # performances (it means create a lot more new layers and that impacts
-                # the performances dramatically).
-                if (
-                    isinstance(existing_item, board_items.BoardItemVoid)
-                    and existing_item.sprixel is not None
-                    and item.sprixel.is_bg_transparent
-                ):
-                    item.sprixel.bg_color = existing_item.sprixel.bg_color
-                # Place the item on the board
-                try:
-                    self._matrix[row][column][layer] = item
-                except IndexError:  # pragma: no cover
-                    # This should literally never happen: we created relevant layers
-                    # before. But, better safe than sorry.
-                    self._matrix[row][column].append(item)
-                # Take ownership of the item (if item doesn't have parent)
-                if item.parent is None:
-                    item.parent = self
-                item.store_position(row, column, layer)
+                self._place_simple_item(item, row, column, layer)
                 self.notify(self, "pygamelib.engine.Board.place_item:item_placed", item)
-                if isinstance(item, board_items.Movable):
-                    if isinstance(item.parent, board_items.BoardComplexItem):
-                        # This is actually tested in test_board.py in the test_item
-                        # method.
-                        self._movables.add(item.parent)  # pragma: no cover
-                    else:
-                        self._movables.add(item)
-                elif isinstance(item, board_items.Immovable):
-                    if isinstance(item.parent, board_items.BoardComplexItem):
-                        self._immovables.add(item.parent)
-                    else:
-                        self._immovables.add(item)
+                self._index_item(item)
             else:
                 raise base.PglInvalidTypeException(
                     "The item passed in argument is not a subclass of BoardItem"
@@ -1058,6 +1174,206 @@ class Board(base.PglBaseObject):
                 f"it's out of the board boundaries ({self.size[0]}x{self.size[1]})."
             )
 
+    def _complex_item_layer(self, item, row, column, layer):
+        # Return the highest layer required to place a complex item at (row, column).
+        max_layer = layer
+        for ir in range(0, item.size[1]):
+            for ic in range(0, item.size[0]):
+                inner_pos_layer = layer
+                if layer >= len(self._matrix[row + ir][column + ic]):
+                    break
+                else:
+                    existing_item = self._matrix[row + ir][column + ic][inner_pos_layer]
+                    while existing_item.restorable() and existing_item.overlappable():
+                        inner_pos_layer += 1
+                        try:
+                            existing_item = self._matrix[row + ir][column + ic][
+                                inner_pos_layer
+                            ]
+                        except IndexError:
+                            self._create_missing_layers(
+                                row + ir, column + ic, inner_pos_layer
+                            )
+                            existing_item = self._matrix[row + ir][column + ic][
+                                inner_pos_layer
+                            ]
+                    if inner_pos_layer > max_layer:
+                        max_layer = inner_pos_layer
+        # Game.instance().session_log(f"place_item: max_layer={max_layer}")
+        # TODO: code écris tard, vérifier que ça marche et supprimer la partie
+        # vérification des layers dans _move_complex. Puis finisaliser cette
+        # fonction.
+        return max_layer
+
+    def _place_simple_item(self, item, row, column, layer):
+        # Put a (non complex) item in the matrix. No bound checking, no notification
+        # and no update of the movables/immovables indexes.
+        # First we look at the layers to see if the specified layer exists.
+        existing_item = None
+        try:
+            existing_item = self._matrix[row][column][layer]
+        except IndexError:
+            # The layer might not exist yet
+            self._create_missing_layers(row, column, layer)
+            existing_item = self._matrix[row][column][layer]
+        # If not and if the item is overlappable and restorable we increase the
+        # layer number (to create a new layer).
+        # existing_item should *never* be None here. If so, there's a big
+        # problem. Therefor, it's better to not test and let the game crash.
+        # if existing_item.restorable() and existing_item.overlappable():
+        #     layer += 1
+        #     self._adjust_items_layers(row, column, layer, +1)
+        while existing_item.restorable() and existing_item.overlappable():
+            layer += 1
+            try:
+                existing_item = self._matrix[row][column][layer]
+            except IndexError:
+                self._create_missing_layers(row, column, layer)
+                existing_item = self._matrix[row][column][layer]
+        # If we are replacing a void item and the item's background is
+        # transparent, let's grab it's background color.
+        # An alternative would be to have the BoardItemVoid to be restorable,
+        # and to never overwrite it. But I'm afraid of the impact on the
+        # performances (it means create a lot more new layers and that impacts
+        # the performances dramatically).
+        if (
+            isinstance(existing_item, board_items.BoardItemVoid)
+            and existing_item.sprixel is not None
+            and item.sprixel.is_bg_transparent
+            and item.sprixel.bg_color is not existing_item.sprixel.bg_color
+        ):
+            item.sprixel.bg_color = existing_item.sprixel.bg_color
+        # Place the item on the board
+        try:
+            self._matrix[row][column][layer] = item
+        except IndexError:  # pragma: no cover
+            # This should literally never happen: we created relevant layers
+            # before. But, better safe than sorry.
+            self._matrix[row][column].append(item)
+        # Take ownership of the item (if item doesn't have parent)
+        if item.parent is None:
+            item.parent = self
+        item.store_position(row, column, layer)
+        self._update_blocking(row, column)
+
+    def _index_item(self, item):
+        # Add an item (or its complex parent) to the movables or immovables.
+        if isinstance(item, board_items.Movable):
+            if isinstance(item.parent, board_items.BoardComplexItem):
+                # This is actually tested in test_board.py in the test_item
+                # method.
+                self._movables.add(item.parent)  # pragma: no cover
+            else:
+                self._movables.add(item)
+        elif isinstance(item, board_items.Immovable):
+            if isinstance(item.parent, board_items.BoardComplexItem):
+                self._immovables.add(item.parent)
+            else:
+                self._immovables.add(item)
+
+    def place_items(self, items, auto_layer=True):
+        """
+        Place multiple items at once.
+
+        .. versionadded:: 1.4.0
+
+        items is an iterable of tuples (item, row, column) or (item, row, column,
+        layer). The items are placed exactly like :meth:`place_item()` would, but all
+        the placements are validated before anything is placed (if one of them is
+        invalid, the board is left untouched), the indexes of movables and immovables
+        are updated in bulk and the observers receive one single
+        :boldblue:`pygamelib.engine.Board.place_items:items_placed` event. The list of
+        the items that were placed is passed as the :blue:`value` of the event.
+
+        This is a lot faster than calling place_item() in a loop, for example when a
+        level is procedurally generated.
+
+        :param items: The items to place and their positions.
+        :type items: iterable
+        :param auto_layer: Same as in :meth:`place_item()`. Default: True.
+        :type auto_layer: bool
+        :raise: :class:`~pygamelib.base.PglInvalidTypeException` if an item is not a
+           BoardItem or if a position is malformed.
+        :raise: :class:`~pygamelib.base.PglOutOfBoardBoundException` if a position is
+           outside of the board.
+
+        Example::
+
+            board.place_items(
+                (Wall(), 0, c) for c in range(board.width)
+            )
+        """
+        placements = []
+        (width, height) = self.size
+        for entry in items:
+            if not isinstance(entry, (tuple, list)) or len(entry) not in (3, 4):
+                raise base.PglInvalidTypeException(
+                    "Board.place_items(items): each entry must be a tuple (item, row, "
+                    "column) or (item, row, column, layer)."
+                )
+            (item, row, column) = entry[0:3]
+            layer = entry[3] if len(entry) == 4 else 0
+            if not isinstance(item, board_items.BoardItem):
+                raise base.PglInvalidTypeException(
+                    "Board.place_items(items): The item passed in argument is not a "
+                    "subclass of BoardItem"
+                )
+            is_complex = isinstance(item, board_items.BoardComplexItem)
+            (item_width, item_height) = (1, 1)
+            if is_complex:
+                (item_width, item_height) = item.size
+            if (
+                row < 0
+                or column < 0
+                or row + item_height > height
+                or column + item_width > width
+            ):
+                raise base.PglOutOfBoardBoundException(
+                    f"Cannot place item at coordinates [{row},{column},{layer}] "
+                    "because it's out of the board boundaries "
+                    f"({width}x{height})."
+                )
+            placements.append((item, row, column, layer, is_complex))
+        movables = []
+        immovables = []
+        placed = []
+        for (item, row, column, layer, is_complex) in placements:
+            item._auto_layer = auto_layer
+            if item.particle_emitter is not None and isinstance(
+                item.particle_emitter, particles.ParticleEmitter
+            ):
+                self._particle_emitters.add(item.particle_emitter)
+            if is_complex:
+                layer = self._complex_item_layer(item, row, column, layer)
+                for ir in range(0, item.size[1]):
+                    for ic in range(0, item.size[0]):
+                        itm = item.item(ir, ic)
+                        if not isinstance(itm, board_items.BoardItemVoid):
+                            itm._auto_layer = auto_layer
+                            if itm.particle_emitter is not None and isinstance(
+                                itm.particle_emitter, particles.ParticleEmitter
+                            ):
+                                self._particle_emitters.add(itm.particle_emitter)
+                            self._place_simple_item(itm, row + ir, column + ic, layer)
+                item.store_position(row, column, layer)
+            else:
+                self._place_simple_item(item, row, column, layer)
+            if not is_complex and isinstance(
+                item.parent, board_items.BoardComplexItem
+            ):
+                indexed_item = item.parent
+            else:
+                indexed_item = item
+            if isinstance(item, board_items.Movable):
+                movables.append(indexed_item)
+            elif isinstance(item, board_items.Immovable):
+                immovables.append(indexed_item)
+            placed.append(item)
+        self._movables.update(movables)
+        self._immovables.update(immovables)
+        if len(placed) > 0:
+            self.notify(self, "pygamelib.engine.Board.place_items:items_placed", placed)
+
     def remove_item(self, item):
         """Remove an item from the board.
 
@@ -1082,6 +1398,65 @@ class Board(base.PglBaseObject):
             raise base.PglInvalidTypeException(
                 "Board.remove_item(item): item must be a BoardItem."
             )
+        if self._is_on_board(item):
+            self._clear_item(item)
+            self.notify(self, "pygamelib.engine.Board.remove_item:item_removed", item)
+            return True
+        else:
+            raise base.PglException(
+                "invalid_item",
+                "Board.remove_item(item): The item is different from what is on the "
+                "board at these coordinates.",
+            )
+
+    def remove_items(self, items):
+        """Remove multiple items from the board at once.
+
+        .. versionadded:: 1.4.0
+
+        This method works like :meth:`remove_item()` but all the items are checked
+        before anything is removed (if one of them is not on the board, the board is
+        left untouched). An item that is given more than once is only removed once.
+        The observers receive one single
+        :boldblue:`pygamelib.engine.Board.remove_items:items_removed` event. The list of
+        the items that were removed is passed as the :blue:`value` of the event.
+
+        :param items: The items to remove.
+        :type items: iterable
+        :raise: :class:`~pygamelib.base.PglInvalidTypeException` if an item is not a
+           BoardItem.
+        :raise: :class:`~pygamelib.base.PglException` if an item is not on the board.
+
+        Example::
+
+            board.remove_items(
+                [i for i in board.get_immovables() if isinstance(i, Treasure)]
+            )
+        """
+        # Remove the duplicates: removing an item twice would clear the item that took
+        # its place (or its layer) in the cell.
+        items = list({id(item): item for item in items}.values())
+        for item in items:
+            if not isinstance(item, board_items.BoardItem):
+                raise base.PglInvalidTypeException(
+                    "Board.remove_items(items): all items must be BoardItem."
+                )
+            if not self._is_on_board(item):
+                raise base.PglException(
+                    "invalid_item",
+                    "Board.remove_items(items): The item is different from what is on "
+                    "the board at these coordinates.",
+                )
+        for item in items:
+            self._clear_item(item)
+        if len(items) > 0:
+            self.notify(
+                self, "pygamelib.engine.Board.remove_items:items_removed", items
+            )
+        return True
+
+    def _is_on_board(self, item):
+        # Check that the item is actually on the board at its position.
         cc = None
         if isinstance(item, board_items.BoardComplexItem):
             for r in range(item.row, item.row + item.height):
@@ -1096,21 +1471,16 @@ class Board(base.PglBaseObject):
                     break
         else:
             cc = self.item(item.row, item.column, item.layer)
-        if cc is not None and item == cc:
-            if isinstance(item, board_items.BoardComplexItem):
-                for r in range(item.row, item.row + item.height):
-                    for c in range(item.column, item.column + item.width):
-                        self.clear_cell(r, c, item.layer)
-            else:
-                self.clear_cell(item.row, item.column, item.layer)
-            self.notify(self, "pygamelib.engine.Board.remove_item:item_removed", item)
-            return True
+        return cc is not None and item == cc
+
+    def _clear_item(self, item):
+        # Clear all the cells occupied by an item.
+        if isinstance(item, board_items.BoardComplexItem):
+            for r in range(item.row, item.row + item.height):
+                for c in range(item.column, item.column + item.width):
+                    self.clear_cell(r, c, item.layer)
         else:
-            raise base.PglException(
-                "invalid_item",
-                "Board.remove_item(item): The item is different from what is on the "
-                "board at these coordinates.",
-            )
+            self.clear_cell(item.row, item.column, item.layer)
 
     def _move_complex(self, item, direction, step=1):
         # Game.instance().session_log(
@@ -1132,60 +1502,69 @@ class Board(base.PglBaseObject):
             and (projected_position.row + item.height - 1) < self.size[1]
             and (projected_position.column + item.width - 1) < self.size[0]
         ):
-            can_draw = True
-
-            item_row = item.row
-            item_column = item.column
-            self.remove_item(item)
-            for orow in range(0, item.size[1]):
-                for ocol in range(0, item.size[0]):
-                    new_row = projected_position.row + orow
-                    new_column = projected_position.column + ocol
-                    dest_item = self.item(new_row, new_column)
-                    if isinstance(dest_item, board_items.Actionable):
-                        if (
-                            (
-                                isinstance(item, board_items.Player)
-                                and (
-                                    (dest_item.perm == Permission.PLAYER_AUTHORIZED)
-                                    or (
-                                        dest_item.perm
-                                        == Permission.ALL_CHARACTERS_AUTHORIZED
-                                    )
+            new_row = int(projected_position.row)
+            new_column = int(projected_position.column)
+            (height, width) = item.footprint.shape
+            # The cells of the footprint that are already covered by the item itself
+            # (at the destination offset) are neither checked nor activated.
+            delta_row = new_row - item.row
+            delta_column = new_column - item.column
+            covered = np.zeros((height, width), dtype=bool)
+            if abs(delta_row) < height and abs(delta_column) < width:
+                covered[
+                    max(0, -delta_row) : height - max(0, delta_row),
+                    max(0, -delta_column) : width - max(0, delta_column),
+                ] = item.footprint[
+                    max(0, delta_row) : height + min(0, delta_row),
+                    max(0, delta_column) : width + min(0, delta_column),
+                ]
+            entering = item.footprint & ~covered
+            for (orow, ocol) in np.argwhere(entering).tolist():
+                dest_row = new_row + orow
+                dest_column = new_column + ocol
+                dest_item = self.item(dest_row, dest_column)
+                if isinstance(dest_item, board_items.Actionable):
+                    if (
+                        (
+                            isinstance(item, board_items.Player)
+                            and (
+                                (dest_item.perm == Permission.PLAYER_AUTHORIZED)
+                                or (
+                                    dest_item.perm
+                                    == Permission.ALL_CHARACTERS_AUTHORIZED
                                 )
                             )
-                            or (
-                                isinstance(item, board_items.NPC)
-                                and (
-                                    (dest_item.perm == Permission.NPC_AUTHORIZED)
-                                    or (
-                                        dest_item.perm
-                                        == Permission.ALL_CHARACTERS_AUTHORIZED
-                                    )
+                        )
+                        or (
+                            isinstance(item, board_items.NPC)
+                            and (
+                                (dest_item.perm == Permission.NPC_AUTHORIZED)
+                                or (
+                                    dest_item.perm
+                                    == Permission.ALL_CHARACTERS_AUTHORIZED
                                 )
                             )
-                            or (dest_item.perm == Permission.ALL_MOVABLE_AUTHORIZED)
-                        ):
-                            dest_item.activate()
-                    # Now taking care of pickable objects
-                    pickable_item = self.item(new_row, new_column)
-                    if (
-                        pickable_item.pickable()
-                        and isinstance(item, board_items.Movable)
-                        and item.has_inventory()
+                        )
+                        or (dest_item.perm == Permission.ALL_MOVABLE_AUTHORIZED)
                     ):
-                        # Put the item in the inventory
-                        item.inventory.add_item(pickable_item)
-                        # And then clear the cell (this is usefull for the next one)
-                        self.remove_item(pickable_item)
-                    # Finally we check if the destination is overlappable
-                    if dest_item != item and not dest_item.overlappable():
-                        can_draw = False
-                        break
-            if can_draw:
-                self.place_item(item, projected_position.row, projected_position.column)
-            else:
-                self.place_item(item, item_row, item_column)
+                        dest_item.activate()
+                # Now taking care of pickable objects
+                if (
+                    dest_item.pickable()
+                    and isinstance(item, board_items.Movable)
+                    and item.has_inventory()
+                ):
+                    # Put the item in the inventory
+                    item.inventory.add_item(dest_item)
+                    # And then clear the cell (this is usefull for the next one)
+                    self.remove_item(dest_item)
+                # Finally we check if the destination is overlappable, there's no need
+                # to go further if it's not.
+                if self._blocking[dest_row, dest_column]:
+                    return
+            # The footprint fits: only now the item is actually moved.
+            self.remove_item(item)
+            self.place_item(item, new_row, new_column)
 
     def move(self, item, direction, step=1):
         """
@@ -1229,6 +1608,191 @@ class Board(base.PglBaseObject):
            movement accumulation before actually moving. The step parameter is not used
            in that case.
         """
+        rounded_direction = self._prepare_move(item, direction, step)
+        if rounded_direction is None:
+            return
+        if isinstance(item, board_items.BoardComplexItem):
+            return self._move_complex(item, rounded_direction, step)
+        else:
+            return self._move_simple(item, rounded_direction, step)
+
+    def move_many(self, moves):
+        """
+        Move multiple items at once, as if they were all moving at the same time.
+
+        .. versionadded:: 1.4.0
+
+        When items are moved one after the other with :meth:`move()`, the outcome
+        depends on the order of the moves (an item can only move in the cell freed by
+        another item if that other item moved first). move_many() gathers all the
+        intended moves and resolves them simultaneously and deterministically:
+
+         * Items that would leave the board or that move toward a cell that is
+           blocked by an item that is not part of the batch behave exactly like with
+           :meth:`move()` (the destination item is activated, picked up if possible,
+           etc.).
+         * When multiple items want to go to the same cell, the first one in moves
+           wins. The others stay where they are.
+         * An item can move into a cell occupied by another item of the batch only if
+           that other item successfully moves away. Consequently, items that want to
+           swap their positions (or more generally that form a cycle) stay where they
+           are.
+
+        The conflicts are resolved on the board's occupancy data in one vectorized
+        pass, then the successful moves are applied in order of dependency. The
+        observers are notified once with the
+        :boldblue:`pygamelib.engine.Board.move_many:items_moved` event. The list of the
+        items that moved is passed as the :blue:`value` of the event.
+
+        Complex items (see :class:`~pygamelib.board_items.BoardComplexItem`) do not
+        take part in the simultaneous resolution: they are moved with :meth:`move()`
+        after all the other items, in the order they appear in moves.
+
+        :param moves: An iterable of tuples (item, direction) or (item, direction,
+           step). The parameters have the same meaning than in :meth:`move()`.
+        :type moves: iterable
+        :returns: A list of booleans, one per move, that is True if the item moved.
+        :rtype: list
+        :raise: :class:`~pygamelib.base.PglObjectIsNotMovableException` if an item is
+           not a Movable.
+        :raise: :class:`~pygamelib.base.PglInvalidTypeException` if a move is
+           malformed.
+
+        Example::
+
+            board.move_many(
+                [(npc, npc.actuator.next_move()) for npc in crowd]
+            )
+        """
+        moves = list(moves)
+        # First, validate everything so the board is left untouched if a move is
+        # invalid.
+        for entry in moves:
+            if not isinstance(entry, (tuple, list)) or len(entry) not in (2, 3):
+                raise base.PglInvalidTypeException(
+                    "Board.move_many(moves): each move must be a tuple (item, "
+                    "direction) or (item, direction, step)."
+                )
+            if not isinstance(entry[0], board_items.Movable):
+                raise base.PglObjectIsNotMovableException(
+                    f"Board.move_many(moves): item '{entry[0].name}' is not a subclass "
+                    "of Movable, therefor it cannot be moved."
+                )
+        results = [False] * len(moves)
+        origins = [None] * len(moves)
+        directions = [None] * len(moves)
+        simple_moves = []
+        complex_moves = []
+        for idx, entry in enumerate(moves):
+            item = entry[0]
+            step = entry[2] if len(entry) == 3 else 1
+            direction = self._prepare_move(item, entry[1], step)
+            if direction is None or (direction.row == 0 and direction.column == 0):
+                continue
+            origins[idx] = (item.row, item.column)
+            directions[idx] = direction
+            if isinstance(item, board_items.BoardComplexItem):
+                complex_moves.append(idx)
+            else:
+                simple_moves.append(idx)
+
+        if len(simple_moves) > 0:
+            (width, height) = self.size
+            src_r = np.array([origins[i][0] for i in simple_moves], dtype=np.intp)
+            src_c = np.array([origins[i][1] for i in simple_moves], dtype=np.intp)
+            dst_r = src_r + np.array(
+                [directions[i].row for i in simple_moves], dtype=np.intp
+            )
+            dst_c = src_c + np.array(
+                [directions[i].column for i in simple_moves], dtype=np.intp
+            )
+            count = len(simple_moves)
+            in_board = (dst_r >= 0) & (dst_r < height) & (dst_c >= 0) & (dst_c < width)
+            dst_id = np.where(in_board, dst_r * width + dst_c, 0)
+            # Which mover (if any) currently occupies each destination.
+            occupant = np.full(width * height, -1, dtype=np.intp)
+            occupant[src_r * width + src_c] = np.arange(count)
+            dependency = np.where(in_board, occupant[dst_id], -1)
+            blocked = (dependency < 0) & self._blocking.ravel()[dst_id]
+            # Same target contention: the first mover wins.
+            candidates = np.nonzero(in_board)[0]
+            (_, first) = np.unique(dst_id[candidates], return_index=True)
+            winner = np.zeros(count, dtype=bool)
+            winner[candidates[first]] = True
+            # Least fixpoint: a mover is valid if its destination is free or if it is
+            # vacated by a valid mover. Movers in a cycle never become valid.
+            free = winner & ~blocked
+            valid = free & (dependency < 0)
+            level = np.where(valid, 0, -1)
+            waiting = free & (dependency >= 0)
+            current_level = 1
+            while True:
+                newly_valid = waiting & ~valid & valid[np.maximum(dependency, 0)]
+                if not newly_valid.any():
+                    break
+                valid |= newly_valid
+                level[newly_valid] = current_level
+                current_level += 1
+            # Apply the valid moves, a cell being vacated before it is entered. Then
+            # let the blocked movers bump into their destination (activation, pick
+            # up, etc.).
+            order = np.nonzero(valid)[0]
+            order = order[np.argsort(level[order], kind="stable")].tolist()
+            order += np.nonzero(winner & blocked)[0].tolist()
+            (dst_rows, dst_columns) = (dst_r.tolist(), dst_c.tolist())
+            for i in order:
+                idx = simple_moves[i]
+                item = moves[idx][0]
+                if not self._swap_with_void(item, dst_rows[i], dst_columns[i]):
+                    self._move_simple(item, directions[idx])
+        for idx in complex_moves:
+            self._move_complex(moves[idx][0], directions[idx])
+        moved = []
+        for idx, entry in enumerate(moves):
+            if origins[idx] is not None:
+                results[idx] = (entry[0].row, entry[0].column) != origins[idx]
+                if results[idx]:
+                    moved.append(entry[0])
+        if len(moved) > 0:
+            self.notify(self, "pygamelib.engine.Board.move_many:items_moved", moved)
+        return results
+
+    def _swap_with_void(self, item, row, column):
+        # Fast path for move_many(): when an item is alone in its cell and moves to a
+        # cell that only contains a void item, both items are simply exchanged (instead
+        # of clearing a cell, creating a new void item and placing the item).
+        src = self._matrix[item.row][item.column]
+        dst = self._matrix[row][column]
+        if (
+            len(src) != 1
+            or len(dst) != 1
+            or src[0] is not item
+            or not isinstance(dst[0], board_items.BoardItemVoid)
+        ):
+            return False
+        void = dst[0]
+        # Same as place_item(): a transparent item takes the color of the void.
+        if (
+            void.sprixel is not None
+            and item.sprixel.is_bg_transparent
+            and item.sprixel.bg_color is not void.sprixel.bg_color
+        ):
+            item.sprixel.bg_color = void.sprixel.bg_color
+        (src_row, src_column) = (item.row, item.column)
+        dst[0] = item
+        src[0] = void
+        void.store_position(src_row, src_column, 0)
+        item.store_position(row, column, 0)
+        self._blocking[src_row, src_column] = False
+        self._blocking[row, column] = not item.overlappable()
+        self._dirty_cells.add((src_row, src_column))
+        self._dirty_cells.add((row, column))
+        return True
+
+    def _prepare_move(self, item, direction, step=1):
+        # Check that the item can move, accumulate the movement and return the
+        # movement rounded to entire cells. Returns None if, in real time mode, the
+        # item cannot move yet.
         if (
             self.parent is not None
             and isinstance(self.parent, Game)
@@ -1237,7 +1801,7 @@ class Board(base.PglBaseObject):
             and item.can_move()
             and item.dtmove < item.movement_speed
         ):
-            return
+            return None
         elif not isinstance(item, board_items.Movable):  # pragma: no cover
             # This is actually test in tests/test_board.py in function test_move()
             # I have no idea why it is not registering as a tested statement
@@ -1286,10 +1850,7 @@ class Board(base.PglBaseObject):
             item._accumulator.column - item._accumulator.column % 1
         )
         item._accumulator.column -= rounded_direction.column
-        if isinstance(item, board_items.BoardComplexItem):
-            return self._move_complex(item, rounded_direction, step)
-        else:
-            return self._move_simple(item, rounded_direction, step)
+        return rounded_direction
 
     def _move_simple(self, item, direction, step=1):
         # Since the user is not supposed to call directly that method we assume that it
@@ -1453,6 +2014,7 @@ class Board(base.PglBaseObject):
             self._matrix[row][column].append(
                 self.generate_void_cell()
             )  # pragma: no cover
+        self._update_blocking(row, column)
 
     def _clean_layers(self, row, column):
         layer = len(self._matrix[row][column]) - 1
@@ -1544,6 +2106,25 @@ class Board(base.PglBaseObject):
             serialized_board_data = myboard.serialize()
 
         """
+        data = self._serialize_header()
+        data["map_data"] = {}
+
+        # Now we need to run through all the cells to store
+        # anything that is not a BoardItemVoid
+        for x in self._matrix:
+            for y in x:
+                for z in y:
+                    if not isinstance(z, board_items.BoardItemVoid) and not isinstance(
+                        z, board_items.Player
+                    ):
+                        data["map_data"][
+                            str((z.row, z.column, z.layer))
+                        ] = z.serialize()
+
+        return data
+
+    def _serialize_header(self):
+        # Serialize the board's attributes (everything but the items).
         data = {}
         data["name"] = self.name
         # Mostly to differentiate from serialization by Game.save_board() from pygamelib
@@ -1568,20 +2149,6 @@ class Board(base.PglBaseObject):
         data["partial_display_viewport"] = self.partial_display_viewport
         data["partial_display_focus"] = self.partial_display_focus
         data["enable_partial_display"] = self.enable_partial_display
-        data["map_data"] = {}
-
-        # Now we need to run through all the cells to store
-        # anything that is not a BoardItemVoid
-        for x in self._matrix:
-            for y in x:
-                for z in y:
-                    if not isinstance(z, board_items.BoardItemVoid) and not isinstance(
-                        z, board_items.Player
-                    ):
-                        data["map_data"][
-                            str((z.row, z.column, z.layer))
-                        ] = z.serialize()
-
         return data
 
     @classmethod
@@ -1610,23 +2177,7 @@ class Board(base.PglBaseObject):
             return
         # Now we check that the data is in the correct format
         if "data_version" in data.keys() and data["data_version"] >= 2:
-            tmp = cls(
-                name=data["name"],
-                size=data["size"],
-                player_starting_position=data["player_starting_position"],
-                ui_border_left=data["ui_border_left"],
-                ui_border_right=data["ui_border_right"],
-                ui_border_top=data["ui_border_top"],
-                ui_border_bottom=data["ui_border_bottom"],
-                ui_board_void_cell=data["ui_board_void_cell"],
-                ui_board_void_cell_sprixel=core.Sprixel.load(
-                    data["ui_board_void_cell_sprixel"]
-                ),
-                DISPLAY_SIZE_WARNINGS=data["DISPLAY_SIZE_WARNINGS"],
-                partial_display_viewport=data["partial_display_viewport"],
-                partial_display_focus=data["partial_display_focus"],
-                enable_partial_display=data["enable_partial_display"],
-            )
+            tmp = cls._load_header(data)
             for k in data["map_data"].keys():
                 (r, c, l) = ast.literal_eval(k)
                 item = Board.instantiate_item(data["map_data"][k])
@@ -1634,6 +2185,292 @@ class Board(base.PglBaseObject):
                     tmp.place_item(item, r, c, l)
         return tmp
 
+    @classmethod
+    def _load_header(cls, data: dict):
+        # Create an empty board from the attributes serialized by _serialize_header().
+        return cls(
+            name=data["name"],
+            size=data["size"],
+            player_starting_position=data["player_starting_position"],
+            ui_border_left=data["ui_border_left"],
+            ui_border_right=data["ui_border_right"],
+            ui_border_top=data["ui_border_top"],
+            ui_border_bottom=data["ui_border_bottom"],
+            ui_board_void_cell=data["ui_board_void_cell"],
+            ui_board_void_cell_sprixel=core.Sprixel.load(
+                data["ui_board_void_cell_sprixel"]
+            ),
+            DISPLAY_SIZE_WARNINGS=data["DISPLAY_SIZE_WARNINGS"],
+            partial_display_viewport=data["partial_display_viewport"],
+            partial_display_focus=data["partial_display_focus"],
+            enable_partial_display=data["enable_partial_display"],
+        )
+
+    def serialize_binary(self, compression: Compression = Compression.ZLIB) -> bytes:
+        """Return a compact binary version of the board.
+
+        .. versionadded:: 1.4.0
+
+        The binary format is a lot faster to save and load than the JSON format
+        produced by :meth:`serialize()` (in particular for big boards). The items are
+        stored as a palette of item templates (identical items are only stored once)
+        and an array of indexes into that palette for each layer of the board.
+
+        The JSON format is still the preferred format to exchange boards with other
+        tools.
+
+        :param compression: The compression algorithm used to compress the data.
+           Default: Compression.ZLIB.
+        :type compression: :py:enum:`~pygamelib.constants.Compression`
+        :return: The binary representation of the board.
+        :rtype: bytes
+        :raise: :class:`~pygamelib.base.PglInvalidTypeException` if compression is not
+           a :py:enum:`~pygamelib.constants.Compression`.
+        :raise: :class:`~pygamelib.base.PglException` if lz4 is requested but not
+           installed.
+
+        Example::
+
+            with open("level_01.pgb", "wb") as f:
+                f.write(myboard.serialize_binary(Compression.LZ4))
+        """
+        return self._pack_binary(compression)
+
+    def _pack_binary(self, compression: Compression, extra: dict = None) -> bytes:
+        if compression not in _BINARY_BOARD_COMPRESSION_CODES:
+            raise base.PglInvalidTypeException(
+                "Board.serialize_binary(compression): compression must be a "
+                "pygamelib.constants.Compression."
+            )
+        header = self._serialize_header()
+        if extra is not None:
+            header.update(extra)
+        palette = []
+        palette_index = {}
+        seen_complex_items = set()
+        layer_count = max([len(cell) for cell in self._matrix.flat])
+        layers = np.zeros((layer_count, self.size[1], self.size[0]), dtype=np.uint32)
+        for cell in self._matrix.flat:
+            for item in cell:
+                if isinstance(item, board_items.BoardItemVoid):
+                    continue
+                # Complex items are stored once (at their own position) and not
+                # component by component.
+                if isinstance(item.parent, board_items.BoardComplexItem):
+                    item = item.parent
+                    if id(item) in seen_complex_items:
+                        continue
+                    seen_complex_items.add(id(item))
+                if isinstance(item, board_items.Player):
+                    continue
+                item_data = item.serialize()
+                item_data.pop("pos", None)
+                item_key = json.dumps(item_data, sort_keys=True)
+                index = palette_index.get(item_key)
+                if index is None:
+                    palette.append(item_data)
+                    index = len(palette)
+                    palette_index[item_key] = index
+                layers[item.layer, item.row, item.column] = index
+        dtype = np.dtype("<u2")
+        if len(palette) >= 2**16:
+            dtype = np.dtype("<u4")
+        header["palette"] = palette
+        header["layers"] = layer_count
+        header["dtype"] = dtype.str
+        header_bytes = json.dumps(header).encode("utf-8")
+        payload = (
+            struct.pack("<I", len(header_bytes))
+            + header_bytes
+            + layers.astype(dtype).tobytes()
+        )
+        return (
+            _BINARY_BOARD_MAGIC
+            + struct.pack(
+                "<BB",
+                _BINARY_BOARD_VERSION,
+                _BINARY_BOARD_COMPRESSION_CODES[compression],
+            )
+            + _compress(payload, compression)
+        )
+
+    @classmethod
+    def load_binary(cls, data: bytes):
+        """Create a new Board object from data generated by :meth:`serialize_binary()`.
+
+        .. versionadded:: 1.4.0
+
+        The items are bulk placed on the board: they are put back exactly where they
+        were when the board was serialized, without going through the validation of
+        :meth:`place_item()`.
+
+        :param data: The binary data.
+        :type data: bytes
+        :returns: A new Board object.
+        :rtype: :class:`Board`
+        :raise: :class:`~pygamelib.base.PglException` if data is not a binary board.
+
+        Example::
+
+            with open("level_01.pgb", "rb") as f:
+                level_01 = Board.load_binary(f.read())
+        """
+        header, layers = cls._unpack_binary(data)
+        return cls._from_binary(header, layers)
+
+    @staticmethod
+    def _unpack_binary(data: bytes):
+        magic_length = len(_BINARY_BOARD_MAGIC)
+        if data is None or data[:magic_length] != _BINARY_BOARD_MAGIC:
+            raise base.PglException(
+                "invalid_data", "Board.load_binary(data): data is not a binary board."
+            )
+        (version, code) = struct.unpack_from("<BB", data, magic_length)
+        if version != _BINARY_BOARD_VERSION:
+            raise base.PglException(
+                "invalid_data",
+                "Board.load_binary(data): unsupported binary format version "
+                f"{version}.",
+            )
+        compression = None
+        for c, v in _BINARY_BOARD_COMPRESSION_CODES.items():
+            if v == code:
+                compression = c
+        if compression is None:
+            raise base.PglException(
+                "invalid_data",
+                f"Board.load_binary(data): unknown compression code {code}.",
+            )
+        payload = _decompress(data[magic_length + 2 :], compression)
+        (header_length,) = struct.unpack_from("<I", payload, 0)
+        header = json.loads(payload[4 : 4 + header_length].decode("utf-8"))
+        layers = np.frombuffer(
+            payload, dtype=np.dtype(header["dtype"]), offset=4 + header_length
+        ).reshape((header["layers"], header["size"][1], header["size"][0]))
+        return header, layers
+
+    @classmethod
+    def _from_binary(cls, header: dict, layers):
+        tmp = cls._load_header(header)
+        # Each item needs its own copy of the template, the fastest way to get it is to
+        # parse the JSON again.
+        templates = [json.dumps(t) for t in header["palette"]]
+        placements = []
+        complex_items = []
+        for layer in range(layers.shape[0]):
+            (rows, columns) = np.nonzero(layers[layer])
+            indexes = layers[layer][rows, columns]
+            for r, c, idx in zip(rows.tolist(), columns.tolist(), indexes.tolist()):
+                item = Board.instantiate_item(json.loads(templates[idx - 1]))
+                if item is None:
+                    continue  # pragma: no cover
+                if isinstance(item, board_items.BoardComplexItem):
+                    complex_items.append((item, r, c, layer))
+                else:
+                    placements.append((item, r, c, layer))
+        tmp._bulk_place(placements)
+        # Complex items are made of multiple components, it is easier to let
+        # place_item() take care of them.
+        for item, r, c, layer in complex_items:
+            tmp.place_item(item, r, c, layer)
+        return tmp
+
+    def _bulk_place(self, placements):
+        # Place simple items exactly at the given (row, column, layer) without any
+        # validation and update the indexes once at the end.
+        # placements is a list of (item, row, column, layer) tuples.
+        movables = []
+        immovables = []
+        for item, row, column, layer in placements:
+            cell = self._matrix[row][column]
+            if layer >= len(cell):
+                self._create_missing_layers(row, column, layer)
+            existing_item = cell[layer]
+            # Same as place_item(): a transparent item takes the color of the void.
+            if (
+                isinstance(existing_item, board_items.BoardItemVoid)
+                and existing_item.sprixel is not None
+                and item.sprixel.is_bg_transparent
+            ):
+                item.sprixel.bg_color = existing_item.sprixel.bg_color
+            cell[layer] = item
+            if item.parent is None:
+                item.parent = self
+            item._auto_layer = True
+            item.store_position(row, column, layer)
+            self._update_blocking(row, column)
+            if isinstance(item, board_items.Movable):
+                movables.append(item)
+            elif isinstance(item, board_items.Immovable):
+                immovables.append(item)
+            if item.particle_emitter is not None and isinstance(
+                item.particle_emitter, particles.ParticleEmitter
+            ):
+                self._particle_emitters.add(item.particle_emitter)
+        self._movables.update(movables)
+        self._immovables.update(immovables)
+
+    def _take_snapshot_image(self):
+        # Return an immutable image of the content of the board: (cells, movables,
+        # immovables, particle emitters), where cells maps (row, column) to a tuple of
+        # the items of the cell. The image is shared with the previous one if nothing
+        # changed, and the unchanged cells are always shared.
+        image = self._snapshot_image
+        dirty = self._dirty_cells
+        if image is not None and not dirty:
+            return image
+        matrix = self._matrix
+        if image is None:
+            cells = {
+                (row, column): tuple(matrix[row][column])
+                for row in range(self.size[1])
+                for column in range(self.size[0])
+            }
+        else:
+            cells = image[0].copy()
+            for (row, column) in dirty:
+                cells[(row, column)] = tuple(matrix[row][column])
+        image = (
+            cells,
+            frozenset(self._movables),
+            frozenset(self._immovables),
+            frozenset(self._particle_emitters),
+        )
+        dirty.clear()
+        self._snapshot_image = image
+        return image
+
+    def _restore_snapshot_image(self, image):
+        # Put the board back in the state of an image taken by _take_snapshot_image().
+        # Only the cells that changed since are rewritten.
+        current = self._snapshot_image
+        dirty = self._dirty_cells
+        if current is image and not dirty:
+            return
+        cells, movables, immovables, emitters = image
+        changed = set(dirty)
+        if current is None:
+            changed.update(cells.keys())
+        elif current is not image:
+            current_cells = current[0]
+            changed.update(
+                position
+                for (position, content) in cells.items()
+                if current_cells[position] is not content
+            )
+        matrix = self._matrix
+        for (row, column) in changed:
+            cell = list(cells[(row, column)])
+            matrix[row][column] = cell
+            for (layer, item) in enumerate(cell):
+                item.store_position(row, column, layer)
+            self._update_blocking(row, column)
+        self._movables = set(movables)
+        self._immovables = set(immovables)
+        self._particle_emitters = set(emitters)
+        dirty.clear()
+        self._snapshot_image = image
+
     @staticmethod
     def instantiate_item(data: dict):
         """Instantiate a BoardItem from its serialized data.
@@ -1714,15 +2551,620 @@ class Board(base.PglBaseObject):
                     return_array.append(self.item(true_x, true_y))
         return return_array
 
+    # Transformations from the first octant to the 8 octants for the shadowcasting:
+    # (xx, xy, yx, yy).
+    _FOV_OCTANTS = (
+        (1, 0, 0, 1),
+        (0, 1, 1, 0),
+        (0, -1, 1, 0),
+        (-1, 0, 0, 1),
+        (-1, 0, 0, -1),
+        (0, -1, -1, 0),
+        (0, 1, -1, 0),
+        (1, 0, 0, -1),
+    )
+    # Maximum number of cached fields of view.
+    _FOV_CACHE_SIZE = 256
+
+    def field_of_view(self, row: int, column: int, radius: int) -> frozenset:
+        """Return the cells that are visible from a position.
+
+        .. versionadded:: 1.4.0
+
+        The field of view is computed with a recursive shadowcasting algorithm. A cell
+        blocks the view if it contains an item that is neither overlappable nor movable
+        (a wall for example). Movable items (NPCs, the player, etc.) do not block the
+        view. The opaque cells at the border of the field of view are visible
+        themselves (you can see the walls of a room).
+
+        The results are cached per origin and radius. A cached field of view is only
+        invalidated when an opaque cell within its radius changes, so calling this
+        method for dozens of NPCs every turn is cheap.
+
+        :param row: The row of the origin.
+        :type row: int
+        :param column: The column of the origin.
+        :type column: int
+        :param radius: The maximum distance of view (in cells).
+        :type radius: int
+        :returns: The set of the visible cells as (row, column) tuples.
+        :rtype: frozenset
+        :raise: :class:`~pygamelib.base.PglInvalidTypeException` if a parameter is not
+           an int.
+        :raise: :class:`~pygamelib.base.PglOutOfBoardBoundException` if the origin is
+           outside of the board.
+
+        Example::
+
+            visible = board.field_of_view(player.row, player.column, 8)
+            for npc in game.get_npcs():
+                if (npc.row, npc.column) in visible:
+                    npc.actuator = hunting_actuator
+        """
+        if type(row) is not int or type(column) is not int or type(radius) is not int:
+            raise base.PglInvalidTypeException(
+                "Board.field_of_view(row, column, radius): all parameters must be int."
+            )
+        if row < 0 or column < 0 or row >= self.size[1] or column >= self.size[0]:
+            raise base.PglOutOfBoardBoundException(
+                f"Board.field_of_view(): [{row},{column}] is out of the board."
+            )
+        cache_key = (row, column, radius)
+        visible = self._fov_cache.get(cache_key)
+        if visible is not None:
+            return visible
+        cells = {(row, column)}
+        if radius > 0:
+            for (xx, xy, yx, yy) in Board._FOV_OCTANTS:
+                self._cast_light(
+                    cells, row, column, radius, 1, 1.0, 0.0, xx, xy, yx, yy
+                )
+        visible = frozenset(cells)
+        if len(self._fov_cache) >= Board._FOV_CACHE_SIZE:
+            # Forget the oldest entry
+            del self._fov_cache[next(iter(self._fov_cache))]
+        self._fov_cache[cache_key] = visible
+        return visible
+
+    _DISTANCE_FIELD_CACHE_SIZE = 16
+
+    def distance_field(self, row: int, column: int) -> np.ndarray:
+        """Return the walking distance from every cell of the board to a target.
+
+        .. versionadded:: 1.4.0
+
+        The distance field (or Dijkstra map) is computed with a breadth first search
+        from the target: a cell can be walked through if it does not contain an item
+        that is neither overlappable nor movable (a wall for example). Like for
+        :meth:`field_of_view()`, movable items (NPCs, the player, etc.) are ignored.
+
+        The field is shared by everyone who looks for the same target, and it is cached
+        until the static items of the board change. It is what
+        :class:`~pygamelib.actuators.FlowFieldActuator` uses to move hordes of NPCs
+        toward the same target: each NPC simply steps to a neighbor cell that is one
+        step closer.
+
+        :param row: The row of the target.
+        :type row: int
+        :param column: The column of the target.
+        :type column: int
+        :returns: A read-only array of int32 (height x width) of the number of steps to
+           reach the target from each cell. It is -1 for the cells that cannot reach
+           the target.
+        :rtype: :class:`numpy.ndarray`
+        :raise: :class:`~pygamelib.base.PglInvalidTypeException` if row or column are
+           not int.
+        :raise: :class:`~pygamelib.base.PglOutOfBoardBoundException` if the target is
+           outside of the board.
+
+        Example::
+
+            distances = board.distance_field(player.row, player.column)
+            if distances[npc.row, npc.column] < 5:
+                npc.actuator = hunting_actuator
+        """
+        if type(row) is not int or type(column) is not int:
+            raise base.PglInvalidTypeException(
+                "Board.distance_field(row, column): row and column must be int."
+            )
+        if row < 0 or column < 0 or row >= self.size[1] or column >= self.size[0]:
+            raise base.PglOutOfBoardBoundException(
+                f"Board.distance_field(): [{row},{column}] is out of the board."
+            )
+        cached = self._distance_fields.pop((row, column), None)
+        if cached is None or cached[0] != self._terrain_version:
+            cached = (self._terrain_version, self._compute_distance_field(row, column))
+        while len(self._distance_fields) >= Board._DISTANCE_FIELD_CACHE_SIZE:
+            # Forget the least recently used entry
+            del self._distance_fields[next(iter(self._distance_fields))]
+        self._distance_fields[(row, column)] = cached
+        return cached[1]
+
+    def _compute_distance_field(self, row, column):
+        # Breadth first search on the whole frontier at once. The grid is padded with
+        # blocking cells so the neighbors of a cell are always at the same offsets.
+        (height, width) = self._static_blocking.shape
+        padded_width = width + 2
+        unvisited = np.zeros((height + 2, padded_width), dtype=bool)
+        unvisited[1:-1, 1:-1] = np.logical_not(self._static_blocking)
+        unvisited = unvisited.ravel()
+        distances = np.full(unvisited.shape, -1, dtype=np.int32)
+        origin = (row + 1) * padded_width + column + 1
+        unvisited[origin] = False
+        distances[origin] = 0
+        offsets = np.array([padded_width, -padded_width, 1, -1], dtype=np.intp)
+        frontier = np.array([origin], dtype=np.intp)
+        distance = 0
+        while frontier.size > 0:
+            distance += 1
+            neighbors = (frontier[:, np.newaxis] + offsets).ravel()
+            neighbors = np.unique(neighbors[unvisited[neighbors]])
+            unvisited[neighbors] = False
+            distances[neighbors] = distance
+            frontier = neighbors
+        field = distances.reshape(height + 2, padded_width)[1:-1, 1:-1].copy()
+        field.flags.writeable = False
+        return field
+
+    def _cast_light(
+        self, cells, o_row, o_column, radius, start_row, start, end, xx, xy, yx, yy
+    ):
+        # Recursive shadowcasting for one octant (see field_of_view()).
+        if start < end:
+            return
+        opaque = self._static_blocking
+        (width, height) = self.size
+        radius_squared = radius * radius
+        new_start = 0.0
+        for j in range(start_row, radius + 1):
+            dx = -j - 1
+            dy = -j
+            blocked = False
+            while dx <= 0:
+                dx += 1
+                # Translate the relative coordinates into board coordinates.
+                c = o_column + dx * xx + dy * xy
+                r = o_row + dx * yx + dy * yy
+                left_slope = (dx - 0.5) / (dy + 0.5)
+                right_slope = (dx + 0.5) / (dy - 0.5)
+                if start < right_slope:
+                    continue
+                elif end > left_slope:
+                    break
+                inside = 0 <= r < height and 0 <= c < width
+                if inside and dx * dx + dy * dy <= radius_squared:
+                    cells.add((r, c))
+                # Everything outside of the board blocks the view.
+                is_opaque = not inside or opaque[r, c]
+                if blocked:
+                    if is_opaque:
+                        new_start = right_slope
+                        continue
+                    else:
+                        blocked = False
+                        start = new_start
+                elif is_opaque and j < radius:
+                    # Starting a blocked section: scan the next row for the part that
+                    # is still visible.
+                    blocked = True
+                    self._cast_light(
+                        cells,
+                        o_row,
+                        o_column,
+                        radius,
+                        j + 1,
+                        start,
+                        left_slope,
+                        xx,
+                        xy,
+                        yx,
+                        yy,
+                    )
+                    new_start = right_slope
+            if blocked:
+                break
+
+    def line_of_sight(self, a, b) -> bool:
+        """Tell if there is a clear line of sight between 2 positions.
+
+        .. versionadded:: 1.4.0
+
+        The line between a and b is traced with the Bresenham algorithm. The line of
+        sight is clear if none of the cells between a and b (excluded) blocks the view
+        (see :meth:`field_of_view()` for the definition of a cell that blocks the
+        view).
+
+        :param a: The first position. Either a BoardItem or a (row, column) sequence.
+        :type a: :class:`~pygamelib.board_items.BoardItem` | tuple
+        :param b: The second position. Either a BoardItem or a (row, column) sequence.
+        :type b: :class:`~pygamelib.board_items.BoardItem` | tuple
+        :returns: True if a can see b.
+        :rtype: bool
+        :raise: :class:`~pygamelib.base.PglInvalidTypeException` if a or b is not a
+           valid position.
+
+        Example::
+
+            if board.line_of_sight(guard, game.player):
+                guard.actuator = actuators.PathFinder(game=game, actor=guard)
+        """
+        positions = []
+        for p in [a, b]:
+            if isinstance(p, board_items.BoardItem):
+                positions.append((p.row, p.column))
+            elif isinstance(p, (tuple, list)) and len(p) >= 2:
+                positions.append((p[0], p[1]))
+            else:
+                raise base.PglInvalidTypeException(
+                    "Board.line_of_sight(a, b): a and b must be BoardItem or "
+                    "(row, column) sequences."
+                )
+        ((r0, c0), (r1, c1)) = positions
+        opaque = self._static_blocking
+        (width, height) = self.size
+        d_row = abs(r1 - r0)
+        d_column = abs(c1 - c0)
+        s_row = 1 if r0 < r1 else -1
+        s_column = 1 if c0 < c1 else -1
+        error = d_column - d_row
+        (r, c) = (r0, c0)
+        while (r, c) != (r1, c1):
+            e2 = 2 * error
+            if e2 > -d_row:
+                error -= d_row
+                c += s_column
+            if e2 < d_column:
+                error += d_column
+                r += s_row
+            if (r, c) == (r1, c1):
+                break
+            if not (0 <= r < height and 0 <= c < width) or opaque[r, c]:
+                return False
+        return True
+
+
+class _NpcLevelOfDetail:
+    # Spatial index of the NPCs of a level used by Game.actuate_npcs() to select the
+    # NPCs to actuate according to their distance to a focus point. The NPCs are
+    # stored in buckets of BUCKET_SIZE x BUCKET_SIZE cells. Each entry is:
+    # [npc, bucket key, clock of the last actuation, last tick seen, phase].
+
+    BUCKET_SIZE = 16
+    # Number of NPCs whose bucket is checked at each tick, to catch up with the NPCs
+    # that were moved by something else than actuate_npcs().
+    REVALIDATE = 64
+
+    def __init__(self, npcs):
+        self.npcs = npcs
+        self.count = len(npcs)
+        self.buckets = {}
+        self.entries = {}
+        self.tick = 0
+        self.clock = 0.0
+        self.cursor = 0
+        for npc in npcs:
+            self.relocate(npc)
+
+    def relocate(self, npc):
+        entry = self.entries.get(id(npc))
+        if npc.row is None or npc.column is None:
+            # Not on the board anymore.
+            if entry is not None:
+                del self.buckets[entry[1]][id(npc)]
+                del self.entries[id(npc)]
+            return
+        bucket_key = (npc.row // self.BUCKET_SIZE, npc.column // self.BUCKET_SIZE)
+        if entry is None:
+            entry = [npc, bucket_key, self.clock, 0, len(self.entries)]
+            self.entries[id(npc)] = entry
+        elif entry[1] == bucket_key:
+            return
+        else:
+            del self.buckets[entry[1]][id(npc)]
+            entry[1] = bucket_key
+        self.buckets.setdefault(bucket_key, {})[id(npc)] = entry
+
+    def select(self, row, column, bands, elapsed_time, size):
+        self.tick += 1
+        self.clock += elapsed_time
+        tick = self.tick
+        clock = self.clock
+        count = len(self.npcs)
+        for _ in range(min(self.REVALIDATE, count)):
+            self.cursor = (self.cursor + 1) % count
+            self.relocate(self.npcs[self.cursor])
+        radius = bands[-1][0]
+        bucket_size = self.BUCKET_SIZE
+        selected = []
+        for bucket_row in range(
+            max(0, row - radius) // bucket_size,
+            min(size[1] - 1, row + radius) // bucket_size + 1,
+        ):
+            for bucket_column in range(
+                max(0, column - radius) // bucket_size,
+                min(size[0] - 1, column + radius) // bucket_size + 1,
+            ):
+                bucket = self.buckets.get((bucket_row, bucket_column))
+                if not bucket:
+                    continue
+                for entry in bucket.values():
+                    npc = entry[0]
+                    distance = max(abs(npc.row - row), abs(npc.column - column))
+                    if distance > radius:
+                        continue
+                    if entry[3] != tick - 1:
+                        # The NPC was sleeping: it does not get the time it slept.
+                        entry[2] = clock - elapsed_time
+                    entry[3] = tick
+                    for (band_distance, interval) in bands:
+                        if distance <= band_distance:
+                            break
+                    if interval > 1 and (tick + entry[4]) % interval:
+                        continue
+                    selected.append((npc, clock - entry[2]))
+                    entry[2] = clock
+        return selected
+
+
+class _NpcMoveQueue:
+    # Priority queue of the NPCs of a level ordered by the time of their next move,
+    # used by Game.actuate_npcs() in real time mode. Each entry is:
+    # [next move time, sequence, npc, time of the last actuation, valid,
+    # movement speed used for the next move time].
+
+    def __init__(self, npcs):
+        self.npcs = npcs
+        self.count = 0
+        self.clock = 0.0
+        self.heap = []
+        self.entries = {}
+        self.sequence = 0
+        self.speed_changes = board_items.Movable._movement_speed_changes
+        # The entries popped by the last call to due().
+        self._popped = []
+        for npc in npcs:
+            self.add(npc, False)
+        heapq.heapify(self.heap)
+
+    def add(self, npc, push=True):
+        last = self.clock - npc.dtmove
+        speed = npc.movement_speed
+        entry = [last + speed, self.sequence, npc, last, True, speed]
+        self.sequence += 1
+        self.count += 1
+        self.entries[id(npc)] = entry
+        if push:
+            heapq.heappush(self.heap, entry)
+        else:
+            self.heap.append(entry)
+
+    def discard(self, npc):
+        entry = self.entries.pop(id(npc), None)
+        if entry is not None:
+            # Lazy removal: the entry is skipped when it is popped.
+            entry[4] = False
+            self.count -= 1
+
+    def due(self, elapsed_time):
+        # Pop the NPCs that are due and return them with the time elapsed since their
+        # last actuation (at least what they need to be allowed to move).
+        self.clock += elapsed_time
+        clock = self.clock
+        if self.speed_changes != board_items.Movable._movement_speed_changes:
+            self._rekey()
+        heap = self.heap
+        entries = []
+        while heap and heap[0][0] <= clock:
+            entry = heapq.heappop(heap)
+            if entry[4]:
+                entries.append(entry)
+        # Keep the order of the NPCs list for the NPCs that are due at the same time.
+        entries.sort(key=lambda e: e[1])
+        self._popped = entries
+        return [
+            (e[2], max(clock - e[3], e[2].movement_speed - e[2].dtmove))
+            for e in entries
+        ]
+
+    def _rekey(self):
+        # Some movement speeds changed: move the next move time of these NPCs (like
+        # if they had always moved at that speed since their last actuation).
+        self.speed_changes = board_items.Movable._movement_speed_changes
+        changed = False
+        for entry in self.heap:
+            speed = entry[2].movement_speed
+            if entry[4] and speed != entry[5]:
+                entry[0] = entry[3] + speed
+                entry[5] = speed
+                changed = True
+        if changed:
+            heapq.heapify(self.heap)
+
+    def reschedule(self):
+        clock = self.clock
+        for entry in self._popped:
+            if not entry[4]:
+                continue
+            npc = entry[2]
+            speed = npc.movement_speed
+            entry[3] = clock - npc.dtmove
+            entry[0] = entry[3] + speed
+            entry[5] = speed
+            if entry[0] <= clock:
+                # The NPC did not move (its actuator is paused for example), it is
+                # checked again after a full movement_speed.
+                entry[0] = clock + speed
+                entry[3] = clock
+            heapq.heappush(self.heap, entry)
+        self._popped = []
+
+
+def _copy_state(state):
+    # Copy the attributes of an object (its __dict__ or a state captured by this
+    # function) one level deep: enough to restore the simulation state of the items,
+    # actuators and inventories. The observers are not part of the state.
+    copied = state.copy()
+    copied.pop("_observers", None)
+    copied.pop("_topic_observers", None)
+    copied_types = _SNAPSHOT_COPIED_TYPES
+    for name in [
+        name for (name, value) in copied.items() if type(value) in copied_types
+    ]:
+        value = copied[name]
+        if type(value) is base.Vector2D:
+            # Vector2D are mutated in place (the accumulated movement for example).
+            vector = object.__new__(base.Vector2D)
+            vector.__dict__.update(value.__dict__)
+            copied[name] = vector
+        else:
+            copied[name] = value.copy()
+    return copied
+
+
+_SNAPSHOT_COPIED_TYPES = frozenset([list, dict, set, base.Vector2D])
+
+
+class _GameSnapshot:
+    # The simulation state of a Game, see Game.snapshot().
+    __slots__ = ("game", "current_level", "player", "levels", "states", "random_state")
+
+    def __init__(self, game, current_level, player, levels, states, random_state):
+        self.game = game
+        self.current_level = current_level
+        self.player = player
+        # level number -> (board, board image, npcs, projectiles)
+        self.levels = levels
+        # [(object, state)] for the movables, their actuators and inventories.
+        self.states = states
+        self.random_state = random_state
+
+
+class _InputRecording:
+    # The inputs of a game session: the elapsed time of each frame of the main loop and
+    # the keys hit by the user, indexed by frame. It is stored as a zlib compressed
+    # JSON header followed by the elapsed times (float64) of all the frames.
+
+    def __init__(self, seed=None, fixed_timestep=None, threaded=False):
+        self.seed = seed
+        self.fixed_timestep = fixed_timestep
+        # If the game used threaded_input, the keys of each frame are a list.
+        self.threaded = threaded
+        self.elapsed = []
+        # frame index -> Keystroke (or list of Keystroke)
+        self.keys = {}
+
+    def record(self, in_key, elapsed):
+        if in_key:
+            self.keys[len(self.elapsed)] = in_key
+        self.elapsed.append(elapsed)
+
+    def save(self, filename):
+        keys = []
+        for (frame, in_keys) in self.keys.items():
+            if not self.threaded:
+                in_keys = [in_keys]
+            for k in in_keys:
+                keys.append(
+                    [frame, str(k), getattr(k, "code", None), getattr(k, "name", None)]
+                )
+        header = {
+            "seed": self.seed,
+            "fixed_timestep": self.fixed_timestep,
+            "threaded": self.threaded,
+            "keys": keys,
+        }
+        header_bytes = json.dumps(header, separators=(",", ":")).encode("utf-8")
+        payload = (
+            struct.pack("<I", len(header_bytes))
+            + header_bytes
+            + np.array(self.elapsed, dtype="<f8").tobytes()
+        )
+        with open(filename, "wb") as f:
+            f.write(
+                _INPUT_RECORDING_MAGIC
+                + struct.pack("<B", _INPUT_RECORDING_VERSION)
+                + zlib.compress(payload)
+            )
+
+    @classmethod
+    def load(cls, filename):
+        with open(filename, "rb") as f:
+            data = f.read()
+        magic_length = len(_INPUT_RECORDING_MAGIC)
+        if data[:magic_length] != _INPUT_RECORDING_MAGIC:
+            raise base.PglException(
+                "invalid_data",
+                f"Game.replay_inputs(filename): {filename} is not an input recording.",
+            )
+        (version,) = struct.unpack_from("<B", data, magic_length)
+        if version != _INPUT_RECORDING_VERSION:
+            raise base.PglException(
+                "invalid_data",
+                "Game.replay_inputs(filename): unsupported input recording version "
+                f"{version}.",
+            )
+        payload = zlib.decompress(data[magic_length + 1 :])
+        (header_length,) = struct.unpack_from("<I", payload, 0)
+        header = json.loads(payload[4 : 4 + header_length].decode("utf-8"))
+        # The recordings made before threaded_input have no "threaded" entry.
+        recording = cls(
+            header["seed"], header["fixed_timestep"], header.get("threaded", False)
+        )
+        recording.elapsed = np.frombuffer(
+            payload, dtype="<f8", offset=4 + header_length
+        ).tolist()
+        for (frame, ucs, code, name) in header["keys"]:
+            if recording.threaded:
+                recording.keys.setdefault(frame, []).append(Keystroke(ucs, code, name))
+            else:
+                recording.keys[frame] = Keystroke(ucs, code, name)
+        return recording
+
+
+class _InputReplay:
+    # Feeds the frames of an _InputRecording to the main loop (in place of the
+    # keyboard and the clock) and measures the time spent on each frame.
+
+    def __init__(self, recording):
+        self.recording = recording
+        self.frame = 0
+        self.frame_times = []
+        self.last_frame_start = None
+        self.no_key = Keystroke("")
+
+    def next_frame(self, game):
+        now = time.perf_counter()
+        if self.last_frame_start is not None:
+            self.frame_times.append(now - self.last_frame_start)
+        self.last_frame_start = now
+        frame = self.frame
+        if frame >= len(self.recording.elapsed):
+            game.stop()
+            return (self.no_key, 0.0)
+        self.frame += 1
+        in_key = self.recording.keys.get(frame)
+        if in_key is None:
+            in_key = [] if self.recording.threaded else self.no_key
+        elif self.recording.threaded:
+            in_key = list(in_key)
+        return (in_key, self.recording.elapsed[frame])
+
+
+async def _await_result(result):
+    # Await the result of a user callback if it is a coroutine (or any awaitable).
+    if inspect.isawaitable(result):
+        return await result
+    return result
+
+
+class Game(base.PglBaseObject):
+    """A class that serve as a game engine.
+
+    This object is the central system that allow the management of a game. It holds
+    boards (see :class:`pygamelib.engine.Board`), associate it to level, takes care of
+    level changing, etc.
+
 
-class Game(base.PglBaseObject):
-    """A class that serve as a game engine.
-
-    This object is the central system that allow the management of a game. It holds
-    boards (see :class:`pygamelib.engine.Board`), associate it to level, takes care of
-    level changing, etc.
-
-
 
     .. note:: The game object has an object_library member that is always an empty array
         except just after loading a board. In this case, if the board have a "library"
@@ -1774,6 +3216,15 @@ class Game(base.PglBaseObject):
         user_update=None,
         input_lag=0.01,
         user_update_paused=None,
+        batch_npc_moves=False,
+        fixed_timestep=None,
+        user_render=None,
+        max_ticks_per_frame=5,
+        npc_lod_bands=None,
+        schedule_npc_moves=False,
+        threaded_input=False,
+        background_tick_rate=None,
+        background_budget=0.002,
         # enable_physic=False,
     ):
         """
@@ -1819,6 +3270,58 @@ class Game(base.PglBaseObject):
            user input before returning None and calling the update function. Default is
            0.01.
         :type input_lag: float|int
+        :param batch_npc_moves: If True, :meth:`actuate_npcs()` moves all the NPCs of
+           a level at once with :meth:`Board.move_many()` instead of moving them one
+           after the other. The outcome no longer depends on the order of the NPCs and
+           it is a lot faster with crowds of NPCs. Default: False.
+        :type batch_npc_moves: bool
+        :param fixed_timestep: If set, run() simulates the game at a fixed rate: the
+           duration of a simulation tick in seconds (1/60 for 60 ticks per second).
+           The user update function, the NPCs, projectiles and animations are then
+           always updated with that exact amount of time, whatever the speed of the
+           rendering. Default: None (the elapsed time is passed as is).
+        :type fixed_timestep: float
+        :param user_render: A reference to a render function. In fixed timestep mode,
+           it is called once per frame, after the simulation ticks, with 2 parameters:
+           the game object and the interpolation factor (a float between 0 and 1 that
+           tells how far the game is between the last tick and the next one). It is
+           ignored if fixed_timestep is not set.
+        :type user_render: function
+        :param max_ticks_per_frame: In fixed timestep mode, the maximum number of
+           simulation ticks run in one frame. If the simulation falls further behind,
+           the late time is dropped (the game slows down instead of freezing).
+           Default: 5.
+        :type max_ticks_per_frame: int
+        :param npc_lod_bands: The level of detail bands used by :meth:`actuate_npcs()`
+           (see :attr:`npc_lod_bands`). Default: None (all the NPCs are actuated at
+           every call).
+        :type npc_lod_bands: list
+        :param schedule_npc_moves: If True, in real time mode, :meth:`actuate_npcs()`
+           keeps the NPCs in a priority queue ordered by the time of their next move
+           and only actuates the ones that are due, instead of checking all of them at
+           each frame. Default: False.
+        :type schedule_npc_moves: bool
+        :param threaded_input: If True, run() reads the keyboard in a dedicated thread
+           that queues all the key events. The user update function then receives the
+           list of all the keys hit since the previous frame (possibly empty) instead
+           of a single key. In real time mode, input_lag becomes the duration of a
+           frame: the frames are no longer shortened or delayed by the key presses.
+           Default: False.
+        :type threaded_input: bool
+        :param background_tick_rate: The number of times per second the NPCs and
+           projectiles of the levels that are not the current level are updated by
+           run() (see :meth:`set_level_tick_rate()`). Default: None (the inactive
+           levels are frozen).
+        :type background_tick_rate: float
+        :param background_budget: The maximum time (in seconds) spent on the inactive
+           levels in one frame. The levels that are not updated because of the budget
+           are updated in the next frames. Default: 0.002.
+        :type background_budget: float
+
+        .. versionadded:: 1.4.0
+           The batch_npc_moves, fixed_timestep, user_render, max_ticks_per_frame,
+           npc_lod_bands, schedule_npc_moves, threaded_input, background_tick_rate and
+           background_budget parameters.
         """
         super().__init__()
         self.name = name
@@ -1839,6 +3342,44 @@ class Game(base.PglBaseObject):
         self.user_update = user_update
         self.user_update_paused = None
         self.input_lag = input_lag
+        self.batch_npc_moves = batch_npc_moves
+        #: The :class:`~pygamelib.base.Scheduler` of the game. It is updated at each
+        #: frame (or tick) of :meth:`run()`, before calling the user update function.
+        self.scheduler = base.Scheduler()
+        self.fixed_timestep = fixed_timestep
+        self.user_render = user_render
+        self.max_ticks_per_frame = max_ticks_per_frame
+        self.interpolation = 0.0
+        self._npc_lod = {}
+        self.schedule_npc_moves = schedule_npc_moves
+        self._npc_queues = {}
+        self.npc_lod_bands = npc_lod_bands
+        self.threaded_input = threaded_input
+        #: The default tick rate (per second) of the inactive levels, see
+        #: :meth:`set_level_tick_rate()`.
+        self.background_tick_rate = background_tick_rate
+        #: The maximum time spent on the inactive levels in one frame (in seconds).
+        self.background_budget = background_budget
+        self._level_tick_rates = {}
+        # The time elapsed since the last tick of each inactive level and the levels
+        # that are due for a tick (in order).
+        self._background_elapsed = {}
+        self._background_due = collections.OrderedDict()
+        # The tick of an inactive level in progress:
+        # [level number, elapsed time, npcs, index of the next npc].
+        self._background_tick = None
+        # The inactive level that is being updated (see current_board()).
+        self._acting_level = None
+        # The boards loaded in the background, to add to the game by the game loop:
+        # (board, function that adds it, future).
+        self._loaded_boards = queue.SimpleQueue()
+        # The threads that load the boards in the background: (level number, thread).
+        self._board_loaders = []
+        # The key events queued by the input thread (if threaded_input is True).
+        self.__input_queue = None
+        #: The item around which the level of detail of the NPCs is computed. If it is
+        #: None, the partial display focus (or the player) is used.
+        self.npc_lod_focus = None
         self._logs = []
         self.ENABLE_SESSION_LOGS = False
         # TODO : In future release I'll add physic
@@ -1859,6 +3400,11 @@ class Game(base.PglBaseObject):
             self.user_update_paused = user_update_paused
         self.previous_time = time.time()
         self.__execute_run = None
+        # The source of the frames (user input and elapsed time) of the main loop.
+        self.__next_frame = self._live_frame
+        self.__read_frame = self._live_frame
+        # The inputs recording requested by record_inputs(): (filename, recording).
+        self.__input_recording = None
 
     @property
     def state(self):
@@ -1885,6 +3431,65 @@ class Game(base.PglBaseObject):
             self._set_run_function()
         self.notify(self, "pygamelib.engine.Game.state", value)
 
+    @property
+    def npc_lod_bands(self):
+        """Get/set the level of detail (LOD) bands of the NPCs simulation.
+
+        .. versionadded:: 1.4.0
+
+        The bands are a list of (distance, interval) tuples. When they are set,
+        :meth:`actuate_npcs()` only actuates the NPCs that are at most distance cells
+        away from the focus (see :attr:`npc_lod_focus`), every interval calls. The
+        elapsed time given to these NPCs is the time since their last actuation, so
+        they keep their real speed. The NPCs that are farther than the last band are
+        asleep: they are not actuated until they come back in range.
+
+        The distance is the number of cells in the longest direction (Chebyshev
+        distance). The NPCs are kept in a spatial index, so the cost of
+        :meth:`actuate_npcs()` only depends on the number of NPCs around the focus,
+        not on the size of the level.
+
+        The bands are sorted by distance when they are set. Setting the bands to None
+        disables the LOD.
+
+        :param value: The new bands.
+        :type value: list
+        :raise: :class:`~pygamelib.base.PglInvalidTypeException` if the bands are not
+           a list of (int, int) tuples with a positive distance and a strictly positive
+           interval.
+
+        Example::
+
+            # NPCs within 20 cells move every frame, the ones within 60 cells every 4
+            # frames and all the others sleep.
+            game.npc_lod_bands = [(20, 1), (60, 4)]
+        """
+        return self.__npc_lod_bands
+
+    @npc_lod_bands.setter
+    def npc_lod_bands(self, value):
+        if value is not None:
+            if not isinstance(value, (list, tuple)) or len(value) == 0:
+                raise base.PglInvalidTypeException(
+                    "Game.npc_lod_bands: the bands must be a non empty list of "
+                    "(distance, interval) tuples."
+                )
+            for band in value:
+                if (
+                    not isinstance(band, (list, tuple))
+                    or len(band) != 2
+                    or type(band[0]) is not int
+                    or type(band[1]) is not int
+                    or band[0] < 0
+                    or band[1] < 1
+                ):
+                    raise base.PglInvalidTypeException(
+                        "Game.npc_lod_bands: each band must be a (distance, interval) "
+                        "tuple of int, with distance >= 0 and interval >= 1."
+                    )
+            value = sorted((tuple(band) for band in value), key=lambda b: b[0])
+        self.__npc_lod_bands = value
+
     @classmethod
     def instance(cls, *args, **kwargs):
         """Returns the instance of the Game object
@@ -1942,24 +3547,612 @@ class Game(base.PglBaseObject):
            and the game will continue to run. The notification message is
            :boldblue:`pygamelib.engine.Game.run:PauseNotAvailable`
 
+        .. versionadded:: 1.4.0
+
+        Right before calling the user_update function, the callbacks of
+        :attr:`scheduler` that are due are called (see
+        :class:`~pygamelib.base.Scheduler`).
+
+        After the current level, the inactive levels that have a tick rate are updated
+        within the background budget (see :meth:`set_level_tick_rate()`).
+
+        If the Game object is created with a fixed_timestep, the simulation is
+        decoupled from the rendering. The elapsed time of each frame is accumulated and
+        consumed in ticks of exactly fixed_timestep seconds. For each tick, the user
+        update function is called with fixed_timestep as the elapsed time and the NPCs,
+        projectiles and animations are updated. The keys hit by the user are passed one
+        by one to the next ticks so none is lost. Then, the user_render function (if
+        any) is called once with the interpolation factor (also available in
+        :attr:`interpolation`). The physics of the game are deterministic and do not
+        depend on the rendering speed anymore.
+
         :raises: PglInvalidTypeException, PglInvalidTypeException
 
         Example::
 
             mygame.run()
+
+            # Fixed timestep: 60 simulation ticks per second.
+            def render(game, alpha):
+                game.screen.update()
+
+            mygame = engine.Game(
+                mode=constants.MODE_RT,
+                user_update=update,
+                user_render=render,
+                fixed_timestep=1 / 60,
+            )
+            mygame.run()
         """
         # run() automatically position the cursor to 0,0 after calling user_update
         # if the lines are "end of line" safe (i.e using Game.display_line()) you don't
         # need to clear the screen.
         # The game will also automatically enter fullscreen mode and restore the
         # terminal state after.
+        self._prepare_run("run")
+        # Now we check that we do have a current board. If not, it means that the user
+        # wants to use the game object without any board.
+        self._set_run_function()
+        recording = self.__start_recording()
+        input_thread = None
+        try:
+            with self.terminal.cbreak(), self.terminal.hidden_cursor(), (
+                self.terminal.fullscreen()
+            ):
+                if self.threaded_input:
+                    input_thread = self.__start_input_thread()
+                    self.__read_frame = self._threaded_frame
+                self.__next_frame = self.__read_frame
+                if recording is not None:
+                    self.__next_frame = self._recording_frame
+                self.__execute_run()
+        finally:
+            if input_thread is not None:
+                self.__input_queue = None
+                input_thread.join()
+            self.__next_frame = self._live_frame
+            self.__read_frame = self._live_frame
+            self.__save_recording()
+
+    async def run_async(self):
+        """
+        .. versionadded:: 1.4.0
+
+        An asyncio version of :meth:`run()`. It runs the main game loop as a coroutine
+        so the game can share its event loop with other tasks (network connections,
+        subprocesses, files loading, etc.) without blocking the frames or requiring
+        threads.
+
+        The loop works exactly like :meth:`run()` (including the fixed timestep mode)
+        with the following differences:
+
+         * The user input is read when stdin becomes readable (through the event loop)
+           instead of blocking in the terminal. If the event loop cannot watch stdin
+           (on Windows for example), the keyboard is polled every input_lag seconds.
+         * The frames are scheduled with asyncio.sleep(), the other tasks run while
+           the game waits for the next frame.
+         * user_update, user_update_paused and user_render can be coroutine
+           functions. In that case they are awaited.
+         * With threaded_input, no thread is needed: the keys already buffered by the
+           terminal are read at each frame and passed as a list to user_update.
+
+        :raises: PglInvalidTypeException
+
+        Example::
+
+            async def update(game, key, dt):
+                data = await reader.read(100)
+                ...
+
+            async def main():
+                mygame = engine.Game(user_update=update, mode=constants.MODE_RT)
+                await asyncio.gather(mygame.run_async(), server.serve_forever())
+
+            asyncio.run(main())
+        """
+        self._prepare_run("run_async")
+        loop = asyncio.get_running_loop()
+        key_ready = asyncio.Event()
+        stdin_fd = None
+        try:
+            stdin_fd = sys.stdin.fileno()
+            loop.add_reader(stdin_fd, key_ready.set)
+        except (AttributeError, ValueError, OSError, NotImplementedError):
+            # No file descriptor (captured stdin) or not supported by the loop.
+            stdin_fd = None
+        accumulator = 0.0
+        pending_keys = []
+        recording = self.__start_recording()
+        try:
+            with self.terminal.cbreak(), self.terminal.hidden_cursor(), (
+                self.terminal.fullscreen()
+            ):
+                while self.state != State.STOPPED:
+                    in_key = await self._async_inkey(key_ready, stdin_fd is not None)
+                    if self.threaded_input:
+                        in_key = self.__buffered_keys(in_key)
+                    now = time.perf_counter()
+                    elapsed = now - self.previous_time
+                    self.previous_time = now
+                    if recording is not None:
+                        recording.record(in_key, elapsed)
+                    if self.state == State.RUNNING:
+                        step = self.fixed_timestep
+                        if step is None:
+                            await self._async_tick(in_key, elapsed)
+                            continue
+                        if in_key:
+                            pending_keys.append(in_key)
+                        accumulator += elapsed
+                        ticks = 0
+                        while accumulator >= step and self.state == State.RUNNING:
+                            if ticks >= self.max_ticks_per_frame:
+                                accumulator %= step
+                                break
+                            if pending_keys:
+                                tick_key = pending_keys.pop(0)
+                            else:
+                                tick_key = [] if self.threaded_input else None
+                            await self._async_tick(tick_key, step)
+                            accumulator -= step
+                            ticks += 1
+                        if self.state != State.RUNNING:
+                            continue
+                        self.interpolation = accumulator / step
+                        if self.user_render is not None:
+                            await _await_result(
+                                self.user_render(self, self.interpolation)
+                            )
+                    elif self.state == State.PAUSED:
+                        accumulator = 0.0
+                        print(self.terminal.home, end="")
+                        await _await_result(
+                            self.user_update_paused(self, in_key, elapsed)
+                        )
+                        print(self.terminal.clear_eos, end="")
+        finally:
+            if stdin_fd is not None:
+                loop.remove_reader(stdin_fd)
+            self.__save_recording()
+
+    def step(self, inputs=None, dt=None):
+        """
+        .. versionadded:: 1.4.0
+
+        Advance the game by exactly one tick, without the terminal.
+
+        It does what one iteration of :meth:`run()` does, but the user input is given
+        (inputs is passed to user_update as the key) and so is the elapsed time (dt).
+        Nothing is read from the keyboard, nothing is printed and there is no waiting.
+        It is meant to drive the game from code: tests, balance simulations, AI
+        rollouts, replays, etc.
+
+        If the game is running, the scheduler is updated, user_update is called and
+        the NPCs, projectiles and animations of the current level (if any) are
+        updated. If the game is paused, user_update_paused is called (if defined). If
+        the game is stopped, nothing happens.
+
+        .. Important:: Unlike :meth:`run()` and :meth:`simulate()`, step() does not
+           start a paused game. Call :meth:`start()` first.
+
+        :param inputs: The user input for this tick (like the key in run()). It can be
+           None.
+        :type inputs: :class:`blessed.keyboard.Keystroke` | str
+        :param dt: The elapsed time of the tick in seconds. If None, the fixed_timestep
+           of the game is used.
+        :type dt: int | float
+
+        :raises: PglInvalidTypeException
+
+        Example::
+
+            game.start()
+            game.step("d", 0.02)
+        """
+        self._step(inputs, self.__checked_dt("step", dt))
+
+    def simulate(self, n_ticks, inputs=None, dt=None, seed=None):
+        """
+        .. versionadded:: 1.4.0
+
+        Run n_ticks ticks of the game as fast as possible, without the terminal (see
+        :meth:`step()`). Like :meth:`run()`, the game is started if it is paused. The
+        simulation ends early if the game is stopped.
+
+        The inputs can be given as an iterable (one input per tick, None once it is
+        exhausted) or as a function that takes the game and the tick number as
+        parameters and returns the input of the tick.
+
+        If a seed is given, the random generator used by the library (Python's random
+        module, used by :class:`~pygamelib.actuators.RandomActuator` and the particle
+        emitters) is seeded with it. Along with the fixed elapsed time of the ticks, it
+        makes the simulations reproducible. Some objects draw random numbers when they
+        are created (like the RandomActuator), to reproduce the whole game, seed the
+        random module before creating them too.
+
+        :param n_ticks: The number of ticks to run.
+        :type n_ticks: int
+        :param inputs: The user inputs.
+        :type inputs: list | function
+        :param dt: The elapsed time of each tick in seconds. If None, the
+           fixed_timestep of the game is used.
+        :type dt: int | float
+        :param seed: The seed of the random generator.
+        :type seed: int | float | str | bytes
+        :returns: The number of ticks that were run.
+        :rtype: int
+
+        :raises: PglInvalidTypeException
+
+        Example::
+
+            game = engine.Game(user_update=update, mode=constants.MODE_RT)
+            game.add_board(1, board)
+            game.change_level(1)
+            # 10 minutes of the game at 60 ticks per second with a scripted player.
+            game.simulate(36000, inputs=bot.next_key, dt=1 / 60, seed=42)
+        """
+        if type(n_ticks) is not int or n_ticks < 0:
+            raise base.PglInvalidTypeException(
+                "Game.simulate(n_ticks, inputs, dt, seed): n_ticks must be a positive "
+                "int."
+            )
+        dt = self.__checked_dt("simulate", dt)
+        if inputs is None:
+            next_input = None
+        elif callable(inputs):
+            next_input = inputs
+        else:
+            try:
+                inputs = iter(inputs)
+            except TypeError:
+                raise base.PglInvalidTypeException(
+                    "Game.simulate(n_ticks, inputs, dt, seed): inputs must be an "
+                    "iterable or a function."
+                )
+
+            def next_input(game, tick):
+                return next(inputs, None)
+
+        if seed is not None:
+            random.seed(seed)
+        if self.state == State.PAUSED:
+            self.start()
+        tick = 0
+        while tick < n_ticks and self.state != State.STOPPED:
+            self._step(None if next_input is None else next_input(self, tick), dt)
+            tick += 1
+        return tick
+
+    def record_inputs(self, filename, seed=None):
+        """
+        .. versionadded:: 1.4.0
+
+        Record the inputs of the next game session in a file.
+
+        The next call to :meth:`run()` (or :meth:`run_async()`) records the keys hit
+        by the user along with the elapsed time of every frame (so the frame index and
+        the timestamp of each key). The file is written when the game loop ends (even
+        if it ends with an exception). The recording is compact: a few bytes per frame,
+        compressed with zlib.
+
+        The random module is seeded at the beginning of the session and the seed is
+        stored with the inputs. :meth:`replay_inputs()` can then play the exact same
+        session again.
+
+        :param filename: The file to write the recording to.
+        :type filename: str
+        :param seed: The seed of the random generator. If None, a random seed is
+           used.
+        :type seed: int
+
+        :raises: PglInvalidTypeException
+
+        Example::
+
+            mygame.record_inputs("session.pgi")
+            mygame.run()
+        """
+        if not isinstance(filename, (str, os.PathLike)):
+            raise base.PglInvalidTypeException(
+                "Game.record_inputs(filename, seed): filename must be a str."
+            )
+        if seed is not None and type(seed) is not int:
+            raise base.PglInvalidTypeException(
+                "Game.record_inputs(filename, seed): seed must be an int."
+            )
+        if seed is None:
+            seed = random.randrange(2**32)
+        self.__input_recording = (filename, _InputRecording(seed))
+
+    def replay_inputs(self, filename, headless=True):
+        """
+        .. versionadded:: 1.4.0
+
+        Replay a session recorded with :meth:`record_inputs()`.
+
+        The game loop runs exactly like :meth:`run()`, but the keys and the elapsed
+        time of each frame come from the recording, so the game goes through the same
+        states as the recorded session. The random module is seeded with the seed of
+        the recording and the fixed_timestep and threaded_input of the game are set
+        to the recorded ones.
+        The game has to be set up like it was for the recording (same boards, same
+        objects, etc.).
+
+        The frames are not throttled, they are played as fast as possible. The time
+        spent on each frame is measured and returned: it can be used to compare the
+        performances of different versions of a game (or of the library) on the same
+        session. The game is stopped at the end of the replay.
+
+        :param filename: The recording to replay.
+        :type filename: str
+        :param headless: If True (default), nothing is displayed: the terminal is not
+           touched and the standard output is discarded. If False, the session is
+           rendered in the terminal.
+        :type headless: bool
+        :returns: The time (in seconds) spent on each frame.
+        :rtype: list
+
+        :raises: PglException if the file is not an input recording.
+
+        Example::
+
+            frame_times = mygame.replay_inputs("session.pgi")
+            print(f"median frame time: {statistics.median(frame_times)}")
+        """
+        recording = _InputRecording.load(filename)
+        if recording.seed is not None:
+            random.seed(recording.seed)
+        self.fixed_timestep = recording.fixed_timestep
+        self.threaded_input = recording.threaded
+        self._prepare_run("replay_inputs")
+        self._set_run_function()
+        replay = _InputReplay(recording)
+        self.__next_frame = functools.partial(replay.next_frame, self)
+        try:
+            if headless:
+                with open(os.devnull, "w") as devnull, contextlib.redirect_stdout(
+                    devnull
+                ):
+                    self.__execute_run()
+            else:
+                with self.terminal.cbreak(), self.terminal.hidden_cursor(), (
+                    self.terminal.fullscreen()
+                ):
+                    self.__execute_run()
+        finally:
+            self.__next_frame = self._live_frame
+        return replay.frame_times
+
+    def snapshot(self):
+        """
+        .. versionadded:: 1.4.0
+
+        Capture the simulation state of the game.
+
+        The snapshot holds the content of the boards of all the levels (which item is
+        where), the NPCs and projectiles of the levels, the state of the movable items
+        (position, hp, dtmove, etc.), of their actuators and inventories, the current
+        level and the state of the random generator. Use :meth:`restore()` to put the
+        game back in that state.
+
+        It is a lot faster than a deepcopy of the game: the items are not copied (only
+        their attributes), the graphics, observers and terminal are left alone, and the
+        boards are copy-on-write: a board that did not change since the previous
+        snapshot costs nothing and only the cells that changed are captured. It is
+        fast enough for quick saves and for AI lookahead (snapshot, simulate, restore,
+        simulate another move, restore, etc.).
+
+        .. Important:: The snapshot keeps references to the items. It is an in memory
+           save: it cannot be written to a file. The state of the immovable items
+           (a treasure value for example) and the scheduler are not captured.
+
+        :returns: An opaque snapshot object to pass to :meth:`restore()`.
+
+        Example::
+
+            snap = game.snapshot()
+            for move in candidate_moves:
+                game.move_player(move)
+                game.simulate(30, dt=1 / 30)
+                scores[move] = evaluate(game)
+                game.restore(snap)
+        """
+        levels = {}
+        states = []
+        seen = set()
+
+        def capture(obj):
+            if id(obj) in seen:
+                return
+            seen.add(id(obj))
+            states.append((obj, _copy_state(obj.__dict__)))
+            actuator = getattr(obj, "actuator", None)
+            if actuator is not None:
+                states.append((actuator, _copy_state(actuator.__dict__)))
+            if isinstance(obj, board_items.Movable) and obj.has_inventory():
+                states.append((obj.inventory, _copy_state(obj.inventory.__dict__)))
+
+        for (level_number, level) in self._boards.items():
+            board = level["board"]
+            image = board._take_snapshot_image()
+            levels[level_number] = (
+                board,
+                image,
+                list(level["npcs"]),
+                list(level["projectiles"]),
+            )
+            for item in image[1]:
+                capture(item)
+            for item in level["npcs"]:
+                capture(item)
+            for item in level["projectiles"]:
+                capture(item)
+        if isinstance(self.player, board_items.BoardItem):
+            capture(self.player)
+        return _GameSnapshot(
+            self,
+            self.current_level,
+            self.player,
+            levels,
+            states,
+            random.getstate(),
+        )
+
+    def restore(self, snapshot):
+        """
+        .. versionadded:: 1.4.0
+
+        Put the game back in the state captured by :meth:`snapshot()`.
+
+        A snapshot can be restored any number of times. The levels added after the
+        snapshot are removed. Only the cells of the boards that changed since the
+        snapshot are rewritten.
+
+        :param snapshot: A snapshot of this game.
+        :type snapshot: the object returned by :meth:`snapshot()`
+
+        :raises: PglInvalidTypeException if snapshot is not a snapshot of this game.
+
+        Example::
+
+            quicksave = game.snapshot()
+            # ... the player dies
+            game.restore(quicksave)
+        """
+        if not isinstance(snapshot, _GameSnapshot) or snapshot.game is not self:
+            raise base.PglInvalidTypeException(
+                "Game.restore(snapshot): snapshot must be a snapshot of this game "
+                "(see Game.snapshot())."
+            )
+        for level_number in list(self._boards.keys()):
+            if level_number not in snapshot.levels:
+                del self._boards[level_number]
+        for (level_number, entry) in snapshot.levels.items():
+            (board, image, npcs, projectiles) = entry
+            level = self._boards.get(level_number)
+            if level is None:
+                level = self._boards[level_number] = {}
+            level["board"] = board
+            level["npcs"] = list(npcs)
+            level["projectiles"] = list(projectiles)
+            board._restore_snapshot_image(image)
+        for (obj, state) in snapshot.states:
+            obj.__dict__.update(_copy_state(state))
+        self.current_level = snapshot.current_level
+        self.player = snapshot.player
+        random.setstate(snapshot.random_state)
+        # The caches of the NPCs are rebuilt from the restored lists.
+        self._npc_lod.clear()
+        self._npc_queues.clear()
+        self._background_tick = None
+        self.screen.trigger_rendering()
+
+    def __checked_dt(self, caller, dt):
+        if self.user_update is None or not callable(self.user_update):
+            raise base.PglInvalidTypeException(
+                f"Game.{caller}(): user_update must be callable."
+            )
+        if dt is None:
+            dt = self.fixed_timestep
+        if type(dt) not in [int, float] or dt < 0:
+            raise base.PglInvalidTypeException(
+                f"Game.{caller}(): dt must be a positive number (or the game needs a "
+                "fixed_timestep)."
+            )
+        if self.player is None:
+            self.player = EngineConstant.NO_PLAYER
+        return dt
+
+    def _step(self, in_key, elapsed):
+        if self.state == State.RUNNING:
+            self._tick(in_key, elapsed)
+        elif self.state == State.PAUSED and self.user_update_paused is not None:
+            self.user_update_paused(self, in_key, elapsed)
+
+    def __buffered_keys(self, in_key):
+        # All the keys already buffered by the terminal, in a list.
+        in_keys = []
+        while in_key:
+            in_keys.append(in_key)
+            in_key = self.terminal.inkey(timeout=0)
+        return in_keys
+
+    async def _async_inkey(self, key_ready, watch_stdin):
+        # A key might already be buffered by the terminal.
+        in_key = self.terminal.inkey(timeout=0)
+        if in_key:
+            # Let the other tasks run anyway.
+            await asyncio.sleep(0)
+            return in_key
+        if watch_stdin:
+            key_ready.clear()
+            try:
+                await asyncio.wait_for(key_ready.wait(), self.input_lag)
+            except asyncio.TimeoutError:
+                return in_key
+        else:
+            await asyncio.sleep(
+                self.input_lag if self.input_lag is not None else 0.01
+            )
+        return self.terminal.inkey(timeout=0)
+
+    def _begin_tick(self, elapsed):
+        # The part of a tick that comes before user_update. Returns False if there is
+        # no current board (only the scheduler is updated then).
+        if not self._loaded_boards.empty():
+            self.add_loaded_boards()
+        if self.current_level is None or self.current_board() is None:
+            self.scheduler.update(elapsed)
+            return False
+        if self.player != EngineConstant.NO_PLAYER:
+            self.player.dtmove += elapsed
+        self.scheduler.update(elapsed)
+        return True
+
+    def _end_tick(self, elapsed):
+        # The part of a tick that comes after user_update (with a current board).
+        self.actuate_npcs(self.current_level, elapsed)
+        self.actuate_projectiles(self.current_level, elapsed)
+        self.animate_items(self.current_level, elapsed)
+        self._update_background_levels(elapsed)
+
+    def _tick(self, in_key, elapsed):
+        # One tick of a running game. All the game loops go through here (or through
+        # _async_tick()).
+        with_board = self._begin_tick(elapsed)
+        self.user_update(self, in_key, elapsed)
+        if with_board:
+            self._end_tick(elapsed)
+
+    async def _async_tick(self, in_key, elapsed):
+        if self._begin_tick(elapsed):
+            await _await_result(self.user_update(self, in_key, elapsed))
+            self._end_tick(elapsed)
+        else:
+            print(self.terminal.home, end="")
+            await _await_result(self.user_update(self, in_key, elapsed))
+            print(self.terminal.clear_eos, end="")
+
+    def _prepare_run(self, caller):
+        # Checks and initializations shared by run() and run_async().
         if self.user_update is None:
             raise base.PglInvalidTypeException(
-                "Game.run(): user_update cannot be undefined."
+                f"Game.{caller}(): user_update cannot be undefined."
             )
         if not callable(self.user_update):
             raise base.PglInvalidTypeException(
-                "Game.run(): user_update must be callable."
+                f"Game.{caller}(): user_update must be callable."
+            )
+        if self.fixed_timestep is not None and (
+            type(self.fixed_timestep) not in [int, float] or self.fixed_timestep <= 0
+        ):
+            raise base.PglInvalidTypeException(
+                f"Game.{caller}(): fixed_timestep must be a positive number."
+            )
+        if self.user_render is not None and not callable(self.user_render):
+            raise base.PglInvalidTypeException(
+                f"Game.{caller}(): user_render must be callable."
             )
         # Auto start if game hasn't be started before
         if self.state == State.PAUSED:
@@ -1972,14 +4165,6 @@ class Game(base.PglBaseObject):
         self.previous_time = time.perf_counter()
         if self.player is None:
             self.player = EngineConstant.NO_PLAYER
-        # Now we check that we do have a current board. If not, it means that the user
-        # wants to use the game object without any board.
-        self._set_run_function()
-
-        with self.terminal.cbreak(), self.terminal.hidden_cursor(), (
-            self.terminal.fullscreen()
-        ):
-            self.__execute_run()
 
     # The goal of these _run_* functions is to avoid using if statements in the while
     # loop. Each crumble of performance is worth a little bit of extra code.
@@ -1987,39 +4172,146 @@ class Game(base.PglBaseObject):
         # This runs until the game stops
         while self.state != State.STOPPED:
             # But we only update if the game is not paused
-            in_key = self.terminal.inkey(timeout=self.input_lag)
-            elapsed = time.perf_counter() - self.previous_time
-            self.previous_time = time.perf_counter()
+            (in_key, elapsed) = self.__next_frame()
             if self.state == State.RUNNING:
-                if self.player != EngineConstant.NO_PLAYER:
-                    self.player.dtmove += elapsed
-                # print(self.terminal.home, end="")
-                self.user_update(self, in_key, elapsed)
-                # print(self.terminal.clear_eos, end="")
-                self.actuate_npcs(self.current_level, elapsed)
-                self.actuate_projectiles(self.current_level, elapsed)
-                self.animate_items(self.current_level, elapsed)
+                self._tick(in_key, elapsed)
             elif self.state == State.PAUSED:
                 print(self.terminal.home, end="")
                 self.user_update_paused(self, in_key, elapsed)
                 print(self.terminal.clear_eos, end="")
 
+    def _live_frame(self):
+        in_key = self.terminal.inkey(timeout=self.input_lag)
+        now = time.perf_counter()
+        elapsed = now - self.previous_time
+        self.previous_time = now
+        return (in_key, elapsed)
+
+    def _threaded_frame(self):
+        keys = self.__input_queue
+        in_keys = []
+        if self.input_lag is None:
+            # Turn by turn: wait for the user.
+            in_keys.append(keys.get())
+        else:
+            # The frames last input_lag seconds, whatever the key presses.
+            delay = self.previous_time + self.input_lag - time.perf_counter()
+            if delay > 0:
+                time.sleep(delay)
+        while True:
+            try:
+                in_keys.append(keys.get_nowait())
+            except queue.Empty:
+                break
+        now = time.perf_counter()
+        elapsed = now - self.previous_time
+        self.previous_time = now
+        return (in_keys, elapsed)
+
+    def __start_input_thread(self):
+        keys = queue.SimpleQueue()
+        self.__input_queue = keys
+        thread = threading.Thread(
+            target=self._read_input, args=(keys,), name="pygamelib-input", daemon=True
+        )
+        thread.start()
+        return thread
+
+    def _read_input(self, keys):
+        # The input thread: it runs until the game loop ends (and replaces the queue).
+        inkey = self.terminal.inkey
+        timeout = 0.05
+        while self.__input_queue is keys:
+            start = time.perf_counter()
+            in_key = inkey(timeout=timeout)
+            if in_key:
+                keys.put(in_key)
+            else:
+                # inkey() does not wait if stdin is not a terminal.
+                delay = start + timeout - time.perf_counter()
+                if delay > 0:
+                    time.sleep(delay)
+
+    def _recording_frame(self):
+        frame = self.__read_frame()
+        self.__input_recording[1].record(*frame)
+        return frame
+
+    def __start_recording(self):
+        if self.__input_recording is None:
+            return None
+        recording = self.__input_recording[1]
+        recording.fixed_timestep = self.fixed_timestep
+        recording.threaded = bool(self.threaded_input)
+        random.seed(recording.seed)
+        return recording
+
+    def __save_recording(self):
+        if self.__input_recording is not None:
+            (filename, recording) = self.__input_recording
+            self.__input_recording = None
+            recording.save(filename)
+
     def _set_run_function(self):
-        if self.current_level is None or self.current_board() is None:
+        if self.fixed_timestep is not None:
+            self.__execute_run = self._run_fixed_timestep
+        elif self.current_level is None or self.current_board() is None:
             self.__execute_run = self._run_without_board
         else:
             self.__execute_run = self._run_with_board
 
+    def _run_fixed_timestep(self):
+        with_board = self.current_level is not None and self.current_board() is not None
+        accumulator = 0.0
+        pending_keys = []
+        # With threaded_input, the keys come as lists (one per frame).
+        threaded = self.threaded_input
+        while self.state != State.STOPPED:
+            (in_key, elapsed) = self.__next_frame()
+            if self.state == State.RUNNING:
+                if in_key:
+                    pending_keys.append(in_key)
+                step = self.fixed_timestep
+                accumulator += elapsed
+                ticks = 0
+                while accumulator >= step and self.state == State.RUNNING:
+                    if ticks >= self.max_ticks_per_frame:
+                        # We are too late, drop the time that we cannot catch up.
+                        accumulator %= step
+                        break
+                    if pending_keys:
+                        tick_key = pending_keys.pop(0)
+                    else:
+                        tick_key = [] if threaded else None
+                    if with_board:
+                        self._tick(tick_key, step)
+                    else:
+                        print(self.terminal.home, end="")
+                        self._tick(tick_key, step)
+                        print(self.terminal.clear_eos, end="")
+                    accumulator -= step
+                    ticks += 1
+                if self.state != State.RUNNING:
+                    # The game was paused or stopped during the ticks.
+                    continue
+                self.interpolation = accumulator / step
+                if self.user_render is not None:
+                    self.user_render(self, self.interpolation)
+            elif self.state == State.PAUSED:
+                # Do not catch up with the time spent in pause.
+                accumulator = 0.0
+                print(self.terminal.home, end="")
+                self.user_update_paused(self, in_key, elapsed)
+                print(self.terminal.clear_eos, end="")
+
     def _run_without_board(self):
         # This runs until the game stops
         while self.state != State.STOPPED:
-            in_key = self.terminal.inkey(timeout=self.input_lag)
-            elapsed = time.perf_counter() - self.previous_time
-            self.previous_time = time.perf_counter()
+            (in_key, elapsed) = self.__next_frame()
             # But we only update if the game is not paused
             if self.state == State.RUNNING:
                 print(self.terminal.home, end="")
-                self.user_update(self, in_key, elapsed)
+                self._tick(in_key, elapsed)
                 print(self.terminal.clear_eos, end="")
             elif self.state == State.PAUSED:
                 print(self.terminal.home, end="")
@@ -2356,9 +4648,17 @@ class Game(base.PglBaseObject):
 
         If current_level is set to a value with no corresponding board a PglException
         exception is raised with an invalid_level error.
+
+        .. versionchanged:: 1.4.0
+           While the NPCs and projectiles of an inactive level are updated (see
+           :meth:`set_level_tick_rate()`), it returns the board of that level. So the
+           actuators (like :class:`~pygamelib.actuators.PathFinder`) work on the
+           board of the item they actuate.
         """
         if len(self._boards) <= 0:
             return None
+        elif self._acting_level is not None:
+            return self._boards[self._acting_level]["board"]
         elif self.current_level in self._boards.keys():
             return self._boards[self.current_level]["board"]
         else:
@@ -2379,8 +4679,15 @@ class Game(base.PglBaseObject):
         :type level_number: int
 
         :raises base.PglInvalidTypeException: If parameter is not an int.
+
+        .. versionchanged:: 1.4.0
+           If the board of the level is being loaded in the background (see
+           :meth:`load_board()`), this method waits for it.
         """
         if type(level_number) is int:
+            self.add_loaded_boards(
+                wait=any(lvl == level_number for (lvl, _) in self._board_loaders)
+            )
             if self.player is None:
                 raise base.PglException(
                     "undefined_player",
@@ -2540,6 +4847,9 @@ class Game(base.PglBaseObject):
                                 npc, row, column, layer, auto_layer
                             )
                         self._boards[level_number]["npcs"].append(npc)
+                        self._npc_lod.pop(level_number, None)
+                        if level_number in self._npc_queues:
+                            self._npc_queues[level_number].add(npc)
                     else:
                         raise base.PglInvalidTypeException("column must be an int.")
                 else:
@@ -2583,36 +4893,42 @@ class Game(base.PglBaseObject):
 
         .. note:: Since version 1.2.0 and the appearance of the realtime mode, we have
            to account for movement speed. This method does it.
+
+        .. note:: If :attr:`batch_npc_moves` is True (see the constructor), all the
+           NPCs move simultaneously with :meth:`Board.move_many()`.
+
+        .. note:: If :attr:`npc_lod_bands` are set, only the NPCs around the focus are
+           actuated, at the rate of their band.
+
+        .. note:: If schedule_npc_moves is True (see the constructor) and the game is
+           in real time mode, only the NPCs that are due to move (according to their
+           movement_speed) are visited. Their dtmove is updated only when they are
+           due. This is ignored if :attr:`npc_lod_bands` are set.
         """
         if self.state == State.RUNNING:
             if type(level_number) is int:
                 if level_number in self._boards.keys():
                     self.screen.trigger_rendering()
-                    for npc in self._boards[level_number]["npcs"]:
-                        if npc.actuator.state == State.RUNNING:
-                            # Account for movement speed
-                            npc.dtmove += elapsed_time
-                            if (
-                                self.mode == EngineMode.MODE_REAL_TIME
-                                and npc.dtmove < npc.movement_speed
-                            ):
-                                continue
-                            # Since version 1.2.0 horizontal and vertical movement
-                            # amplitude can be different so we proceed in 2 steps:
-                            #  1 - build a unit direction vector
-                            #  2 - use its component to build a movement vector
-                            nm = npc.actuator.next_move()
-                            d = nm
-                            if not isinstance(nm, base.Vector2D):
-                                d = base.Vector2D.from_direction(nm, 1)
-                            self._boards[level_number]["board"].move(
-                                npc,
-                                base.Vector2D(
-                                    d.row * npc.step_vertical,
-                                    d.column * npc.step_horizontal,
-                                ),
-                            )
-                            # npc.dtmove = 0.0
+                    lod = None
+                    move_queue = None
+                    schedule = self._npc_lod_schedule(level_number, elapsed_time)
+                    if schedule is not None:
+                        lod = self._npc_lod[level_number]
+                    elif self.schedule_npc_moves:
+                        move_queue = self._npc_move_queue(level_number)
+                        if move_queue is not None:
+                            schedule = move_queue.due(elapsed_time)
+                    if schedule is None:
+                        schedule = [
+                            (npc, elapsed_time)
+                            for npc in self._boards[level_number]["npcs"]
+                        ]
+                    self._move_npcs(level_number, schedule)
+                    if lod is not None:
+                        for (npc, _) in schedule:
+                            lod.relocate(npc)
+                    elif move_queue is not None:
+                        move_queue.reschedule()
                     self.notify(
                         self, "pygamelib.engine.Game.actuate_npcs:npcs_actuated"
                     )
@@ -2626,6 +4942,217 @@ class Game(base.PglBaseObject):
                     "In actuate_npcs(level_number) the level_number must be an int."
                 )
 
+    def _move_npcs(self, level_number, schedule):
+        # Move the NPCs of a schedule: a list of (npc, elapsed time).
+        moves = []
+        for (npc, npc_elapsed) in schedule:
+            if npc.actuator.state == State.RUNNING:
+                # Account for movement speed
+                npc.dtmove += npc_elapsed
+                if (
+                    self.mode == EngineMode.MODE_REAL_TIME
+                    and npc.dtmove < npc.movement_speed
+                ):
+                    continue
+                # Since version 1.2.0 horizontal and vertical movement
+                # amplitude can be different so we proceed in 2 steps:
+                #  1 - build a unit direction vector
+                #  2 - use its component to build a movement vector
+                nm = npc.actuator.next_move()
+                d = nm
+                if not isinstance(nm, base.Vector2D):
+                    d = base.Vector2D.from_direction(nm, 1)
+                d = base.Vector2D(
+                    d.row * npc.step_vertical,
+                    d.column * npc.step_horizontal,
+                )
+                if self.batch_npc_moves:
+                    moves.append((npc, d))
+                else:
+                    self._boards[level_number]["board"].move(npc, d)
+                # npc.dtmove = 0.0
+        if len(moves) > 0:
+            self._boards[level_number]["board"].move_many(moves)
+
+    def set_level_tick_rate(self, level_number, rate):
+        """
+        .. versionadded:: 1.4.0
+
+        Set the tick rate of a level when it is not the current level.
+
+        While the game runs, the current level is updated at every frame. The other
+        levels are frozen, unless they have a tick rate (or the game has a
+        background_tick_rate): their NPCs and projectiles are then updated that many
+        times per second, with the time elapsed since their previous update. So
+        the world keeps living at a fraction of the cost.
+
+        The time spent on the inactive levels is limited to background_budget seconds
+        per frame. The levels that do not fit in the budget are updated in the next
+        frames (the one that waited the most first). The frame time of the current
+        level is not affected by the number of inactive levels.
+
+        .. Note:: An NPC moves at most once per tick. With a low tick rate, the fast
+           NPCs of the inactive levels move slower than in the current level.
+
+        :param level_number: The level.
+        :type level_number: int
+        :param rate: The number of updates per second. 0 freezes the level and None
+           uses the game's background_tick_rate.
+        :type rate: int | float
+
+        :raises: PglInvalidTypeException, PglInvalidLevelException
+
+        Example::
+
+            # The neighbor levels are updated 5 times per second, the others once.
+            mygame = Game(background_tick_rate=1, mode=constants.MODE_RT)
+            mygame.set_level_tick_rate(2, 5)
+            mygame.set_level_tick_rate(4, 5)
+        """
+        if type(level_number) is not int:
+            raise base.PglInvalidTypeException(
+                "Game.set_level_tick_rate(level_number, rate): level_number must be an "
+                "int."
+            )
+        if level_number not in self._boards:
+            raise base.PglInvalidLevelException(
+                f"Game.set_level_tick_rate(level_number, rate): level number "
+                f"{level_number} is not associated with any board."
+            )
+        if rate is None:
+            self._level_tick_rates.pop(level_number, None)
+            return
+        if type(rate) not in [int, float] or rate < 0:
+            raise base.PglInvalidTypeException(
+                "Game.set_level_tick_rate(level_number, rate): rate must be a positive "
+                "number or None."
+            )
+        self._level_tick_rates[level_number] = rate
+
+    def _update_background_levels(self, elapsed_time):
+        # Update the inactive levels that are due, within the background budget.
+        default_rate = self.background_tick_rate
+        rates = self._level_tick_rates
+        if not default_rate and not rates:
+            return
+        background_elapsed = self._background_elapsed
+        due = self._background_due
+        current_level = self.current_level
+        for level_number in self._boards:
+            if level_number == current_level:
+                # The time spent as the current level does not count.
+                background_elapsed.pop(level_number, None)
+                due.pop(level_number, None)
+                continue
+            rate = rates.get(level_number, default_rate)
+            if not rate:
+                continue
+            level_elapsed = background_elapsed.get(level_number, 0.0) + elapsed_time
+            background_elapsed[level_number] = level_elapsed
+            if level_elapsed >= 1.0 / rate and level_number not in due:
+                due[level_number] = None
+        if not due and self._background_tick is None:
+            return
+        deadline = time.perf_counter() + self.background_budget
+        while True:
+            tick = self._background_tick
+            if tick is None:
+                if not due:
+                    return
+                (level_number, _) = due.popitem(last=False)
+                if level_number not in self._boards or level_number == current_level:
+                    continue
+                # Start the tick of a level: the projectiles are updated at once and
+                # the NPCs are moved by slices (the tick can span several frames).
+                level_elapsed = background_elapsed.pop(level_number, 0.0)
+                self._acting_level = level_number
+                try:
+                    self.actuate_projectiles(level_number, level_elapsed)
+                finally:
+                    self._acting_level = None
+                if self.state != State.RUNNING:
+                    return
+                # These caches are only maintained for the current level.
+                self._npc_lod.pop(level_number, None)
+                self._npc_queues.pop(level_number, None)
+                tick = [
+                    level_number,
+                    level_elapsed,
+                    list(self._boards[level_number]["npcs"]),
+                    0,
+                ]
+                self._background_tick = tick
+            (level_number, level_elapsed, npcs, index) = tick
+            if level_number not in self._boards or level_number == current_level:
+                self._background_tick = None
+                continue
+            self._acting_level = level_number
+            try:
+                while index < len(npcs):
+                    self._move_npcs(
+                        level_number,
+                        [
+                            (npc, level_elapsed)
+                            for npc in npcs[index : index + _BACKGROUND_SLICE]
+                            # Removed since the start of the tick (see remove_npc()).
+                            if npc is not None
+                        ],
+                    )
+                    index += _BACKGROUND_SLICE
+                    if time.perf_counter() >= deadline:
+                        break
+            finally:
+                self._acting_level = None
+            if index < len(npcs):
+                tick[3] = index
+                return
+            self._background_tick = None
+            self.screen.trigger_rendering()
+            self.notify(self, "pygamelib.engine.Game.actuate_npcs:npcs_actuated")
+            if time.perf_counter() >= deadline:
+                return
+
+    def _npc_move_queue(self, level_number):
+        # Return the priority queue of the NPCs of a level (in real time mode only).
+        if self.mode != EngineMode.MODE_REAL_TIME:
+            return None
+        npcs = self._boards[level_number]["npcs"]
+        move_queue = self._npc_queues.get(level_number)
+        if (
+            move_queue is None
+            or move_queue.npcs is not npcs
+            or move_queue.count != len(npcs)
+        ):
+            move_queue = _NpcMoveQueue(npcs)
+            self._npc_queues[level_number] = move_queue
+        return move_queue
+
+    def _npc_lod_schedule(self, level_number, elapsed_time):
+        # Return the (npc, elapsed time) to actuate according to the LOD bands, or None
+        # if the LOD is not used.
+        if self.__npc_lod_bands is None or level_number != self.current_level:
+            # The focus is on the current level.
+            return None
+        focus = self.npc_lod_focus
+        if focus is None:
+            focus = self.partial_display_focus
+        if focus is None and self.player != EngineConstant.NO_PLAYER:
+            focus = self.player
+        if focus is None or focus.row is None or focus.column is None:
+            return None
+        npcs = self._boards[level_number]["npcs"]
+        lod = self._npc_lod.get(level_number)
+        if lod is None or lod.npcs is not npcs or lod.count != len(npcs):
+            lod = _NpcLevelOfDetail(npcs)
+            self._npc_lod[level_number] = lod
+        return lod.select(
+            focus.row,
+            focus.column,
+            self.__npc_lod_bands,
+            elapsed_time,
+            self._boards[level_number]["board"].size,
+        )
+
     def add_projectile(self, level_number, projectile, row=None, column=None):
         """
         Add a Projectile to the game. It will be placed on the board corresponding to
@@ -2725,6 +5252,16 @@ class Game(base.PglBaseObject):
             mygame.remove_npc(1, dead_npc)
         """
         self._boards[level_number]["npcs"].remove(npc)
+        self._npc_lod.pop(level_number, None)
+        if level_number in self._npc_queues:
+            self._npc_queues[level_number].discard(npc)
+        tick = self._background_tick
+        if tick is not None and tick[0] == level_number:
+            npcs = tick[2]
+            for i in range(tick[3], len(npcs)):
+                if npcs[i] is npc:
+                    npcs[i] = None
+                    break
         self.get_board(level_number).clear_cell(npc.pos[0], npc.pos[1])
 
     def actuate_projectiles(self, level_number, elapsed_time=0.0):
@@ -3075,7 +5612,13 @@ class Game(base.PglBaseObject):
             obj = self.player
         return self.current_board().neighbors(obj, radius)
 
-    def load_board(self, filename, lvl_number=0):
+    def load_board(
+        self,
+        filename,
+        lvl_number=0,
+        progress_callback=None,
+        background: bool = False,
+    ):
         """Load a saved board
 
         Load a Board saved on the disk as a JSON file. This method creates a new Board
@@ -3089,117 +5632,341 @@ class Game(base.PglBaseObject):
         the freshly created board to a lvl_number.
         It then create the NPCs and add them to the board.
 
+        The JSON file is read incrementally: the entries of the map are parsed one at a
+        time and placed on the board as soon as they are read. The whole file is never
+        loaded in memory at once, which makes a big difference with huge boards. The
+        entries of the legacy files (data_version 1) are placed once the whole file is
+        read, as their attributes can be saved after the map.
+
+        Boards saved in the binary format (see :meth:`save_board()`) are automatically
+        detected and loaded.
+
         :param filename: The file to load
         :type filename: str
         :param lvl_number: The level number to associate the board to. Default is 0.
         :type lvl_number: int
-        :returns: a newly created board (see :class:`pygamelib.engine.Board`)
+        :param progress_callback: A function called each time an item is loaded. It
+           receives the level number, the number of entries loaded so far and the
+           fraction of the file that was read (between 0.0 and 1.0). It is called one
+           last time with a fraction of 1.0 when the board is completely loaded.
+        :type progress_callback: callable
+        :param background: If True, the board is loaded in a background thread and
+           this method returns immediately. Default: False.
+        :type background: bool
+        :returns: a newly created board (see :class:`pygamelib.engine.Board`) or, if
+           background is True, a future of the board.
+        :rtype: :class:`~pygamelib.engine.Board` | :class:`concurrent.futures.Future`
+
+        .. versionchanged:: 1.4.0
+           Added the progress_callback and background parameters.
+
+        .. note:: When the board is loaded in the background, the loading thread
+           never touches the game. Once the board is completely loaded, the game loop
+           (:meth:`run()`, :meth:`run_async()`, :meth:`step()` or
+           :meth:`simulate()`) associates it to lvl_number at the beginning of the
+           next tick and then completes the future. Therefore, the game loop can keep
+           running (and animate a loading screen for example) without ever seeing a
+           partially loaded board. :meth:`change_level()` waits for the board of its
+           level. Without a running game loop, call :meth:`add_loaded_boards()`. If
+           the loading fails, the exception is set on the future. The
+           progress_callback is called from the loading thread.
+
+        .. Important:: Do not wait for the result of the future in the thread of the
+           game loop before it is done: the board is only associated to the level by
+           the game loop (or by :meth:`add_loaded_boards()` and
+           :meth:`change_level()`).
 
         Example::
 
             mynewboard = game.load_board( 'awesome_level.json', 1 )
             game.change_level( 1 )
-        """
-        data = dict()
-        with open(filename, "r", encoding="utf-8") as f:
-            data = json.load(f)
+
+            # Or, with a loading screen
+            def loading_progress(lvl, count, fraction):
+                progress_bar.set_progress(fraction)
+
+            loader = game.load_board(
+                'huge_level.json', 2, loading_progress, background=True
+            )
+            # ... later, in the update function
+            if loader.done():
+                loader.result()  # Raises the exception if the loading failed.
+                game.change_level( 2 )
+        """
+        if background:
+            future = futures.Future()
+            future.set_running_or_notify_cancel()
+            loader = threading.Thread(
+                target=self._load_board_in_background,
+                args=(filename, lvl_number, progress_callback, future),
+                daemon=True,
+            )
+            self._board_loaders.append((lvl_number, loader))
+            loader.start()
+            return future
+        (local_board, add_board, count) = self._read_board(
+            filename, lvl_number, progress_callback
+        )
+        add_board()
+        if progress_callback is not None:
+            progress_callback(lvl_number, count, 1.0)
+        return local_board
+
+    def _read_board(self, filename, lvl_number, progress_callback):
+        # Read a board file without touching the game. Returns the board, a function
+        # that associates it (and its NPCs) to lvl_number and the number of entries
+        # loaded.
+        with open(filename, "rb") as f:
+            if f.read(len(_BINARY_BOARD_MAGIC)) == _BINARY_BOARD_MAGIC:
+                f.seek(0)
+                (data, layers) = Board._unpack_binary(f.read())
+                local_board = Board._from_binary(data, layers)
+                return (
+                    local_board,
+                    functools.partial(
+                        self._register_loaded_board, lvl_number, local_board, data
+                    ),
+                    int(np.count_nonzero(layers)),
+                )
+            f.seek(0)
+            return self._stream_board(f, filename, lvl_number, progress_callback)
+
+    def _load_board_in_background(
+        self, filename, lvl_number, progress_callback, future
+    ):
+        # The loading thread: the board is handed over to the game loop.
+        try:
+            (local_board, add_board, count) = self._read_board(
+                filename, lvl_number, progress_callback
+            )
+            if progress_callback is not None:
+                progress_callback(lvl_number, count, 1.0)
+        except Exception as error:
+            future.set_exception(error)
+            return
+        self._loaded_boards.put((local_board, add_board, future))
+
+    def add_loaded_boards(self, wait: bool = False) -> None:
+        """Associate the boards loaded in the background to their level.
+
+        .. versionadded:: 1.4.0
+
+        The boards loaded with :meth:`load_board()` in the background are associated
+        to their level by this method, which then completes their future. The game
+        loop (:meth:`run()`, :meth:`run_async()`, :meth:`step()` and
+        :meth:`simulate()`) calls it at the beginning of each tick and
+        :meth:`change_level()` calls it too: you only need to call it when the game
+        loop is not running.
+
+        :param wait: If True, wait for all the boards that are being loaded in the
+           background to be completely loaded first. Default: False.
+        :type wait: bool
+
+        Example::
+
+            loader = game.load_board("huge_level.json", 2, background=True)
+            # ... do something else, then
+            game.add_loaded_boards(wait=True)
+            board = loader.result()
+        """
+        if wait:
+            for (_, loader) in self._board_loaders:
+                loader.join()
+        # A finished thread has already handed its board over.
+        self._board_loaders = [
+            (lvl, loader) for (lvl, loader) in self._board_loaders if loader.is_alive()
+        ]
+        while not self._loaded_boards.empty():
+            (local_board, add_board, future) = self._loaded_boards.get()
+            try:
+                add_board()
+            except Exception as error:
+                future.set_exception(error)
+            else:
+                future.set_result(local_board)
+
+    def _stream_board(self, f, filename, lvl_number, progress_callback):
+        # Parse the JSON board file f incrementally. With data_version 2+ files, the
+        # board is created as soon as all its attributes are known and the items are
+        # placed as they are read. The attributes of legacy files are optional and the
+        # members of a JSON object are not ordered: a legacy board is only created
+        # once the whole file is read.
+        file_size = os.fstat(f.fileno()).st_size
+        reader = _JsonObjectReader(f)
+        data = {}
         local_board = None
+        # Entries read before the board could be created.
+        pending = []
+        legacy_npcs = []
+        count = 0
+        for attribute in reader.members():
+            if attribute != "map_data":
+                data[attribute] = reader.value()
+                continue
+            for pos in reader.members():
+                if pos.startswith("("):
+                    # data_version 2+: {"(row, column, layer)": item}
+                    entries = [(pos, reader.value())]
+                else:
+                    # Legacy format: {"row": {"column": item}}
+                    entries = [(pos, y, reader.value()) for y in reader.members()]
+                if local_board is None and pos.startswith("("):
+                    try:
+                        local_board = Board._load_header(data)
+                    except KeyError:
+                        pass
+                if local_board is None:
+                    pending.extend(entries)
+                    continue
+                for entry in entries:
+                    self._load_map_entry(local_board, entry, legacy_npcs, filename)
+                    count += 1
+                    if progress_callback is not None:
+                        progress_callback(
+                            lvl_number, count, reader.bytes_read / max(file_size, 1)
+                        )
+        if local_board is None:
+            local_board = Game._board_from_header(data)
+            if local_board is None:
+                # Let Board raise a meaningful error about the missing attributes.
+                local_board = Board._load_header(data)
+        for entry in pending:
+            self._load_map_entry(local_board, entry, legacy_npcs, filename)
+            count += 1
+            if progress_callback is not None:
+                progress_callback(lvl_number, count, 1.0)
         if "data_version" in data.keys() and data["data_version"] >= 2:
-            local_board = Board.load(data)
-            self.add_board(lvl_number, local_board)
-            for mov in local_board.get_movables():
-                if isinstance(mov, board_items.NPC):
-                    local_board.remove_item(mov)
-                    self.add_npc(lvl_number, mov, mov.row, mov.column, mov.layer)
-                    if isinstance(mov.actuator, actuators.PathFinder):
-                        mov.actuator.game = self
-                        mov.actuator.add_waypoint(mov.row, mov.column)
-            # Now load the object library if there's any.
-            if "library" in data.keys():
-                self.object_library = []
-                for e in data["library"]:
-                    item = Board.instantiate_item(e)
-                    if item is not None:
-                        self.object_library.append(item)
+            add_board = functools.partial(
+                self._register_loaded_board, lvl_number, local_board, data
+            )
         else:
-            local_board = Board()
-            data_keys = data.keys()
-            if "name" in data_keys:
-                local_board.name = data["name"]
-            if "size" in data_keys:
-                local_board.size = data["size"]
-                # if len(local_board.size) < 3:
-                #     local_board.size.append(2)
-            if "player_starting_position" in data_keys:
-                local_board.player_starting_position = data["player_starting_position"]
-            if "ui_border_top" in data_keys:
-                local_board.ui_border_top = data["ui_border_top"]
-            if "ui_border_bottom" in data_keys:
-                local_board.ui_border_bottom = data["ui_border_bottom"]
-            if "ui_border_left" in data_keys:
-                local_board.ui_border_left = data["ui_border_left"]
-            if "ui_border_right" in data_keys:
-                local_board.ui_border_right = data["ui_border_right"]
-            if "ui_board_void_cell" in data_keys:
-                local_board.ui_board_void_cell = data["ui_board_void_cell"]
-            if "ui_board_void_cell_sprixel" in data_keys:
-                local_board.ui_board_void_cell_sprixel = data[
-                    "ui_board_void_cell_sprixel"
-                ]
-            # Now let's make it better: if we have a board_void_cell but not a
-            # board_void_cell_sprixel we convert it.
-            if local_board.ui_board_void_cell is not None and (
-                local_board.ui_board_void_cell_sprixel is None
-                or not isinstance(local_board.ui_board_void_cell_sprixel, core.Sprixel)
-            ):
-                local_board.ui_board_void_cell_sprixel = core.Sprixel(
-                    local_board.ui_board_void_cell
-                )
-            # Now we need to recheck for board sanity
-            local_board.check_sanity()
-            # and re-initialize the board (mainly to attribute a new model to the void
-            # cells as it's not dynamic).
-            local_board.init_board()
-            # Then add board to the game
-            self.add_board(lvl_number, local_board)
-
-            # Now load the library if any
-            if "library" in data_keys:
-                self.object_library = []
-                for e in data["library"]:
-                    item = Board.instantiate_item(e)
-                    if item is not None:
-                        self.object_library.append(item)
-
-            # Now let's place the good stuff on the board
-            if "map_data" in data_keys:
-                for pos_x in data["map_data"].keys():
-                    x = int(pos_x)
-                    for pos_y in data["map_data"][pos_x].keys():
-                        y = int(pos_y)
-                        ref = data["map_data"][pos_x][pos_y]
-                        obj_keys = ref.keys()
-                        if "object" in obj_keys:
-                            o = Game._ref2obj(ref)
-                            if not isinstance(o, board_items.NPC) and not isinstance(
-                                o, board_items.BoardItemVoid
-                            ):
-                                local_board.place_item(o, x, y)
-                            elif isinstance(o, board_items.NPC):
-                                self.add_npc(lvl_number, o, x, y)
-                                if isinstance(o.actuator, actuators.PathFinder):
-                                    o.actuator.game = self
-                                    o.actuator.add_waypoint(x, y)
+            add_board = functools.partial(
+                self._register_legacy_board, lvl_number, local_board, data, legacy_npcs
+            )
+        return (local_board, add_board, count)
+
+    def _register_legacy_board(self, lvl_number, local_board, data, legacy_npcs):
+        # Add a board loaded from a data_version 1 JSON file to the game.
+        self.add_board(lvl_number, local_board)
+        # Now load the library if any
+        if "library" in data.keys():
+            self.object_library = []
+            for e in data["library"]:
+                item = Board.instantiate_item(e)
+                if item is not None:
+                    self.object_library.append(item)
+        for (o, x, y) in legacy_npcs:
+            self.add_npc(lvl_number, o, x, y)
+            if isinstance(o.actuator, actuators.PathFinder):
+                o.actuator.game = self
+                o.actuator.add_waypoint(x, y)
+            elif isinstance(o.actuator, actuators.FlowFieldActuator):
+                o.actuator.game = self
 
-                        else:
-                            base.Text.warn(
-                                f"while loading the board in {filename}, at coordinates"
-                                f' [{pos_x},{pos_y}] there is an entry without "object"'
-                                " attribute. NOT LOADED."
-                            )
+    @staticmethod
+    def _board_from_header(data):
+        # Create an empty board from the board's attributes. Returns None if some
+        # required attributes are still missing.
+        if "data_version" in data.keys() and data["data_version"] >= 2:
+            try:
+                return Board._load_header(data)
+            except KeyError:
+                return None
+        if "size" not in data.keys():
+            return None
+        local_board = Board()
+        data_keys = data.keys()
+        if "name" in data_keys:
+            local_board.name = data["name"]
+        if "size" in data_keys:
+            local_board.size = data["size"]
+            # if len(local_board.size) < 3:
+            #     local_board.size.append(2)
+        if "player_starting_position" in data_keys:
+            local_board.player_starting_position = data["player_starting_position"]
+        if "ui_border_top" in data_keys:
+            local_board.ui_border_top = data["ui_border_top"]
+        if "ui_border_bottom" in data_keys:
+            local_board.ui_border_bottom = data["ui_border_bottom"]
+        if "ui_border_left" in data_keys:
+            local_board.ui_border_left = data["ui_border_left"]
+        if "ui_border_right" in data_keys:
+            local_board.ui_border_right = data["ui_border_right"]
+        if "ui_board_void_cell" in data_keys:
+            local_board.ui_board_void_cell = data["ui_board_void_cell"]
+        if "ui_board_void_cell_sprixel" in data_keys:
+            local_board.ui_board_void_cell_sprixel = data["ui_board_void_cell_sprixel"]
+        # Now let's make it better: if we have a board_void_cell but not a
+        # board_void_cell_sprixel we convert it.
+        if local_board.ui_board_void_cell is not None and (
+            local_board.ui_board_void_cell_sprixel is None
+            or not isinstance(local_board.ui_board_void_cell_sprixel, core.Sprixel)
+        ):
+            local_board.ui_board_void_cell_sprixel = core.Sprixel(
+                local_board.ui_board_void_cell
+            )
+        # Now we need to recheck for board sanity
+        local_board.check_sanity()
+        # and re-initialize the board (mainly to attribute a new model to the void
+        # cells as it's not dynamic).
+        local_board.init_board()
         return local_board
 
-    def save_board(self, lvl_number, filename):
+    def _load_map_entry(self, local_board, entry, legacy_npcs, filename):
+        # Place one entry of map_data on the board.
+        if len(entry) == 2:
+            (r, c, l) = ast.literal_eval(entry[0])
+            item = Board.instantiate_item(entry[1])
+            if item is not None:
+                local_board.place_item(item, r, c, l)
+            return
+        (pos_x, pos_y, ref) = entry
+        x = int(pos_x)
+        y = int(pos_y)
+        if "object" in ref.keys():
+            o = Game._ref2obj(ref)
+            if not isinstance(o, board_items.NPC) and not isinstance(
+                o, board_items.BoardItemVoid
+            ):
+                local_board.place_item(o, x, y)
+            elif isinstance(o, board_items.NPC):
+                # NPCs are added once the board is associated to the level.
+                legacy_npcs.append((o, x, y))
+        else:
+            base.Text.warn(
+                f"while loading the board in {filename}, at coordinates"
+                f' [{pos_x},{pos_y}] there is an entry without "object"'
+                " attribute. NOT LOADED."
+            )
+
+    def _register_loaded_board(self, lvl_number, local_board, data):
+        # Add a board loaded from data_version 2+ (JSON or binary) to the game: the
+        # NPCs are moved under the control of the game and the library is loaded.
+        self.add_board(lvl_number, local_board)
+        for mov in local_board.get_movables():
+            if isinstance(mov, board_items.NPC):
+                local_board.remove_item(mov)
+                self.add_npc(lvl_number, mov, mov.row, mov.column, mov.layer)
+                if isinstance(mov.actuator, actuators.PathFinder):
+                    mov.actuator.game = self
+                    mov.actuator.add_waypoint(mov.row, mov.column)
+                elif isinstance(mov.actuator, actuators.FlowFieldActuator):
+                    mov.actuator.game = self
+        # Now load the object library if there's any.
+        if "library" in data.keys():
+            self.object_library = []
+            for e in data["library"]:
+                item = Board.instantiate_item(e)
+                if item is not None:
+                    self.object_library.append(item)
+
+    def save_board(
+        self,
+        lvl_number,
+        filename,
+        binary: bool = False,
+        compression: Compression = Compression.ZLIB,
+    ):
         """Save a board to a JSON file
 
         This method saves a Board and everything in it but the BoardItemVoid.
@@ -3211,6 +5978,12 @@ class Game(base.PglBaseObject):
         :type lvl_number: int
         :param filename: The path to the file to save the data to.
         :type filename: str
+        :param binary: If True, the board is saved in the compact binary format (see
+           :meth:`Board.serialize_binary()`) instead of JSON. Default: False.
+        :type binary: bool
+        :param compression: The compression used by the binary format (ignored for
+           JSON). Default: Compression.ZLIB.
+        :type compression: :py:enum:`~pygamelib.constants.Compression`
 
         :raises PglInvalidTypeException: If any parameter is not of the right type
         :raises PglInvalidLevelException: If the level is not associated with a Board.
@@ -3218,6 +5991,12 @@ class Game(base.PglBaseObject):
         Example::
 
             game.save_board( 1, 'hac-maps/level1.json')
+            # Big levels are a lot faster to save and load in binary
+            game.save_board( 2, 'hac-maps/level2.pgb', binary=True)
+
+        .. versionchanged:: 1.4.0
+           Added the binary and compression parameters. :meth:`load_board()`
+           automatically detects binary boards.
 
         If Game.object_library is not an empty array, it will be saved also.
 
@@ -3241,12 +6020,29 @@ class Game(base.PglBaseObject):
                 " does not correspond to any level associated with a board in "
                 "Game.save_board()"
             )
-        # With version 1.3.0+ this method is a lot cleaner...
-        data = self._boards[lvl_number]["board"].serialize()
+        if not isinstance(compression, Compression):
+            raise base.PglInvalidTypeException(
+                "compression must be a pygamelib.constants.Compression in "
+                "Game.save_board()"
+            )
+        library = None
         if len(self.object_library) > 0:
-            data["library"] = []
+            library = []
             for o in self.object_library:
-                data["library"].append(o.serialize())
+                library.append(o.serialize())
+        if binary:
+            extra = None
+            if library is not None:
+                extra = {"library": library}
+            with open(filename, "wb") as f:
+                f.write(
+                    self._boards[lvl_number]["board"]._pack_binary(compression, extra)
+                )
+            return
+        # With version 1.3.0+ this method is a lot cleaner...
+        data = self._boards[lvl_number]["board"].serialize()
+        if library is not None:
+            data["library"] = library
 
         with open(filename, "w", encoding="utf-8") as f:
             json.dump(data, f)
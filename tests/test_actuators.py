@@ -1,4 +1,7 @@
 from pygamelib import actuators, constants, board_items, engine, base
+import numpy as np
+import random
+import types
 import unittest
 
 # Test cases for all classes in pygamelib.gfx.particles.
@@ -271,6 +274,317 @@ class TestBase(unittest.TestCase):
         self.assertEqual(e.exception.error, "invalid_waypoint")
         self.assertIsNone(npc.actuator.remove_waypoint(10, 10))
 
+    def test_pathfinder_astar_shortest(self):
+        # A* finds paths as short as BFS on random boards, around the moving items.
+        rng = random.Random(4)
+        for _ in range(30):
+            (width, height) = (rng.randint(1, 15), rng.randint(1, 15))
+            b = engine.Board(size=[width, height])
+            g = engine.Game(boards={})
+            g.player = board_items.Player()
+            g.add_board(1, b)
+            g.change_level(1)
+            npc = board_items.NPC()
+            g.add_npc(1, npc, rng.randrange(height), rng.randrange(width))
+            for r in range(height):
+                for c in range(width):
+                    if (r, c) != (npc.row, npc.column) and rng.random() < 0.3:
+                        b.place_item(
+                            rng.choice([board_items.Wall(), board_items.NPC()]), r, c
+                        )
+            destination = (rng.randrange(height), rng.randrange(width))
+            paths = []
+            for algorithm in [
+                constants.ALGO_BFS,
+                constants.ALGO_ASTAR,
+                constants.Algorithm.JPS,
+            ]:
+                npc.actuator = actuators.PathFinder(
+                    game=g, parent=npc, algorithm=algorithm
+                )
+                npc.actuator.set_destination(*destination)
+                paths.append(npc.actuator.find_path())
+            bfs = paths[0]
+            for path in paths[1:]:
+                self.assertEqual(len(path), len(bfs))
+                if path:
+                    self.assertEqual(path[0], (npc.row, npc.column))
+                    self.assertEqual(path[-1], destination)
+                for (previous, current) in zip(path, path[1:]):
+                    self.assertEqual(
+                        abs(previous[0] - current[0]) + abs(previous[1] - current[1]),
+                        1,
+                    )
+                    self.assertTrue(b.item(*current).overlappable())
+            self.assertEqual(npc.actuator.current_path(), paths[-1])
+        # Destinations outside of the board are not reachable.
+        npc.actuator.destination = (height, 0)
+        self.assertEqual(npc.actuator.find_path(), [])
+
+    def test_grid_jps(self):
+        # Jump Point Search against BFS on random grids, from open to maze-like.
+        rng = random.Random(8)
+        for _ in range(500):
+            (width, height) = (rng.randint(1, 20), rng.randint(1, 20))
+            density = rng.choice([0.05, 0.2, 0.35, 0.5])
+            grid = bytes(
+                0 if rng.random() < density else 1 for _ in range(width * height)
+            )
+            start = (rng.randrange(height), rng.randrange(width))
+            destination = (rng.randrange(height), rng.randrange(width))
+            bfs = actuators._grid_bfs(grid, width, height, start, destination)
+            jps = actuators._grid_jps(grid, width, height, start, destination)
+            self.assertEqual(len(jps), len(bfs))
+            if jps:
+                self.assertEqual(jps[0], start)
+                self.assertEqual(jps[-1], destination)
+            for (previous, current) in zip(jps, jps[1:]):
+                self.assertEqual(
+                    abs(previous[0] - current[0]) + abs(previous[1] - current[1]), 1
+                )
+                self.assertEqual(grid[current[0] * width + current[1]], 1)
+
+    def test_path_hierarchy(self):
+        # Hierarchical paths against BFS on random boards, while the terrain changes.
+        rng = random.Random(2)
+        for _ in range(40):
+            (width, height) = (rng.randint(1, 30), rng.randint(1, 30))
+            b = engine.Board(size=[width, height])
+            for r in range(height):
+                for c in range(width):
+                    if rng.random() < 0.25:
+                        b.place_item(board_items.Wall(), r, c)
+            hierarchy = actuators._PathHierarchy(b, rng.choice([2, 3, 5]))
+            for _ in range(5):
+                for _ in range(rng.randint(0, 3)):
+                    (r, c) = (rng.randrange(height), rng.randrange(width))
+                    if b._static_blocking[r, c]:
+                        b.remove_item(b.item(r, c))
+                    else:
+                        b.place_item(board_items.Wall(), r, c)
+                grid = b._static_blocking.tobytes()
+                grid = bytes(1 - v for v in grid)
+                start = (rng.randrange(height), rng.randrange(width))
+                if not grid[start[0] * width + start[1]]:
+                    continue
+                destination = (rng.randrange(height), rng.randrange(width))
+                bfs = actuators._grid_bfs(grid, width, height, start, destination)
+                path = hierarchy.find_path(start, destination)
+                self.assertEqual(hierarchy.version, b._terrain_version)
+                self.assertEqual(len(path) > 0, len(bfs) > 0)
+                self.assertGreaterEqual(len(path), len(bfs))
+                if path:
+                    self.assertEqual(path[0], start)
+                    self.assertEqual(path[-1], destination)
+                for (previous, current) in zip(path, path[1:]):
+                    self.assertEqual(
+                        abs(previous[0] - current[0]) + abs(previous[1] - current[1]), 1
+                    )
+                    self.assertEqual(grid[current[0] * width + current[1]], 1)
+        # Only the clusters around a change are updated.
+        b = engine.Board(size=[40, 40])
+        hierarchy = actuators._PathHierarchy(b, 10)
+        self.assertEqual(len(hierarchy.find_path((0, 0), (39, 39))), 79)
+        edges = dict(hierarchy._edges)
+        b.place_item(board_items.Wall(), 35, 35)
+        hierarchy.update()
+        self.assertNotIn((3, 3), hierarchy._edges)
+        self.assertIs(hierarchy._edges[(0, 0)], edges[(0, 0)])
+        b.init_board()
+        self.assertEqual(len(hierarchy.find_path((0, 0), (39, 39))), 79)
+        self.assertEqual(hierarchy._edges.get((0, 0)), edges[(0, 0)])
+        # The path finder uses a graph shared by the board.
+        g = engine.Game(boards={})
+        g.player = board_items.Player()
+        g.add_board(1, b)
+        g.change_level(1)
+        for r in range(39):
+            b.place_item(board_items.Wall(), r, 20)
+        npc = board_items.NPC()
+        g.add_npc(1, npc, 0, 0)
+        npc.actuator = actuators.PathFinder(
+            game=g, parent=npc, algorithm=constants.Algorithm.HPASTAR
+        )
+        npc.actuator.set_destination(0, 39)
+        path = npc.actuator.find_path()
+        self.assertEqual(path[-1], (0, 39))
+        self.assertGreaterEqual(len(path), 117)
+        self.assertIsInstance(b._path_hierarchy, actuators._PathHierarchy)
+        npc.actuator.set_destination(0, 20)
+        self.assertEqual(npc.actuator.find_path(), [])
+        npc.actuator.destination = (0, 40)
+        self.assertEqual(npc.actuator.find_path(), [])
+        with actuators.PathFindingService(max_workers=1, processes=False) as service:
+            with self.assertRaises(base.PglInvalidTypeException):
+                service.submit(b, (0, 0), (0, 39), constants.Algorithm.HPASTAR)
+
+    def test_dstar_lite(self):
+        # The repaired paths are as short as the BFS paths after each change.
+        rng = random.Random(3)
+        for _ in range(60):
+            (width, height) = (rng.randint(1, 15), rng.randint(1, 15))
+            board = types.SimpleNamespace(
+                _blocking=np.array(
+                    [[rng.random() < 0.25 for _ in range(width)] for _ in range(height)]
+                )
+            )
+            start = (rng.randrange(height), rng.randrange(width))
+            goal = (rng.randrange(height), rng.randrange(width))
+            planner = actuators._DStarLite(board, goal)
+            for _ in range(10):
+                for _ in range(rng.randint(0, 4)):
+                    (r, c) = (rng.randrange(height), rng.randrange(width))
+                    board._blocking[r, c] = not board._blocking[r, c]
+                grid = bytearray(np.logical_not(board._blocking).tobytes())
+                grid[start[0] * width + start[1]] = 1
+                grid[goal[0] * width + goal[1]] = 1
+                bfs = actuators._grid_bfs(bytes(grid), width, height, start, goal)
+                path = planner.find_path(start)
+                self.assertEqual(len(path), len(bfs))
+                for (previous, current) in zip(path, path[1:]):
+                    self.assertEqual(
+                        abs(previous[0] - current[0]) + abs(previous[1] - current[1]), 1
+                    )
+                    self.assertEqual(grid[current[0] * width + current[1]], 1)
+                if len(path) > 1:
+                    start = path[1]
+        # A PathFinder in a corridor waits while an NPC blocks it, then goes on.
+        g = engine.Game(boards={}, mode=constants.MODE_TBT)
+        g.player = board_items.Player()
+        b = engine.Board(size=[12, 3])
+        g.add_board(1, b)
+        g.change_level(1)
+        for c in range(12):
+            b.place_item(board_items.Wall(), 0, c)
+            b.place_item(board_items.Wall(), 2, c)
+        npc = board_items.NPC()
+        g.add_npc(1, npc, 1, 0)
+        npc.actuator = actuators.PathFinder(
+            game=g,
+            parent=npc,
+            circle_waypoints=False,
+            algorithm=constants.Algorithm.DSTARLITE,
+        )
+        npc.actuator.set_destination(1, 11)
+        for _ in range(3):
+            b.move(npc, npc.actuator.next_move(), 1)
+        self.assertEqual((npc.row, npc.column), (1, 3))
+        planner = npc.actuator._replanner
+        blocker = board_items.NPC()
+        b.place_item(blocker, 1, 6)
+        self.assertEqual(npc.actuator.next_move(), constants.NO_DIR)
+        b.remove_item(blocker)
+        for _ in range(8):
+            b.move(npc, npc.actuator.next_move(), 1)
+        self.assertEqual((npc.row, npc.column), (1, 11))
+        self.assertIs(npc.actuator._replanner, planner)
+        self.assertEqual(npc.actuator.next_move(), constants.NO_DIR)
+        # Walls and out of board destinations.
+        npc.actuator.set_destination(0, 5)
+        self.assertEqual(npc.actuator.find_path(), [])
+        npc.actuator.destination = (1, 12)
+        self.assertEqual(npc.actuator.find_path(), [])
+        # A destination that changes at each move (a chase) is followed with A*
+        # searches: the planner is only built when the destination stays the same.
+        npc.actuator.set_destination(1, 0)
+        self.assertEqual(len(npc.actuator.find_path()), 12)
+        self.assertIsNone(npc.actuator._replanner)
+        npc.actuator.set_destination(1, 1)
+        self.assertEqual(len(npc.actuator.find_path()), 11)
+        self.assertIsNone(npc.actuator._replanner)
+        self.assertEqual(len(npc.actuator.find_path()), 11)
+        self.assertIsNotNone(npc.actuator._replanner)
+
+    def test_pathfinding_service(self):
+        g = engine.Game(mode=constants.MODE_TBT)
+        g.player = constants.NO_PLAYER
+        b = engine.Board(size=[30, 20])
+        g.add_board(1, b)
+        g.change_level(1)
+        g.start()
+        for r in range(0, 15):
+            b.place_item(board_items.Wall(), r, 10)
+        for processes in [True, False]:
+            with actuators.PathFindingService(
+                max_workers=2, processes=processes
+            ) as service:
+                path = service.submit(b, (0, 0), (0, 20)).result(timeout=30)
+                self.assertEqual(len(path), 51)
+                self.assertEqual(path[0], (0, 0))
+                self.assertEqual(path[-1], (0, 20))
+                for (a, c) in zip(path, path[1:]):
+                    self.assertEqual(abs(a[0] - c[0]) + abs(a[1] - c[1]), 1)
+                path = service.submit(
+                    b, (0, 0), (0, 20), constants.Algorithm.ASTAR
+                ).result(timeout=30)
+                self.assertEqual(len(path), 51)
+                path = service.submit(
+                    b, (0, 0), (0, 20), constants.Algorithm.JPS
+                ).result(timeout=30)
+                self.assertEqual(len(path), 51)
+                # A new snapshot is taken when the terrain changes
+                b.place_item(board_items.Wall(), 15, 10)
+                path = service.submit(b, [0, 0], [0, 20]).result(timeout=30)
+                self.assertEqual(len(path), 53)
+                self.assertEqual(len(service._snapshots), 1)
+                self.assertEqual(len(service._retired), 0)
+                # Unreachable destination and walls
+                b.place_item(board_items.Wall(), 16, 10)
+                b.place_item(board_items.Wall(), 17, 10)
+                b.place_item(board_items.Wall(), 18, 10)
+                b.place_item(board_items.Wall(), 19, 10)
+                self.assertEqual(service.submit(b, (0, 0), (0, 20)).result(), [])
+                self.assertEqual(service.submit(b, (0, 0), (0, 10)).result(), [])
+                for r in range(15, 20):
+                    b.clear_cell(r, 10)
+                with self.assertRaises(base.PglInvalidTypeException):
+                    service.submit(b, (0, 0), (0, 50))
+                with self.assertRaises(base.PglInvalidTypeException):
+                    service.submit(b, (0, 0), "here")
+        with self.assertRaises(base.PglInvalidTypeException):
+            actuators.PathFindingService(max_workers=0)
+
+        # A PathFinder with a service does not block and follows the path when it is
+        # ready.
+        npc = board_items.NPC()
+        g.add_npc(1, npc, 0, 0)
+        service = actuators.PathFindingService(processes=False)
+        npc.actuator = actuators.PathFinder(game=g, parent=npc, service=service)
+        npc.actuator.set_destination(0, 20)
+        self.assertEqual(npc.actuator.next_move(), constants.NO_DIR)
+        npc.actuator._path_request.result(timeout=30)
+        for _ in range(60):
+            move = npc.actuator.next_move()
+            if move == constants.NO_DIR:
+                break
+            b.move(npc, move, 1)
+        self.assertEqual((npc.row, npc.column), (0, 20))
+        # Changing the destination while a request is pending
+        npc.actuator.set_destination(0, 0)
+        npc.actuator.request_path()
+        npc.actuator.request_path()
+        first = npc.actuator._path_request
+        npc.actuator.set_destination(19, 0)
+        npc.actuator.request_path()
+        self.assertIsNot(npc.actuator._path_request, first)
+        npc.actuator._path_request.result(timeout=30)
+        self.assertEqual(npc.actuator.next_move(), constants.DOWN)
+        # Unreachable destinations are not requested again until the terrain changes
+        b.place_item(board_items.Wall(), 5, 5)
+        npc.actuator.set_destination(5, 5)
+        npc.actuator.request_path()
+        npc.actuator._path_request.result(timeout=30)
+        self.assertEqual(npc.actuator.next_move(), constants.NO_DIR)
+        self.assertIsNone(npc.actuator._path_request)
+        npc.actuator.request_path()
+        self.assertIsNone(npc.actuator._path_request)
+        service.shutdown()
+        # Without service, request_path() is find_path()
+        npc.actuator = actuators.PathFinder(game=g, parent=npc)
+        npc.actuator.set_destination(0, 20)
+        npc.actuator.request_path()
+        self.assertGreater(len(npc.actuator.current_path()), 0)
+
     def test_pathfinder_serialization(self):
         a = actuators.PathFinder(parent=board_items.NPC())
         a.add_waypoint(1, 2)
@@ -282,6 +596,57 @@ class TestBase(unittest.TestCase):
         self.assertEqual(a.state, al.state)
         self.assertEqual(a.destination, al.destination)
 
+    def test_flow_field(self):
+        g = engine.Game(boards={}, mode=constants.MODE_TBT)
+        b = engine.Board(size=[12, 8])
+        g.player = board_items.Player()
+        g.add_board(1, b)
+        g.change_level(1)
+        g.move_player(constants.DOWN, 2)
+        for r in range(6):
+            b.place_item(board_items.Wall(), r, 5)
+        horde = []
+        for i in range(8):
+            npc = board_items.NPC(step=1)
+            npc.actuator = actuators.FlowFieldActuator(
+                game=g, parent=npc, target=g.player
+            )
+            g.add_npc(1, npc, i, 11)
+            horde.append(npc)
+        field = b.distance_field(g.player.row, g.player.column)
+        for _ in range(30):
+            before = [field[npc.row, npc.column] for npc in horde]
+            g.actuate_npcs(1)
+            # Nobody goes away from the target.
+            for (npc, distance) in zip(horde, before):
+                self.assertLessEqual(field[npc.row, npc.column], distance)
+        # The horde gathered around the player and waits.
+        self.assertIn(1, [field[npc.row, npc.column] for npc in horde])
+        self.assertEqual(horde[0].actuator.next_move(), constants.NO_DIR)
+        # The field is shared by all the NPCs.
+        self.assertIs(b.distance_field(g.player.row, g.player.column), field)
+        # No target, paused actuator, destination, unreachable destination.
+        npc = horde[-1]
+        self.assertEqual((npc.row, npc.column), (2, 2))
+        npc.actuator.target = None
+        self.assertEqual(npc.actuator.next_move(), constants.NO_DIR)
+        npc.actuator.set_destination(0, 2)
+        npc.actuator.pause()
+        self.assertEqual(npc.actuator.next_move(), constants.NO_DIR)
+        npc.actuator.start()
+        self.assertEqual(npc.actuator.next_move(), constants.UP)
+        b.place_item(board_items.Wall(), 6, 5)
+        b.place_item(board_items.Wall(), 7, 5)
+        npc.actuator.set_destination(0, 11)
+        self.assertEqual(npc.actuator.next_move(), constants.NO_DIR)
+        with self.assertRaises(base.PglInvalidTypeException):
+            npc.actuator.set_destination(0, "11")
+        data = npc.actuator.serialize()
+        loaded = actuators.FlowFieldActuator.load(data)
+        self.assertEqual(loaded.destination, (0, 11))
+        self.assertEqual(loaded.state, constants.RUNNING)
+        self.assertIsNone(loaded.target)
+
 
 if __name__ == "__main__":
     unittest.main()
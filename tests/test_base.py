@@ -2,6 +2,20 @@ import pygamelib.base as base
 import pygamelib.gfx.core as core
 from pygamelib.constants import Direction
 import unittest
+import copy
+
+
+class Recorder(base.PglBaseObject):
+    # An observer that records the notifications it receives.
+    def __init__(self):
+        super().__init__()
+        self.events = []
+
+    def handle_notification(self, subject, attribute=None, value=None):
+        self.events.append((subject, attribute, value))
+
+    def attributes(self):
+        return [attribute for (_, attribute, _) in self.events]
 
 
 class TestBase(unittest.TestCase):
@@ -233,6 +247,128 @@ class TestBase(unittest.TestCase):
         self.assertFalse(o2.detach(o2))
         self.assertFalse(o1.store_screen_position(1, "2"))
 
+    def test_pgl_base_object_topics(self):
+        subject = base.PglBaseObject()
+        everything = Recorder()
+        only_a = Recorder()
+        a_and_b = Recorder()
+        self.assertTrue(subject.attach(everything))
+        self.assertFalse(subject.attach(everything))
+        self.assertTrue(subject.attach(only_a, "a"))
+        self.assertFalse(subject.attach(only_a, "a"))
+        self.assertTrue(subject.attach(a_and_b, ["a", "b"]))
+        self.assertFalse(subject.attach(everything, "a"))
+        for event in ["a", "b", "c"]:
+            subject.notify(None, event)
+        self.assertEqual(everything.attributes(), ["a", "b", "c"])
+        self.assertEqual(only_a.attributes(), ["a"])
+        self.assertEqual(a_and_b.attributes(), ["a", "b"])
+        # The modifier is not notified
+        subject.notify(only_a, "a")
+        self.assertEqual(only_a.attributes(), ["a"])
+        self.assertEqual(a_and_b.attributes(), ["a", "b", "a"])
+        # Partial and complete detach
+        self.assertTrue(subject.detach(a_and_b, "a"))
+        self.assertFalse(subject.detach(a_and_b, "a"))
+        subject.notify(None, "a")
+        subject.notify(None, "b")
+        self.assertEqual(a_and_b.attributes(), ["a", "b", "a", "b"])
+        self.assertTrue(subject.detach(a_and_b))
+        self.assertFalse(subject.detach(a_and_b))
+        self.assertIsNone(subject._topic_observers.get("b"))
+        # Attaching to everything replaces the topics
+        self.assertTrue(subject.attach(only_a))
+        subject.notify(None, "c")
+        self.assertEqual(only_a.attributes(), ["a", "a", "c"])
+        with self.assertRaises(base.PglInvalidTypeException):
+            subject.attach(a_and_b, 42)
+        with self.assertRaises(base.PglInvalidTypeException):
+            subject.attach(a_and_b, ["a", 42])
+        # Observers can detach themselves while being notified.
+
+        class Quitter(base.PglBaseObject):
+            def handle_notification(self, subject, attribute=None, value=None):
+                subject.detach(self)
+
+        quitter = Quitter()
+        subject.attach(quitter, "a")
+        subject.notify(None, "a")
+        subject.notify(None, "a")
+        self.assertEqual(
+            everything.attributes(), ["a", "b", "c", "a", "a", "b", "c", "a", "a"]
+        )
+        self.assertIsNone(subject._topic_observers.get("a"))
+        # Equal objects are different observers
+        c1 = core.Color(1, 2, 3)
+        t1 = base.Text("t1", c1)
+        t2 = base.Text("t2", c1)
+        self.assertEqual(len(c1._topic_observers[base.Text._COLOR_EVENTS[0]]), 2)
+        c1.r = 200
+        self.assertEqual(t1.fg_color.r, 200)
+        t1.fg_color = core.Color(4, 5, 6)
+        self.assertEqual(len(c1._topic_observers[base.Text._COLOR_EVENTS[0]]), 1)
+        self.assertIsNotNone(t2)
+        # Copies keep consistent observers
+        original = base.Text("original", core.Color(1, 1, 1))
+        duplicate = copy.deepcopy(original)
+        self.assertTrue(duplicate.fg_color.detach(duplicate))
+        self.assertFalse(duplicate.fg_color.detach(original))
+
+    def test_batch_notifications(self):
+        c1 = core.Color(1, 2, 3)
+        c2 = core.Color(4, 5, 6)
+        recorder = Recorder()
+        c1.attach(recorder)
+        c2.attach(recorder)
+        r_event = "pygamelib.gfx.core.Color.r:changed"
+        g_event = "pygamelib.gfx.core.Color.g:changed"
+        with base.batch_notifications():
+            c1.r = 10
+            c2.g = 20
+            with base.batch_notifications():
+                c1.r = 30
+            self.assertEqual(recorder.events, [])
+            self.assertEqual(c1.r, 30)
+        # Deduplicated by (subject, attribute), last value, first change order.
+        self.assertEqual(recorder.events, [(c1, r_event, 30), (c2, g_event, 20)])
+        recorder.events.clear()
+        c1.r = 40
+        self.assertEqual(recorder.events, [(c1, r_event, 40)])
+        # Notifications are delivered even if the block raises.
+        recorder.events.clear()
+        with self.assertRaises(ValueError):
+            with base.batch_notifications():
+                c2.g = 50
+                raise ValueError("test")
+        self.assertEqual(recorder.events, [(c2, g_event, 50)])
+        self.assertEqual(base._active_batches, 0)
+        # Per object suspension
+        recorder.events.clear()
+        with c1.suspend_notifications():
+            c1.r = 1
+            c1.g = 2
+            c1.r = 3
+            c2.g = 4
+            self.assertEqual(recorder.events, [(c2, g_event, 4)])
+        self.assertEqual(
+            recorder.events, [(c2, g_event, 4), (c1, r_event, 3), (c1, g_event, 2)]
+        )
+        self.assertIsNone(c1._suspended_notifications)
+        # A suspension ending inside a batch moves its notifications to the batch.
+        recorder.events.clear()
+        with base.batch_notifications():
+            with c1.suspend_notifications():
+                c1.r = 5
+            self.assertEqual(recorder.events, [])
+            c1.r = 6
+        self.assertEqual(recorder.events, [(c1, r_event, 6)])
+        # The color cache of a Text is rebuilt with the final color.
+        text = base.Text("batch", core.Color(0, 0, 0))
+        with base.batch_notifications():
+            text.fg_color.r = 255
+            text.fg_color.g = 128
+        self.assertIn(base.Console.instance().color_rgb(255, 128, 0), str(text))
+
     def test_math_distance(self):
         self.assertEqual(self.math.distance(0, 0, 0, 0), 0)
         self.assertEqual(self.math.distance(0, 0, 0, 1), 1)
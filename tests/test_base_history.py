@@ -1,5 +1,8 @@
-from pygamelib.base import History
+from pygamelib.base import History, PglInvalidTypeException
+from pygamelib import board_items, engine
+import numpy as np
 import unittest
+import copy
 
 
 class TestHistory(unittest.TestCase):
@@ -47,3 +50,177 @@ class TestHistory(unittest.TestCase):
         history.undo()
         history.add("Action 3")
         self.assertEqual(history.current, "Action 3")
+
+    # delta mode: undo/redo reconstruct the states
+    def test_delta_mode(self):
+        class State:
+            def __init__(self):
+                self.name = "board"
+                self.cells = np.zeros((20, 20), dtype=np.int32)
+                self.items = [{"pos": [1, 1], "name": "wall"}]
+
+        history = History(delta=True)
+        state = State()
+        snapshots = []
+        for i in range(10):
+            state.cells[i, i] = i + 1
+            state.items.append({"pos": [i, i], "name": f"item_{i}"})
+            state.items[0]["pos"][0] = i
+            state.name = f"board {i}"
+            if i == 5:
+                del state.items[1]
+            snapshots.append(copy.deepcopy(state))
+            history.add(state)
+        self.assertIs(history.current, state)
+        for i in range(9, 0, -1):
+            history.undo()
+            self.assertEqual(history.current.name, snapshots[i - 1].name)
+            self.assertEqual(history.current.items, snapshots[i - 1].items)
+            self.assertTrue(
+                np.array_equal(history.current.cells, snapshots[i - 1].cells)
+            )
+        history.undo()
+        self.assertIsNone(history.current)
+        history.undo()
+        self.assertIsNone(history.current)
+        for i in range(10):
+            history.redo()
+            self.assertEqual(history.current.items, snapshots[i].items)
+        history.redo()
+        self.assertEqual(history.current.name, "board 9")
+        # Adding after undo forgets the future
+        history.undo()
+        history.undo()
+        text = history.current
+        text.name = "Hello World"
+        history.add(text)
+        history.add({"text": "Hello World"})
+        history.add({"text": "Hello there World", "new": (1, 2)})
+        history.undo()
+        self.assertEqual(history.current, {"text": "Hello World"})
+        history.undo()
+        self.assertEqual(history.current.name, "Hello World")
+        history.undo()
+        self.assertEqual(history.current.name, "board 7")
+        history.redo()
+        history.redo()
+        history.redo()
+        self.assertEqual(history.current, {"text": "Hello there World", "new": (1, 2)})
+        history.redo()
+        self.assertEqual(history.current, {"text": "Hello there World", "new": (1, 2)})
+        # The same unchanged state can be added again
+        history.add({"text": "Hello there World", "new": (1, 2)})
+        history.undo()
+        self.assertEqual(history.current, {"text": "Hello there World", "new": (1, 2)})
+        history.reset()
+        self.assertIsNone(history.current)
+        self.assertEqual(history.memory_usage, 0)
+
+    # delta mode: deltas are a lot smaller than full states
+    def test_delta_mode_memory(self):
+        board = {"cells": [[0] * 100 for _ in range(100)], "name": "lvl"}
+        full = History()
+        delta = History(delta=True, keyframe_interval=20)
+        for i in range(50):
+            board["cells"][i][i] = 1
+            full.add(copy.deepcopy(board))
+            delta.add(board)
+        self.assertLess(delta.memory_usage * 4, full.memory_usage)
+        for _ in range(49):
+            delta.undo()
+        self.assertEqual(sum([sum(r) for r in delta.current["cells"]]), 1)
+        capped = History(delta=True, max_memory=delta.memory_usage // 3)
+        for i in range(50):
+            board["cells"][i][99 - i] = 2
+            capped.add(board)
+            self.assertLessEqual(capped.memory_usage, delta.memory_usage // 3)
+        # The oldest actions were evicted but the current one and the closest ones are
+        # still available.
+        capped.undo()
+        self.assertEqual(capped.current["cells"][48][51], 2)
+        self.assertEqual(capped.current["cells"][49][50], 0)
+        for _ in range(50):
+            capped.undo()
+        self.assertIsNotNone(capped.current)
+        with self.assertRaises(PglInvalidTypeException):
+            History(delta=True, keyframe_interval=0)
+        with self.assertRaises(PglInvalidTypeException):
+            History(delta=True, max_memory="1MB")
+
+    # delta mode: objects referenced several times in the states
+    def test_delta_mode_shared_references(self):
+        class A:
+            def __init__(self, value):
+                self.value = value
+
+        def values(action):
+            return [a.value for a in action]
+
+        a = A(1)
+        history = History(delta=True)
+        history.add([a, a])
+        history.add([A(2), A(3)])
+        history.undo()
+        self.assertEqual(values(history.current), [1, 1])
+        history.redo()
+        self.assertEqual(values(history.current), [2, 3])
+        # The same object, modified.
+        history.add([a, a])
+        a.value = 5
+        history.add([a, a])
+        history.undo()
+        self.assertEqual(values(history.current), [1, 1])
+        history.redo()
+        self.assertEqual(values(history.current), [5, 5])
+        # The reconstructed states do not share the objects that were not shared.
+        b = A(6)
+        history.add([A(7), A(8)])
+        history.add([b, b])
+        b.value = 9
+        history.add([b, b])
+        history.undo()
+        self.assertEqual(values(history.current), [6, 6])
+        history.undo()
+        history.redo()
+        history.redo()
+        self.assertEqual(values(history.current), [9, 9])
+        # Reference cycles
+        a.next = a
+        history.add(a)
+        a.value = 10
+        history.add(a)
+        history.undo()
+        self.assertEqual(history.current.value, 5)
+        self.assertIs(history.current.next, history.current)
+        history.redo()
+        self.assertEqual(history.current.value, 10)
+        self.assertIs(history.current.next, history.current)
+
+    # delta mode: a Board (its matrix is an array of objects)
+    def test_delta_mode_board(self):
+        board = engine.Board(size=[30, 30])
+        for column in range(30):
+            board.place_item(board_items.Wall(), 0, column)
+        history = History(delta=True)
+        history.add(board)
+        keyframe = history.memory_usage
+        board.place_item(board_items.Wall(), 5, 5)
+        history.add(board)
+        self.assertLess((history.memory_usage - keyframe) * 50, keyframe)
+        board.remove_item(board.item(0, 3))
+        history.add(board)
+        history.undo()
+        history.undo()
+        self.assertIsInstance(history.current.item(5, 5), board_items.BoardItemVoid)
+        history.redo()
+        current = history.current
+        self.assertIsInstance(current.item(5, 5), board_items.Wall)
+        self.assertIsInstance(current.item(0, 3), board_items.Wall)
+        # The items belong to the reconstructed board.
+        self.assertEqual(len(current._immovables), 31)
+        for item in current._immovables:
+            self.assertIs(item.parent, current)
+            self.assertIs(current.item(item.row, item.column), item)
+        history.redo()
+        self.assertIsInstance(history.current.item(0, 3), board_items.BoardItemVoid)
+        self.assertFalse(history.current._blocking[0, 3])
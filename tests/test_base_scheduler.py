@@ -0,0 +1,138 @@
+from pygamelib.base import Scheduler, Timer, PglInvalidTypeException
+from pygamelib import engine, constants
+import random
+import unittest
+
+
+class TestScheduler(unittest.TestCase):
+    def test_call_later(self):
+        s = Scheduler()
+        calls = []
+        t = s.call_later(0.5, calls.append, "a")
+        self.assertIsInstance(t, Timer)
+        self.assertTrue(t.active)
+        self.assertEqual(len(s), 1)
+        self.assertEqual(s.update(0.3), 0)
+        self.assertEqual(calls, [])
+        self.assertEqual(s.update(0.3), 1)
+        self.assertEqual(calls, ["a"])
+        self.assertFalse(t.active)
+        self.assertEqual(len(s), 0)
+        self.assertAlmostEqual(s.time, 0.6)
+        s.update(10)
+        self.assertEqual(calls, ["a"])
+
+    def test_keyword_arguments_and_order(self):
+        s = Scheduler()
+        calls = []
+
+        def cb(name, suffix=""):
+            calls.append(name + suffix)
+
+        s.call_later(2, cb, "c")
+        s.call_later(1, cb, "a", suffix="!")
+        s.call_later(1.5, cb, "b")
+        s.update(5)
+        self.assertEqual(calls, ["a!", "b", "c"])
+
+    def test_call_every_and_cancel(self):
+        s = Scheduler()
+        calls = []
+        t = s.call_every(0.25, calls.append, 1)
+        for _ in range(40):
+            s.update(0.025)
+        self.assertEqual(len(calls), 4)
+        self.assertAlmostEqual(t.deadline, 1.25)
+        t.cancel()
+        self.assertTrue(t.cancelled)
+        self.assertFalse(t.active)
+        self.assertEqual(len(s), 0)
+        s.update(2)
+        self.assertEqual(len(calls), 4)
+        # Cancelling twice or a timer that expired does nothing
+        t.cancel()
+        t2 = s.call_later(0, calls.append, 2)
+        s.update(0.01)
+        s.cancel(t2)
+        self.assertEqual(len(s), 0)
+        self.assertEqual(calls[-1], 2)
+        # A timer can cancel itself
+        box = []
+
+        def self_cancel():
+            calls.append(3)
+            box[0].cancel()
+
+        box.append(s.call_every(1, self_cancel))
+        s.update(5)
+        self.assertEqual(calls.count(3), 1)
+        self.assertEqual(len(s), 0)
+
+    def test_clear(self):
+        s = Scheduler()
+        calls = []
+        timers = [s.call_later(i, calls.append, i) for i in range(10)]
+        s.clear()
+        self.assertEqual(len(s), 0)
+        self.assertFalse(timers[3].active)
+        s.update(20)
+        self.assertEqual(calls, [])
+
+    def test_long_delays(self):
+        # The timers go through all the wheels and the overflow list.
+        random.seed(42)
+        s = Scheduler(resolution=0.01)
+        fired = []
+        delays = {}
+        previous = [0.0]
+
+        def cb(i):
+            # Called in the first update that reached the deadline.
+            self.assertLessEqual(delays[i], s.time + s.resolution)
+            self.assertGreater(delays[i], previous[0] - s.resolution)
+            fired.append(i)
+
+        for i in range(2000):
+            delay = random.random() * random.choice([1, 10, 1000, 100000, 1000000])
+            delays[i] = delay
+            s.call_later(delay, cb, i)
+        while len(s):
+            previous[0] = s.time
+            s.update(random.random() * random.choice([0.05, 5, 5000]))
+        self.assertEqual(sorted(fired), list(range(2000)))
+        self.assertEqual(fired, sorted(fired, key=lambda i: delays[i]))
+
+    def test_exceptions(self):
+        with self.assertRaises(PglInvalidTypeException):
+            Scheduler(resolution=0)
+        s = Scheduler()
+        with self.assertRaises(PglInvalidTypeException):
+            s.call_later(-1, print)
+        with self.assertRaises(PglInvalidTypeException):
+            s.call_later("1", print)
+        with self.assertRaises(PglInvalidTypeException):
+            s.call_every(0, print)
+        with self.assertRaises(PglInvalidTypeException):
+            s.call_every(1, "print")
+        with self.assertRaises(PglInvalidTypeException):
+            s.cancel("timer")
+
+    def test_game_scheduler(self):
+        def upd(g, i, dt):
+            g.frames += 1
+            if g.frames > 10**6:
+                g.stop()
+
+        g = engine.Game(user_update=upd, mode=constants.MODE_RT, input_lag=0.001)
+        g.frames = 0
+        self.assertIsInstance(g.scheduler, Scheduler)
+        calls = []
+        g.scheduler.call_later(0.01, calls.append, "later")
+        g.scheduler.call_later(0.01, g.stop)
+        g.run()
+        self.assertEqual(calls, ["later"])
+        self.assertLess(g.frames, 10**6)
+
+
+if __name__ == "__main__":
+    unittest.main()
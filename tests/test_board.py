@@ -7,6 +7,19 @@ from pygamelib import constants
 import unittest
 
 
+class Recorder(base.PglBaseObject):
+    # An observer that records the notifications it receives.
+    def __init__(self):
+        super().__init__()
+        self.events = []
+
+    def handle_notification(self, subject, attribute=None, value=None):
+        self.events.append((subject, attribute, value))
+
+    def attributes(self):
+        return [attribute for (_, attribute, _) in self.events]
+
+
 class TestItem(pgl_board_items.BoardItem):
     def __init__(
         self,
@@ -276,6 +289,46 @@ class TestBoard(unittest.TestCase):
         with self.assertRaises(base.PglInvalidTypeException):
             self.board.move(i, "constants.DOWN", 1)
 
+    def test_move_complex_footprint(self):
+        b = pgl_engine.Board(size=[20, 20])
+        # A "U" shaped NPC: the bottom middle cell is transparent.
+        sprite = gfx_core.Sprite(
+            sprixels=[
+                [gfx_core.Sprixel("#"), gfx_core.Sprixel("#"), gfx_core.Sprixel("#")],
+                [gfx_core.Sprixel("#"), gfx_core.Sprixel(), gfx_core.Sprixel("#")],
+            ]
+        )
+        npc = pgl_board_items.ComplexNPC(sprite=sprite)
+        self.assertEqual(npc.footprint.tolist(), [[True] * 3, [True, False, True]])
+        b.place_item(npc, 5, 5)
+        # Moving over itself is fine.
+        b.move(npc, constants.RIGHT, 1)
+        b.move(npc, constants.DOWN, 1)
+        self.assertEqual(npc.pos[0:2], [6, 6])
+        # An item in the transparent part of the footprint does not block.
+        wall = pgl_board_items.Wall()
+        b.place_item(wall, 8, 7)
+        b.move(npc, constants.DOWN, 1)
+        self.assertEqual(npc.pos[0:2], [7, 6])
+        self.assertIs(b.item(8, 7), wall)
+        # But it does block when it is under a solid part, and a failed move leaves the
+        # board untouched.
+        rec = Recorder()
+        b.attach(rec)
+        b.move(npc, constants.LEFT, 1)
+        self.assertEqual(npc.pos[0:2], [7, 6])
+        self.assertEqual(rec.events, [])
+        self.assertIs(b.item(7, 6), npc)
+        b.move(npc, constants.RIGHT, 1)
+        self.assertEqual(npc.pos[0:2], [7, 6])
+        b.move(npc, constants.UP, 1)
+        self.assertEqual(npc.pos[0:2], [6, 6])
+        self.assertIn("pygamelib.engine.Board.place_item:item_placed", rec.attributes())
+        self.assertIsInstance(b.item(8, 6), pgl_board_items.BoardItemVoid)
+        self.assertFalse(b._blocking[8, 6])
+        self.assertTrue(b._blocking[7, 8])
+        self.assertFalse(b._blocking[7, 7])
+
     def test_move_simple(self):
         def _act(p):
             setattr(p[0], "test_callback", True)
@@ -331,6 +384,94 @@ class TestBoard(unittest.TestCase):
         self.assertIsNone(b.move(i, constants.DOWN, 1))
         self.assertIsNone(b.clear_cell(i.row, i.column))
 
+    def test_move_many(self):
+        b = pgl_engine.Board(size=[10, 10])
+        chain = [pgl_board_items.NPC() for _ in range(3)]
+        for idx, npc in enumerate(chain):
+            b.place_item(npc, 1, 1 + idx)
+        swap = [pgl_board_items.NPC(), pgl_board_items.NPC()]
+        b.place_item(swap[0], 3, 1)
+        b.place_item(swap[1], 3, 2)
+        contention = [pgl_board_items.NPC(), pgl_board_items.NPC()]
+        b.place_item(contention[0], 5, 1)
+        b.place_item(contention[1], 5, 3)
+        b.place_item(pgl_board_items.Wall(), 7, 2)
+        blocked = pgl_board_items.NPC()
+        b.place_item(blocked, 7, 1)
+        edge = pgl_board_items.NPC()
+        b.place_item(edge, 9, 9)
+        player = pgl_board_items.Player(inventory=pgl_engine.Inventory())
+        b.place_item(player, 8, 1)
+        b.place_item(pgl_board_items.Treasure(value=10), 8, 2)
+        results = b.move_many(
+            [
+                (chain[0], constants.RIGHT),
+                (chain[1], constants.RIGHT),
+                (chain[2], constants.RIGHT, 1),
+                (swap[0], constants.RIGHT),
+                (swap[1], constants.LEFT),
+                (contention[0], constants.RIGHT),
+                (contention[1], base.Vector2D(0, -1)),
+                (blocked, constants.RIGHT),
+                (edge, constants.DOWN),
+                (player, constants.RIGHT),
+            ]
+        )
+        self.assertEqual(
+            results, [True, True, True, False, False, True, False, False, False, True]
+        )
+        self.assertEqual([n.column for n in chain], [2, 3, 4])
+        self.assertIs(b.item(1, 1), b.item(1, 1, 0))
+        self.assertIsInstance(b.item(1, 1), pgl_board_items.BoardItemVoid)
+        self.assertEqual(swap[0].pos[0:2], [3, 1])
+        self.assertEqual(swap[1].pos[0:2], [3, 2])
+        self.assertEqual(contention[0].pos[0:2], [5, 2])
+        self.assertEqual(contention[1].pos[0:2], [5, 3])
+        self.assertEqual(blocked.pos[0:2], [7, 1])
+        self.assertEqual(edge.pos[0:2], [9, 9])
+        self.assertEqual(player.pos[0:2], [8, 2])
+        self.assertEqual(player.inventory.value(), 10)
+        # A cycle of 4 items stays still.
+        square = [pgl_board_items.NPC() for _ in range(4)]
+        b.place_item(square[0], 0, 6)
+        b.place_item(square[1], 0, 7)
+        b.place_item(square[2], 1, 7)
+        b.place_item(square[3], 1, 6)
+        self.assertEqual(
+            b.move_many(
+                [
+                    (square[0], constants.RIGHT),
+                    (square[1], constants.DOWN),
+                    (square[2], constants.LEFT),
+                    (square[3], constants.UP),
+                ]
+            ),
+            [False] * 4,
+        )
+        # Complex items are moved after the others.
+        cnpc = pgl_board_items.ComplexNPC(
+            sprite=gfx_core.Sprite(default_sprixel=gfx_core.Sprixel("*"), size=[2, 2])
+        )
+        b.place_item(cnpc, 3, 5)
+        self.assertEqual(
+            b.move_many([(cnpc, constants.DOWN), (chain[2], constants.DOWN)]),
+            [True, True],
+        )
+        self.assertEqual(cnpc.pos[0:2], [4, 5])
+        self.assertEqual(b.move_many([]), [])
+        with self.assertRaises(base.PglObjectIsNotMovableException):
+            b.move_many([(pgl_board_items.Wall(), constants.DOWN)])
+        with self.assertRaises(base.PglInvalidTypeException):
+            b.move_many([chain[0]])
+        # The blocking data follow the content of the board
+        self.assertTrue(b._blocking[7, 2])
+        self.assertTrue(b._blocking[cnpc.row + 1, cnpc.column + 1])
+        self.assertFalse(b._blocking[3, 5])
+        b.clear_cell(7, 2)
+        self.assertFalse(b._blocking[7, 2])
+        b.place_item(pgl_board_items.Door(), 7, 2)
+        self.assertFalse(b._blocking[7, 2])
+
     def test_accumulative_move(self):
         g = pgl_engine.Game.instance(mode=constants.MODE_RT, player=constants.NO_PLAYER)
         g.add_board(1, pgl_engine.Board())
@@ -446,6 +587,227 @@ class TestBoard(unittest.TestCase):
         with self.assertRaises(SyntaxError):
             pgl_engine.Board.load(b.serialize())
 
+    def test_binary_serialization(self):
+        b = pgl_engine.Board(
+            size=[30, 20],
+            ui_board_void_cell_sprixel=gfx_core.Sprixel(" ", gfx_core.Color(0, 0, 0)),
+        )
+        for c in range(b.width):
+            b.place_item(pgl_board_items.Wall(), 0, c)
+        b.place_item(pgl_board_items.Treasure(value=42), 4, 4)
+        b.place_item(pgl_board_items.GenericStructure(), 5, 5)
+        b.place_item(pgl_board_items.Door(), 5, 5, 1)
+        b.place_item(
+            pgl_board_items.ComplexWall(
+                sprite=gfx_core.Sprite(
+                    default_sprixel=gfx_core.Sprixel("#"), size=[3, 2]
+                )
+            ),
+            10,
+            10,
+        )
+        for compression in [constants.Compression.NONE, constants.Compression.ZLIB]:
+            data = b.serialize_binary(compression)
+            self.assertIsInstance(data, bytes)
+            bl = pgl_engine.Board.load_binary(data)
+            self.assertEqual(b.size, bl.size)
+            self.assertEqual(b.name, bl.name)
+            self.assertEqual(b.player_starting_position, bl.player_starting_position)
+            self.assertEqual(b.serialize(), bl.serialize())
+            self.assertIsInstance(bl.item(0, 29), pgl_board_items.Wall)
+            self.assertEqual(bl.item(4, 4).value, 42)
+            self.assertIsInstance(bl.item(5, 5, 1), pgl_board_items.Door)
+            self.assertIsInstance(bl.item(11, 12), pgl_board_items.ComplexWall)
+            self.assertIs(bl.item(11, 12), bl.item(10, 10))
+            self.assertEqual(len(bl.get_immovables()), len(b.get_immovables()))
+            self.assertIs(bl.item(0, 0).parent, bl)
+        try:
+            data = b.serialize_binary(constants.Compression.LZ4)
+            bl = pgl_engine.Board.load_binary(data)
+            self.assertEqual(b.serialize(), bl.serialize())
+        except base.PglException as e:
+            self.assertEqual(e.error, "missing_dependency")
+        with self.assertRaises(base.PglInvalidTypeException):
+            b.serialize_binary("zlib")
+        with self.assertRaises(base.PglException):
+            pgl_engine.Board.load_binary(b"not a board")
+        with self.assertRaises(base.PglException):
+            pgl_engine.Board.load_binary(b"PGLB\x63\x01")
+
+    def test_bulk_place_remove(self):
+        b = pgl_engine.Board(size=[20, 10])
+        rec = Recorder()
+        b.attach(rec)
+        walls = [(pgl_board_items.Wall(), 0, c) for c in range(b.width)]
+        treasure = pgl_board_items.Treasure()
+        npc = pgl_board_items.NPC()
+        complex_wall = pgl_board_items.ComplexWall(
+            sprite=gfx_core.Sprite(default_sprixel=gfx_core.Sprixel("#"), size=[3, 2])
+        )
+        door = pgl_board_items.Door()
+        b.place_items(
+            walls
+            + [
+                (treasure, 2, 2),
+                (npc, 3, 3),
+                (complex_wall, 5, 5),
+                (door, 2, 2, 1),
+            ]
+        )
+        self.assertEqual(len(rec.events), 1)
+        self.assertEqual(
+            rec.events[0][1], "pygamelib.engine.Board.place_items:items_placed"
+        )
+        self.assertEqual(len(rec.events[0][2]), 24)
+        self.assertIsInstance(b.item(0, 19), pgl_board_items.Wall)
+        self.assertIs(b.item(2, 2, 1), door)
+        self.assertIs(b.item(6, 7), complex_wall)
+        self.assertIs(b.item(3, 3), npc)
+        self.assertIn(npc, b.get_movables())
+        self.assertIn(complex_wall, b.get_immovables())
+        self.assertEqual(len(b.get_immovables()), 23)
+        # Same layering rules as place_item()
+        b2 = pgl_engine.Board(size=[20, 10])
+        b2.place_item(pgl_board_items.Tile(), 2, 2)
+        b2.place_item(pgl_board_items.Door(), 2, 2)
+        b.place_items([(pgl_board_items.Tile(), 8, 8), (pgl_board_items.Door(), 8, 8)])
+        self.assertEqual(b.layers(8, 8), b2.layers(2, 2))
+        # Validation happens before anything is placed.
+        with self.assertRaises(base.PglOutOfBoardBoundException):
+            b.place_items([(pgl_board_items.Wall(), 9, 9), (complex_wall, 9, 19)])
+        self.assertIsInstance(b.item(9, 9), pgl_board_items.BoardItemVoid)
+        with self.assertRaises(base.PglInvalidTypeException):
+            b.place_items([(pgl_board_items.Wall(), 9, 9), ("wall", 9, 8)])
+        with self.assertRaises(base.PglInvalidTypeException):
+            b.place_items([pgl_board_items.Wall()])
+        self.assertIsInstance(b.item(9, 9), pgl_board_items.BoardItemVoid)
+        rec.events.clear()
+        b.place_items([])
+        self.assertEqual(rec.events, [])
+
+        self.assertTrue(b.remove_items([w[0] for w in walls] + [npc, complex_wall]))
+        self.assertEqual(len(rec.events), 1)
+        self.assertEqual(
+            rec.events[0][1], "pygamelib.engine.Board.remove_items:items_removed"
+        )
+        self.assertIsInstance(b.item(0, 0), pgl_board_items.BoardItemVoid)
+        self.assertIsInstance(b.item(6, 7), pgl_board_items.BoardItemVoid)
+        self.assertNotIn(npc, b.get_movables())
+        self.assertNotIn(complex_wall, b.get_immovables())
+        with self.assertRaises(base.PglException):
+            b.remove_items([treasure, npc])
+        self.assertIs(b.item(2, 2, 0), treasure)
+        with self.assertRaises(base.PglInvalidTypeException):
+            b.remove_items([treasure, "door"])
+        self.assertTrue(b.remove_items([treasure, door]))
+        self.assertIsInstance(b.item(2, 2, 0), pgl_board_items.BoardItemVoid)
+        # An item given twice is removed once: the item above it stays on the board.
+        d = pgl_board_items.Door()
+        d2 = pgl_board_items.Door()
+        b.place_item(pgl_board_items.GenericStructure(), 5, 5)
+        b.place_item(d, 5, 5)
+        b.place_item(d2, 5, 5)
+        rec.events.clear()
+        self.assertTrue(b.remove_items([d, d]))
+        self.assertIs(b.item(d2.row, d2.column, d2.layer), d2)
+        self.assertEqual(rec.events[0][2], [d])
+
+    def test_field_of_view(self):
+        b = pgl_engine.Board(size=[21, 11])
+        for r in range(11):
+            b.place_item(pgl_board_items.Wall(), r, 10)
+        b.place_item(pgl_board_items.Wall(), 5, 5)
+        fov = b.field_of_view(5, 3, 8)
+        self.assertIsInstance(fov, frozenset)
+        self.assertIn((5, 3), fov)
+        self.assertIn((5, 4), fov)
+        # The wall is visible but hides what is behind it
+        self.assertIn((5, 5), fov)
+        self.assertNotIn((5, 6), fov)
+        self.assertIn((2, 8), fov)
+        # The radius is respected and nothing is visible through the wall line
+        self.assertNotIn((5, 9), fov)
+        self.assertNotIn((3, 11), fov)
+        self.assertEqual(b.field_of_view(5, 3, 0), frozenset({(5, 3)}))
+        # Results are cached until the terrain changes
+        self.assertIs(b.field_of_view(5, 3, 8), fov)
+        npc = pgl_board_items.NPC()
+        b.place_item(npc, 4, 4)
+        b.move(npc, constants.DOWN, 1)
+        fov_far = b.field_of_view(5, 15, 2)
+        self.assertIs(b.field_of_view(5, 3, 8), fov)
+        b.clear_cell(5, 5)
+        fov2 = b.field_of_view(5, 3, 8)
+        self.assertIsNot(fov2, fov)
+        self.assertIn((5, 6), fov2)
+        # A change outside of the radius does not invalidate the cache
+        self.assertIs(b.field_of_view(5, 15, 2), fov_far)
+        b.place_item(pgl_board_items.Wall(), 5, 7)
+        self.assertNotIn((5, 8), b.field_of_view(5, 3, 8))
+        self.assertIs(b.field_of_view(5, 15, 2), fov_far)
+        with self.assertRaises(base.PglInvalidTypeException):
+            b.field_of_view(5, 3, "8")
+        with self.assertRaises(base.PglOutOfBoardBoundException):
+            b.field_of_view(50, 3, 8)
+
+    def test_line_of_sight(self):
+        b = pgl_engine.Board(size=[21, 11])
+        b.place_item(pgl_board_items.Wall(), 5, 5)
+        npc = pgl_board_items.NPC()
+        b.place_item(npc, 5, 8)
+        self.assertFalse(b.line_of_sight((5, 3), npc))
+        self.assertTrue(b.line_of_sight((5, 3), (5, 5)))
+        self.assertTrue(b.line_of_sight((2, 3), npc))
+        self.assertTrue(b.line_of_sight(npc, npc))
+        # Movable items do not block the line of sight
+        b.place_item(pgl_board_items.NPC(), 5, 10)
+        self.assertTrue(b.line_of_sight(npc, [5, 12]))
+        with self.assertRaises(base.PglInvalidTypeException):
+            b.line_of_sight("a", npc)
+
+    def test_distance_field(self):
+        b = pgl_engine.Board(size=[6, 4])
+        # A wall with a single opening on the last row, and a walled-in corner.
+        for r in range(3):
+            b.place_item(pgl_board_items.Wall(), r, 2)
+        b.place_item(pgl_board_items.Wall(), 2, 5)
+        b.place_item(pgl_board_items.Wall(), 3, 4)
+        # Movable items are ignored
+        b.place_item(pgl_board_items.NPC(), 3, 1)
+        field = b.distance_field(0, 0)
+        self.assertEqual(
+            field.tolist(),
+            [
+                [0, 1, -1, 9, 10, 11],
+                [1, 2, -1, 8, 9, 10],
+                [2, 3, -1, 7, 8, -1],
+                [3, 4, 5, 6, -1, -1],
+            ],
+        )
+        with self.assertRaises(ValueError):
+            field[0, 0] = 3
+        # Cached until the terrain changes
+        self.assertIs(b.distance_field(0, 0), field)
+        npc = pgl_board_items.NPC()
+        b.place_item(npc, 1, 1)
+        b.move(npc, constants.DOWN, 1)
+        self.assertIs(b.distance_field(0, 0), field)
+        b.clear_cell(3, 4)
+        field2 = b.distance_field(0, 0)
+        self.assertIsNot(field2, field)
+        self.assertEqual(field2[3, 5], 8)
+        self.assertEqual(b.distance_field(3, 5)[0, 0], 8)
+        # The cache keeps the most recently used targets only.
+        targets = [(r, c) for r in range(4) for c in range(6)]
+        for (r, c) in targets:
+            b.distance_field(r, c)
+        cache_size = pgl_engine.Board._DISTANCE_FIELD_CACHE_SIZE
+        self.assertEqual(list(b._distance_fields), targets[-cache_size:])
+        with self.assertRaises(base.PglInvalidTypeException):
+            b.distance_field(0, "0")
+        with self.assertRaises(base.PglOutOfBoardBoundException):
+            b.distance_field(4, 0)
+
     def test_render_cell(self):
         board = pgl_engine.Board(
             name="test_board", size=[20, 30], player_starting_position=[5, 5]
@@ -4,6 +4,18 @@ from pygamelib import board_items
 from pygamelib import constants
 from pygamelib.gfx import core
 import unittest
+import json
+import io
+import asyncio
+import time
+import random
+import os
+import tempfile
+import struct
+import threading
+import zlib
+from unittest import mock
+from blessed.keyboard import Keystroke
 
 # Test cases for all classes in pygamelib.gfx.core except for Animation.
 
@@ -73,25 +85,529 @@ class TestBase(unittest.TestCase):
         g.run()
         self.assertEqual(g.state, constants.STOPPED)
 
+    def test_run_fixed_timestep(self):
+        def upd(g, i, dt):
+            self.assertEqual(dt, 0.005)
+            g.ticks += 1
+            if g.ticks >= 20:
+                g.stop()
+
+        def slow_upd(g, i, dt):
+            upd(g, i, dt)
+            time.sleep(0.02)
+
+        def render(g, alpha):
+            self.assertGreaterEqual(alpha, 0.0)
+            self.assertLess(alpha, 1.0)
+            self.assertEqual(alpha, g.interpolation)
+            self.assertLessEqual(g.ticks - g.last_ticks, g.max_ticks_per_frame)
+            g.last_ticks = g.ticks
+
+        g = engine.Game(
+            user_update=upd,
+            user_render=render,
+            mode=constants.MODE_RT,
+            fixed_timestep=0.005,
+        )
+        g.ticks = 0
+        g.last_ticks = 0
+        g.player = board_items.Player()
+        g.add_board(1, engine.Board())
+        g.change_level(1)
+        g.run()
+        self.assertEqual(g.ticks, 20)
+        self.assertGreater(g.last_ticks, 0)
+        self.assertAlmostEqual(g.player.dtmove, 20 * 0.005)
+        # The simulation drops the time it cannot catch up with.
+        g = engine.Game(
+            user_update=slow_upd,
+            user_render=render,
+            mode=constants.MODE_RT,
+            fixed_timestep=0.005,
+            max_ticks_per_frame=1,
+        )
+        g.ticks = 0
+        g.last_ticks = 0
+        g.run()
+        self.assertEqual(g.ticks, 20)
+        g = engine.Game(user_update=upd, fixed_timestep=-1)
+        with self.assertRaises(base.PglInvalidTypeException):
+            g.run()
+        g = engine.Game(user_update=upd, fixed_timestep=0.1, user_render=1)
+        with self.assertRaises(base.PglInvalidTypeException):
+            g.run()
+
+    def test_simulate(self):
+        def upd(g, i, dt):
+            g.inputs.append(i)
+            if i == "q":
+                g.stop()
+
+        def rollout(seed):
+            # The actuators draw their first direction when they are created.
+            random.seed(0)
+            g = engine.Game(user_update=upd, mode=constants.MODE_RT)
+            g.inputs = []
+            g.player = board_items.Player()
+            g.add_board(1, engine.Board(size=[20, 20]))
+            g.change_level(1)
+            npc = board_items.NPC(
+                actuator=actuators.RandomActuator(
+                    moveset=[constants.UP, constants.DOWN, constants.LEFT]
+                ),
+                step=1,
+            )
+            g.add_npc(1, npc, 10, 10)
+            self.assertEqual(g.simulate(200, dt=0.25, seed=seed), 200)
+            return (npc.pos, len(g.inputs), g.player.dtmove)
+
+        first = rollout(42)
+        self.assertEqual(first[1:], (200, 50.0))
+        self.assertNotEqual(first[0], [10, 10, 0])
+        self.assertEqual(rollout(42), first)
+        # Inputs as an iterable or a function, and early stop.
+        g = engine.Game(user_update=upd, fixed_timestep=0.5)
+        g.inputs = []
+        g.scheduled = []
+        g.scheduler.call_later(1.0, g.scheduled.append, "timer")
+        self.assertEqual(g.simulate(5, inputs=["a", "b"]), 5)
+        self.assertEqual(g.inputs, ["a", "b", None, None, None])
+        self.assertEqual(g.scheduled, ["timer"])
+        self.assertEqual(
+            g.simulate(5, inputs=lambda game, tick: "q" if tick == 2 else tick), 3
+        )
+        self.assertEqual(g.inputs[5:], [0, 1, "q"])
+        self.assertEqual(g.state, constants.State.STOPPED)
+        g.step("x")
+        self.assertEqual(len(g.inputs), 8)
+        # step() does not start a paused game.
+        g = engine.Game(user_update=upd, user_update_paused=upd)
+        g.inputs = []
+        g.step("a", 0.1)
+        self.assertEqual(g.state, constants.State.PAUSED)
+        g.start()
+        g.step("b", 0.1)
+        self.assertEqual(g.inputs, ["a", "b"])
+        with self.assertRaises(base.PglInvalidTypeException):
+            g.step("c")
+        with self.assertRaises(base.PglInvalidTypeException):
+            g.simulate(-1, dt=0.1)
+        with self.assertRaises(base.PglInvalidTypeException):
+            g.simulate(1, inputs=42, dt=0.1)
+        with self.assertRaises(base.PglInvalidTypeException):
+            engine.Game().step(None, 0.1)
+
+    def test_record_replay_inputs(self):
+        def upd(g, i, dt):
+            g.frames.append((str(i), getattr(i, "name", None), dt, random.random()))
+            if len(g.frames) >= 30:
+                g.stop()
+
+        def fake_inkey(timeout=None):
+            keys = ["", "a", "", "", "KEY_UP", "b"]
+            frame = len(g.frames)
+            if keys[frame % len(keys)] == "KEY_UP":
+                return Keystroke("\x1b[A", g.terminal.KEY_UP, "KEY_UP")
+            return Keystroke(keys[frame % len(keys)])
+
+        filename = "test-pygamelib.engine.Game.inputs.pgi"
+        results = {}
+        for fixed_timestep in [None, 0.001]:
+            g = engine.Game(
+                user_update=upd, mode=constants.MODE_RT, fixed_timestep=fixed_timestep
+            )
+            g.frames = []
+            g.record_inputs(filename)
+            with mock.patch.object(g.terminal, "inkey", fake_inkey):
+                g.run()
+            recorded = g.frames
+            self.assertEqual(len(recorded), 30)
+            g = engine.Game(user_update=upd, mode=constants.MODE_RT)
+            g.frames = []
+            frame_times = g.replay_inputs(filename)
+            self.assertEqual(g.fixed_timestep, fixed_timestep)
+            self.assertEqual(g.frames, recorded)
+            self.assertEqual(g.state, constants.State.STOPPED)
+            self.assertGreater(len(frame_times), 0)
+            self.assertTrue(all(t >= 0 for t in frame_times))
+            results[fixed_timestep] = recorded
+        self.assertEqual(results[None][1][:2], ("a", None))
+        self.assertEqual(results[None][4][:2], ("\x1b[A", "KEY_UP"))
+        self.assertEqual(results[0.001][0][2], 0.001)
+        # A stopped game can be replayed, the replay stops when the recording ends.
+        g = engine.Game(user_update=lambda g, i, dt: None)
+        self.assertGreater(len(g.replay_inputs(filename)), 0)
+        with open(filename, "wb") as f:
+            f.write(b"not a recording")
+        with self.assertRaises(base.PglException):
+            g.replay_inputs(filename)
+        with self.assertRaises(base.PglInvalidTypeException):
+            g.record_inputs(42)
+        with self.assertRaises(base.PglInvalidTypeException):
+            g.record_inputs(filename, "seed")
+        os.remove(filename)
+
+    def test_threaded_input(self):
+        def upd(g, keys, dt):
+            self.assertIsInstance(keys, list)
+            g.keys.extend(str(k) for k in keys)
+            g.frames.append(dt)
+            if len(g.keys) >= 5 or len(g.frames) >= 500:
+                g.stop()
+
+        burst = ["a", "b", "c", "d", "e"]
+
+        def fake_inkey(timeout=None):
+            if burst:
+                return Keystroke(burst.pop(0))
+            return Keystroke("")
+
+        filename = "test-pygamelib.engine.Game.threaded_inputs.pgi"
+        g = engine.Game(user_update=upd, mode=constants.MODE_RT, threaded_input=True)
+        g.keys = []
+        g.frames = []
+        g.record_inputs(filename)
+        with mock.patch.object(g.terminal, "inkey", fake_inkey):
+            g.run()
+        self.assertEqual(g.keys, ["a", "b", "c", "d", "e"])
+        # The frames last input_lag seconds whatever the key presses.
+        self.assertTrue(all(dt >= 0.009 for dt in g.frames[1:]))
+        # The input thread is stopped with the game loop.
+        self.assertNotIn("pygamelib-input", [t.name for t in threading.enumerate()])
+        # The lists of keys are recorded and replayed as such.
+        recorded = (g.keys, g.frames)
+        g = engine.Game(user_update=upd, mode=constants.MODE_RT)
+        g.keys = []
+        g.frames = []
+        g.replay_inputs(filename)
+        self.assertTrue(g.threaded_input)
+        self.assertEqual((g.keys, g.frames), recorded)
+        # The recordings made before threaded_input existed can be replayed too.
+        header = json.dumps(
+            {"seed": 1, "fixed_timestep": None, "keys": [[1, "a", None, None]]}
+        ).encode("utf-8")
+        payload = struct.pack("<I", len(header)) + header + struct.pack("<2d", 0, 0)
+        with open(filename, "wb") as f:
+            f.write(
+                engine._INPUT_RECORDING_MAGIC
+                + struct.pack("<B", engine._INPUT_RECORDING_VERSION)
+                + zlib.compress(payload)
+            )
+        g = engine.Game(
+            user_update=lambda g, key, dt: g.keys.append(key), mode=constants.MODE_RT
+        )
+        g.keys = []
+        g.replay_inputs(filename)
+        self.assertFalse(g.threaded_input)
+        self.assertEqual(g.keys, ["", "a"])
+        os.remove(filename)
+        # Fixed timestep: the ticks without keys get an empty list.
+        burst.extend(["f", "g"])
+        g = engine.Game(
+            user_update=upd,
+            mode=constants.MODE_RT,
+            threaded_input=True,
+            fixed_timestep=0.001,
+        )
+        g.keys = []
+        g.frames = []
+        with mock.patch.object(g.terminal, "inkey", fake_inkey):
+            g.run()
+        self.assertEqual(g.keys, ["f", "g"])
+
+    def test_background_levels(self):
+        class CountingActuator(actuators.Actuator):
+            def __init__(self, parent=None):
+                super().__init__(parent)
+                self.elapsed = []
+
+            def next_move(self):
+                self.elapsed.append(self.parent.dtmove)
+                self.parent.dtmove = 0.0
+                return constants.NO_DIR
+
+        g = engine.Game(user_update=lambda g, k, dt: None, background_tick_rate=8)
+        g.player = board_items.Player()
+        npcs = {}
+        for level in [1, 2, 3, 4]:
+            g.add_board(level, engine.Board(size=[10, 10]))
+            npc = board_items.NPC()
+            npc.actuator = CountingActuator(npc)
+            g.add_npc(level, npc, 5, 5)
+            npcs[level] = npc.actuator
+        g.change_level(1)
+        g.set_level_tick_rate(3, 2)
+        g.set_level_tick_rate(4, 0)
+        g.simulate(128, dt=1 / 64)
+        self.assertEqual(len(npcs[1].elapsed), 128)
+        self.assertEqual(len(npcs[2].elapsed), 16)
+        self.assertAlmostEqual(npcs[2].elapsed[0], 0.125)
+        self.assertEqual(len(npcs[3].elapsed), 4)
+        self.assertAlmostEqual(npcs[3].elapsed[0], 0.5)
+        self.assertEqual(npcs[4].elapsed, [])
+        # The time spent as the current level does not count.
+        g.change_level(2)
+        g.simulate(128, dt=1 / 64)
+        self.assertEqual(len(npcs[2].elapsed), 144)
+        self.assertEqual(len(npcs[1].elapsed), 144)
+        self.assertAlmostEqual(npcs[1].elapsed[-1], 0.125)
+        # With no budget, a single level is updated per frame.
+        g = engine.Game(
+            user_update=lambda g, k, dt: None,
+            background_tick_rate=8,
+            background_budget=0,
+        )
+        g.player = board_items.Player()
+        for level in [1, 2, 3, 4]:
+            g.add_board(level, engine.Board(size=[10, 10]))
+            npc = board_items.NPC()
+            npc.actuator = CountingActuator(npc)
+            g.add_npc(level, npc, 5, 5)
+            npcs[level] = npc.actuator
+        g.change_level(1)
+        g.start()
+        g.step(None, 0.125)
+        self.assertEqual([len(npcs[level].elapsed) for level in [2, 3, 4]], [1, 0, 0])
+        g.step(None, 1 / 64)
+        g.step(None, 1 / 64)
+        self.assertEqual([len(npcs[level].elapsed) for level in [2, 3, 4]], [1, 1, 1])
+        self.assertAlmostEqual(npcs[4].elapsed[0], 0.15625)
+        # The NPCs of a big level are moved by slices over several frames.
+        crowd = []
+        for i in range(40):
+            npc = board_items.NPC()
+            npc.actuator = CountingActuator(npc)
+            g.add_npc(2, npc, i // 10, i % 10)
+            crowd.append(npc.actuator)
+        g.step(None, 0.125)
+        self.assertEqual(len(npcs[2].elapsed), 2)
+        self.assertEqual(sum(len(a.elapsed) for a in crowd), 15)
+        g.remove_npc(2, crowd[20].parent)
+        g.step(None, 0.0)
+        self.assertEqual(sum(len(a.elapsed) for a in crowd), 30)
+        g.step(None, 0.0)
+        self.assertEqual(sum(len(a.elapsed) for a in crowd), 39)
+        self.assertEqual(crowd[20].elapsed, [])
+        self.assertAlmostEqual(crowd[-1].elapsed[0], 0.125 + 2 / 64)
+        g.set_level_tick_rate(2, None)
+        self.assertEqual(g._level_tick_rates, {})
+        # The actuators of the inactive levels work on the board of their level.
+        g = engine.Game(
+            user_update=lambda g, k, dt: None, background_tick_rate=10, boards={}
+        )
+        g.player = board_items.Player()
+        g.add_board(1, engine.Board(size=[10, 10]))
+        g.add_board(2, engine.Board(size=[40, 40]))
+        g.change_level(1)
+        seeker = board_items.NPC()
+        g.add_npc(2, seeker, 35, 35)
+        seeker.actuator = actuators.PathFinder(
+            game=g,
+            parent=seeker,
+            circle_waypoints=False,
+            algorithm=constants.Algorithm.ASTAR,
+        )
+        seeker.actuator.set_destination(35, 5)
+        flocker = board_items.NPC()
+        g.add_npc(2, flocker, 30, 35)
+        flocker.actuator = actuators.FlowFieldActuator(game=g, parent=flocker)
+        flocker.actuator.set_destination(30, 5)
+        g.simulate(10, dt=0.1)
+        self.assertEqual((seeker.row, seeker.column), (35, 25))
+        self.assertEqual((flocker.row, flocker.column), (30, 25))
+        self.assertIs(g.current_board(), g.get_board(1))
+        with self.assertRaises(base.PglInvalidTypeException):
+            g.set_level_tick_rate("1", 1)
+        with self.assertRaises(base.PglInvalidLevelException):
+            g.set_level_tick_rate(42, 1)
+        with self.assertRaises(base.PglInvalidTypeException):
+            g.set_level_tick_rate(1, -1)
+
+    def test_snapshot_restore(self):
+        def build():
+            random.seed(1)
+            g = engine.Game(boards={}, user_update=lambda g, k, dt: None)
+            g.player = board_items.Player(inventory=engine.Inventory())
+            for level in [1, 2]:
+                b = engine.Board(size=[20, 20])
+                g.add_board(level, b)
+                b.place_item(board_items.Wall(), 0, 5)
+                for i in range(5):
+                    g.add_npc(
+                        level,
+                        board_items.NPC(
+                            actuator=actuators.RandomActuator(
+                                moveset=[
+                                    constants.UP,
+                                    constants.DOWN,
+                                    constants.LEFT,
+                                    constants.RIGHT,
+                                ]
+                            ),
+                            step=1,
+                        ),
+                        5 + i,
+                        10,
+                    )
+            g.change_level(1)
+            g.current_board().place_item(
+                board_items.Treasure(value=10), g.player.row, g.player.column + 1
+            )
+            return g
+
+        def state(g):
+            boards = {}
+            for (level, data) in g._boards.items():
+                b = data["board"]
+                boards[level] = (
+                    b,
+                    [
+                        [tuple(id(i) for i in b._matrix[r][c]) for c in range(20)]
+                        for r in range(20)
+                    ],
+                    [tuple(i.pos) for r in b._matrix for cell in r for i in cell],
+                    b._blocking.copy().tolist(),
+                    sorted(id(m) for m in b.get_movables()),
+                    [(npc, tuple(npc.pos)) for npc in data["npcs"]],
+                )
+            return (
+                boards,
+                g.current_level,
+                g.player.pos,
+                g.player.hp,
+                g.player.inventory.size(),
+            )
+
+        def positions(g):
+            return [
+                (
+                    [tuple(npc.pos) for npc in data["npcs"]],
+                    data["board"]._blocking.sum(),
+                )
+                for data in g._boards.values()
+            ] + [g.player.pos]
+
+        g = build()
+        snap = g.snapshot()
+        reference = state(g)
+        g.simulate(40, dt=0.1)
+        # New void items are created when items move, only compare the positions.
+        first_run = positions(g)
+        self.assertNotEqual(state(g), reference)
+        # Pick the treasure, lose hp, kill an NPC, add a level and change level.
+        g.move_player(constants.RIGHT)
+        self.assertEqual(g.player.inventory.size(), 1)
+        g.player.hp -= 42
+        g.remove_npc(1, g._boards[1]["npcs"][0])
+        g.add_board(3, engine.Board())
+        g.change_level(2)
+        g.restore(snap)
+        self.assertEqual(state(g), reference)
+        # The random generator is restored too: same simulation, same result.
+        g.simulate(40, dt=0.1)
+        self.assertEqual(positions(g), first_run)
+        # A snapshot can be restored many times, an unchanged game is a no-op.
+        g.restore(snap)
+        self.assertEqual(state(g), reference)
+        g.restore(snap)
+        self.assertEqual(state(g), reference)
+        # Unchanged boards are shared between snapshots.
+        snap2 = g.snapshot()
+        self.assertIs(snap2.levels[2][1], snap.levels[2][1])
+        self.assertIs(snap2.levels[1][1], snap.levels[1][1])
+        g.move_player(constants.DOWN)
+        snap3 = g.snapshot()
+        self.assertIsNot(snap3.levels[1][1], snap.levels[1][1])
+        self.assertIs(snap3.levels[2][1], snap.levels[2][1])
+        with self.assertRaises(base.PglInvalidTypeException):
+            g.restore(build().snapshot())
+        with self.assertRaises(base.PglInvalidTypeException):
+            g.restore(None)
+
+    def test_run_async(self):
+        async def upd(g, i, dt):
+            await asyncio.sleep(0)
+            self.assertGreater(dt, 0)
+            g.counter += 1
+            if g.counter == 3:
+                g.pause()
+            elif g.counter >= 6:
+                g.stop()
+
+        def upd_paused(g, i, dt):
+            g.counter += 1
+            g.start()
+
+        async def background(g):
+            while g.state != constants.STOPPED:
+                g.background_runs += 1
+                await asyncio.sleep(0.001)
+
+        async def main(g):
+            await asyncio.gather(g.run_async(), background(g))
+
+        g = engine.Game(
+            user_update=upd,
+            user_update_paused=upd_paused,
+            mode=constants.MODE_RT,
+        )
+        g.counter = 0
+        g.background_runs = 0
+        g.player = board_items.Player()
+        g.add_board(1, engine.Board())
+        g.change_level(1)
+        asyncio.run(main(g))
+        self.assertEqual(g.state, constants.STOPPED)
+        self.assertGreaterEqual(g.counter, 6)
+        self.assertGreater(g.background_runs, 0)
+        self.assertGreater(g.player.dtmove, 0)
+
+        # Without board, with a fixed timestep and a coroutine render function
+        async def render(g, alpha):
+            self.assertLess(alpha, 1.0)
+            g.frames += 1
+
+        def sync_upd(g, i, dt):
+            self.assertEqual(dt, 0.005)
+            g.counter += 1
+            if g.counter >= 10:
+                g.stop()
+
+        g = engine.Game(
+            user_update=sync_upd,
+            user_render=render,
+            fixed_timestep=0.005,
+            mode=constants.MODE_RT,
+        )
+        g.counter = 0
+        g.frames = 0
+        asyncio.run(g.run_async())
+        self.assertEqual(g.counter, 10)
+        self.assertGreater(g.frames, 0)
+        g = engine.Game()
+        with self.assertRaises(base.PglInvalidTypeException):
+            asyncio.run(g.run_async())
+
     def test_config(self):
         g = engine.Game()
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        filename = os.path.join(directory.name, "config.json")
         self.assertIsNone(g.create_config("high_scores"))
         g.config("high_scores")["first_place"] = "Test"
         self.assertEqual(g.config("high_scores")["first_place"], "Test")
-        self.assertIsNone(
-            g.save_config("high_scores", "test-pygamelib.engine.Game.config.json")
-        )
+        self.assertIsNone(g.save_config("high_scores", filename))
         with self.assertRaises(base.PglInvalidTypeException):
-            g.save_config(None, "test-pygamelib.engine.Game.config.json")
+            g.save_config(None, filename)
         with self.assertRaises(base.PglInvalidTypeException):
             g.save_config("high_scores", None)
         with self.assertRaises(base.PglException) as e:
-            g.save_config("Unknown", "test-pygamelib.engine.Game.config.json")
+            g.save_config("Unknown", filename)
         self.assertEqual(e.exception.error, "unknown section")
         # Don't do that...
         g._configuration = None
         g._configuration_internals = None
-        g.load_config("test-pygamelib.engine.Game.config.json", "new_high_scores")
+        g.load_config(filename, "new_high_scores")
         self.assertIsNone(g.save_config("new_high_scores", None))
         self.assertIsNone(g.save_config("new_high_scores", None, True))
 
@@ -366,16 +882,26 @@ class TestBase(unittest.TestCase):
             g.neighbors(2, "crash")
 
         g.object_library.append(board_items.NPC())
-        self.assertIsNone(g.save_board(1, "test-pygamelib.engine.Game.lvl1.json"))
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        json_file = os.path.join(directory.name, "lvl1.json")
+        binary_file = os.path.join(directory.name, "lvl1.pgb")
+        self.assertIsNone(g.save_board(1, json_file))
         with self.assertRaises(base.PglInvalidTypeException):
-            g.save_board("1", "test-pygamelib.engine.Game.lvl1.json")
+            g.save_board("1", json_file)
         with self.assertRaises(base.PglInvalidTypeException):
             g.save_board(1, 1)
         with self.assertRaises(base.PglInvalidLevelException):
-            g.save_board(11, "test-pygamelib.engine.Game.lvl1.json")
-        self.assertIsInstance(
-            g.load_board("test-pygamelib.engine.Game.lvl1.json", 1), engine.Board
-        )
+            g.save_board(11, json_file)
+        self.assertIsInstance(g.load_board(json_file, 1), engine.Board)
+        self.assertIsNone(g.save_board(1, binary_file, binary=True))
+        with self.assertRaises(base.PglInvalidTypeException):
+            g.save_board(1, binary_file, True, "zlib")
+        g.object_library = []
+        lb = g.load_board(binary_file, 1)
+        self.assertIsInstance(lb, engine.Board)
+        self.assertIsInstance(g.object_library[0], board_items.NPC)
+        self.assertIsInstance(lb.item(1, 6), board_items.Treasure)
         self.assertEqual(g._string_to_constant("UP"), constants.UP)
         self.assertEqual(g._string_to_constant("DOWN"), constants.DOWN)
         self.assertEqual(g._string_to_constant("LEFT"), constants.LEFT)
@@ -492,6 +1018,234 @@ class TestBase(unittest.TestCase):
         self.assertEqual(obj.screen_row, 2)
         self.assertEqual(obj.screen_column, 4)
 
+    def test_batch_npc_moves(self):
+        for batch in [False, True]:
+            g = engine.Game(
+                player=constants.NO_PLAYER, boards={}, batch_npc_moves=batch
+            )
+            g.add_board(1, engine.Board(size=[10, 10]))
+            npcs = []
+            for c in range(3):
+                npc = board_items.NPC(
+                    actuator=actuators.PathActuator(path=[constants.RIGHT])
+                )
+                npcs.append(npc)
+                # The first NPC is behind the others.
+                g.add_npc(1, npc, 1, 1 + c)
+            g.state = constants.State.RUNNING
+            g.actuate_npcs(1)
+            if batch:
+                self.assertEqual([n.column for n in npcs], [2, 3, 4])
+            else:
+                self.assertEqual([n.column for n in npcs], [1, 2, 4])
+
+    def test_npc_lod(self):
+        class CountingActuator(actuators.Actuator):
+            def __init__(self, parent=None):
+                super().__init__(parent)
+                self.calls = 0
+                self.elapsed = 0.0
+
+            def next_move(self):
+                self.calls += 1
+                self.elapsed += self.parent.dtmove
+                self.parent.dtmove = 0.0
+                return constants.NO_DIR
+
+        g = engine.Game(npc_lod_bands=[(60, 4), (10, 1)])
+        self.assertEqual(g.npc_lod_bands, [(10, 1), (60, 4)])
+        g.player = board_items.Player()
+        b = engine.Board(size=[200, 200])
+        g.add_board(1, b)
+        g.change_level(1)
+        b.place_item(g.player, 100, 100)
+        near = board_items.NPC()
+        middle = board_items.NPC()
+        far = board_items.NPC()
+        for (npc, column) in [(near, 105), (middle, 140), (far, 190)]:
+            npc.actuator = CountingActuator(npc)
+            g.add_npc(1, npc, 100, column)
+        g.start()
+        for _ in range(8):
+            g.actuate_npcs(1, 0.5)
+        self.assertEqual(near.actuator.calls, 8)
+        self.assertEqual(middle.actuator.calls, 2)
+        self.assertEqual(far.actuator.calls, 0)
+        self.assertAlmostEqual(near.actuator.elapsed, 4.0)
+        # The elapsed time is scaled up for the NPCs that are actuated less often:
+        # middle was actuated at the 3rd and 7th calls.
+        self.assertAlmostEqual(middle.actuator.elapsed, 3.5)
+        # The far NPC wakes up when the player comes closer, without getting the
+        # time it spent asleep. The index follows the NPCs moved by other means.
+        b.move(far, constants.LEFT, 30)
+        g.actuate_npcs(1, 0.5)
+        self.assertEqual(far.actuator.calls, 0)
+        for _ in range(4):
+            g.actuate_npcs(1, 0.5)
+        self.assertEqual(far.actuator.calls, 1)
+        self.assertLessEqual(far.actuator.elapsed, 2.0)
+        # The NPCs moved by actuate_npcs() are tracked
+        g.remove_npc(1, middle)
+        g.npc_lod_bands = [(60, 1)]
+        moving = board_items.NPC(
+            actuator=actuators.PathActuator(path=[constants.LEFT] * 100)
+        )
+        g.add_npc(1, moving, 150, 118)
+        for _ in range(10):
+            g.actuate_npcs(1, 0.5)
+        self.assertEqual(moving.column, 108)
+        # Without focus, all the NPCs are actuated.
+        g.player = constants.NO_PLAYER
+        calls = near.actuator.calls
+        g.actuate_npcs(1, 0.5)
+        self.assertEqual(near.actuator.calls, calls + 1)
+        g.npc_lod_bands = None
+        self.assertIsNone(g.npc_lod_bands)
+        for bands in [[], [(1, 0)], [(1.0, 1)], [1], "bands"]:
+            with self.assertRaises(base.PglInvalidTypeException):
+                g.npc_lod_bands = bands
+
+    def test_schedule_npc_moves(self):
+        positions = []
+        for scheduled in [False, True]:
+            g = engine.Game(
+                player=constants.NO_PLAYER,
+                boards={},
+                mode=constants.MODE_RT,
+                schedule_npc_moves=scheduled,
+            )
+            g.add_board(1, engine.Board(size=[40, 40]))
+            g.start()
+            npcs = []
+            for (i, speed) in enumerate([0.0, 0.125, 0.25, 0.5, 1.0]):
+                npc = board_items.NPC(
+                    movement_speed=speed,
+                    actuator=actuators.PathActuator(path=[constants.RIGHT] * 30),
+                )
+                npcs.append(npc)
+                g.add_npc(1, npc, 2 * i, 0)
+            paused = board_items.NPC(
+                movement_speed=0.25,
+                actuator=actuators.PathActuator(path=[constants.DOWN] * 30),
+            )
+            g.add_npc(1, paused, 20, 20)
+            paused.actuator.pause()
+            for frame in range(16):
+                g.actuate_npcs(1, 0.0625)
+                if frame == 4:
+                    g.remove_npc(1, npcs[2])
+                    late = board_items.NPC(
+                        movement_speed=0.25,
+                        actuator=actuators.PathActuator(path=[constants.LEFT] * 30),
+                    )
+                    npcs.append(late)
+                    g.add_npc(1, late, 30, 30)
+                if frame == 6:
+                    # Haste and slow: the new speeds are used immediately.
+                    npcs[4].movement_speed = 0.125
+                    npcs[1].movement_speed = 1.0
+                if frame == 8:
+                    paused.actuator.start()
+            positions.append([(n.row, n.column) for n in npcs + [paused]])
+            self.assertEqual([n.column for n in npcs], [16, 3, 1, 2, 5, 28])
+            if scheduled:
+                # The NPCs that are not due are not visited.
+                self.assertEqual(npcs[4].dtmove, 0.0)
+        self.assertEqual(positions[0][:-1], positions[1][:-1])
+        self.assertGreater(positions[1][-1][0], 20)
+
+    def test_streaming_load_board(self):
+        progress = []
+
+        def loading_progress(lvl, count, fraction):
+            progress.append((lvl, count, fraction))
+
+        g = engine.Game(boards={})
+        b = g.load_board("hac-maps/benchmark.json", 3, loading_progress)
+        self.assertIs(g.get_board(3), b)
+        self.assertEqual(b.size, [50, 30])
+        self.assertEqual(len(g._boards[3]["npcs"]), 9)
+        self.assertEqual(len(g.object_library), 10)
+        self.assertEqual(progress[-1], (3, 812, 1.0))
+        fractions = [p[2] for p in progress]
+        self.assertEqual(fractions, sorted(fractions))
+        progress.clear()
+        # In the background, the board is added to the game by the game loop.
+        loader = g.load_board("hac-maps/test-board.json", 4, loading_progress, True)
+        self.assertNotIn(4, g._boards)
+        g.user_update = lambda g, k, dt: None
+        g.start()
+        deadline = time.perf_counter() + 10
+        while not loader.done() and time.perf_counter() < deadline:
+            g.step(None, 0.01)
+        self.assertIs(g.get_board(4), loader.result())
+        self.assertEqual(len(g._boards[4]["npcs"]), 2)
+        self.assertEqual(progress[-1][2], 1.0)
+        # The errors are set on the future.
+        loader = g.load_board("hac-maps/not-a-board.json", 5, background=True)
+        with self.assertRaises(FileNotFoundError):
+            loader.result(timeout=10)
+        self.assertNotIn(5, g._boards)
+        # Without a running game loop.
+        g.stop()
+        loader = g.load_board("hac-maps/test-board.json", 7, background=True)
+        g.add_loaded_boards(wait=True)
+        self.assertTrue(loader.done())
+        self.assertIs(g.get_board(7), loader.result())
+        g.player = constants.NO_PLAYER
+        loader = g.load_board("hac-maps/test-board.json", 8, background=True)
+        g.change_level(8)
+        self.assertIs(g.current_board(), loader.result(timeout=0))
+        self.assertEqual(g._board_loaders, [])
+        # The members of a JSON object are not ordered: the attributes of a legacy
+        # board that follow map_data are not ignored.
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        filename = os.path.join(directory.name, "legacy.json")
+        with open(filename, "w") as f:
+            json.dump(
+                {
+                    "size": [4, 3],
+                    "map_data": {"1": {"2": {"object": "<'Wall'>"}}},
+                    "name": "legacy",
+                    "ui_border_top": "X",
+                },
+                f,
+            )
+        b = g.load_board(filename, 6)
+        self.assertEqual(b.name, "legacy")
+        self.assertEqual(b.ui_border_top, "X")
+        self.assertIsInstance(b.item(1, 2), board_items.Wall)
+
+    def test_json_object_reader(self):
+        data = {
+            "name": "Stream \u00e9t\u00e9",
+            "size": [12345, -6.5e3],
+            "empty": {},
+            "map_data": {"1": {"2": {"object": "<'Wall'>"}, "3": None}},
+            "flag": True,
+        }
+        raw = json.dumps(data, indent=1).encode("utf-8")
+        for chunk_size in [1, 3, 7, 65536]:
+            reader = engine._JsonObjectReader(io.BytesIO(raw), chunk_size)
+            parsed = {}
+            for k in reader.members():
+                if k == "map_data":
+                    parsed[k] = {}
+                    for x in reader.members():
+                        parsed[k][x] = {y: reader.value() for y in reader.members()}
+                else:
+                    parsed[k] = reader.value()
+            self.assertEqual(parsed, data)
+            self.assertEqual(reader.bytes_read, len(raw))
+        reader = engine._JsonObjectReader(io.BytesIO(b'{"a": 1, "b": '), 4)
+        with self.assertRaises(json.JSONDecodeError):
+            for k in reader.members():
+                reader.value()
+        reader = engine._JsonObjectReader(io.BytesIO(b"[1, 2]"), 4)
+        with self.assertRaises(json.JSONDecodeError):
+            list(reader.members())
+
 
 if __name__ == "__main__":
     unittest.main()
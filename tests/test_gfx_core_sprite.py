@@ -1,5 +1,7 @@
 import pygamelib.gfx.core as gfx_core
 import unittest
+import os
+import tempfile
 
 # Test cases for all classes in pygamelib.gfx.core except for Animation.
 
@@ -212,8 +214,11 @@ class TestBase(unittest.TestCase):
         self.assertEqual(spr3.name, sc.get(spr3.name).name)
         self.assertIsNone(sc.rename(spr.name, "test_rename"))
         self.assertEqual(sc["test_rename"].sprixel(0, 0), spr.sprixel(0, 0))
-        self.assertIsNone(sc.to_json_file("test.pgs"))
-        sc2 = gfx_core.SpriteCollection.load_json_file("test.pgs")
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        filename = os.path.join(directory.name, "test.pgs")
+        self.assertIsNone(sc.to_json_file(filename))
+        sc2 = gfx_core.SpriteCollection.load_json_file(filename)
         self.assertIsInstance(sc2, gfx_core.SpriteCollection)
         self.assertEqual(spr3.sprixel(1, 1), sc2.get(spr3.name).sprixel(1, 1))
         with self.assertRaises(gfx_core.base.PglException) as e: